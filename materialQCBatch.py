@@ -0,0 +1,257 @@
+"""
+Script Name: materialQCBatch.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This script runs the Material QC headlessly on many scene files, to gate publishes on the farm. Every scene is sent to its
+             own mayapy process (one per core) which runs the same checks as the Material QC tool through materialQCCore, a JSON
+             report is written per scene and a JUnit XML summary for the whole batch. The exit code is non zero if any scene fails.
+
+Usage:
+    python materialQCBatch.py asset1.mb asset2.ma --report-dir qc_reports --junit qc_summary.xml
+    python materialQCBatch.py *.mb --group geo_GRP --job myJob --mayapy /usr/autodesk/maya2023/bin/mayapy --processes 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ElementTree
+
+import mayapyBatch #shared mayapy worker pool
+
+SCENE_TYPES = {".ma" : "mayaAscii", ".mb" : "mayaBinary"}
+
+
+def get_report_path(path,report_dir=None):
+    """
+    This function returns the path of the JSON report of a scene
+
+    Args:
+        path: path of the scene file
+        report_dir: directory to write the reports to (next to the scene if None)
+    Returns:
+        report_path : path of the JSON report
+    """
+    directory, file_name = os.path.split(path)
+    name = os.path.splitext(file_name)[0]
+
+    return os.path.join(report_dir or directory,"{0}_materialQC.json".format(name))
+
+def qc_scene(path,group=None,job=None,checks=None,rules=None):
+    """
+    This function runs inside mayapy. It opens the passed scene and runs the Material QC checks on it
+
+    Args:
+        path: path of the scene file
+        group: group to scope the QC to (the whole scene if None)
+        job: name of the current job (the JOB environment variable if None)
+        checks: names of the checks to run (all the registered checks if None)
+        rules: path of the rules file (the default rules file if None)
+    Returns:
+        result : a dict containing the QC report of the scene
+    """
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    import maya.cmds as cmds
+
+    sys.path.insert(0,os.path.dirname(os.path.abspath(__file__))) #for accessing the Material QC modules next to this script
+    import materialQCChecks
+    import materialQCCore
+
+    if os.path.splitext(path)[-1].lower() not in SCENE_TYPES:
+        raise ValueError("Unsupported file type: {0}".format(path))
+
+    cmds.file(path,open=True,force=True)
+
+    materialQCChecks.load_plugins() #studio specific checks
+
+    result = materialQCCore.run_qc(group=group,job=job,names=checks,rules_path=rules)
+    result["file"] = path
+
+    return result
+
+def get_error_result(path,message):
+    """
+    This function returns the result of a scene that could not be QCed at all
+
+    Args:
+        path: path of the scene file
+        message: error message
+    Returns:
+        result : a dict containing the QC report of the scene
+    """
+    return {"file" : path, "status" : "error", "error" : message}
+
+def run_mayapy_worker(path,options):
+    """
+    This function launches one mayapy process that QCs the passed scene, and returns its result
+
+    Args:
+        path: path of the scene file
+        options: dict of batch options ("mayapy","group","job","checks","rules")
+    Returns:
+        result : a dict containing the QC report of the scene
+    """
+    arguments = []
+    if options.get("group"):
+        arguments.extend(["--group",options["group"]])
+    if options.get("job") is not None:
+        arguments.extend(["--job",options["job"]])
+    if options.get("checks"):
+        arguments.extend(["--checks",",".join(options["checks"])])
+    if options.get("rules"):
+        arguments.extend(["--rules",options["rules"]])
+
+    return mayapyBatch.run_mayapy_worker(__file__,path,arguments,get_error_result,mayapy=options["mayapy"])
+
+def write_report(result,report_dir=None):
+    """
+    This function writes the JSON report of a scene and stores its path on the result
+
+    Args:
+        result: dict containing the QC report of the scene
+        report_dir: directory to write the report to (next to the scene if None)
+    Returns:
+        None
+    """
+    result["report"] = get_report_path(result["file"],report_dir)
+    try:
+        with open(result["report"],"w") as f:
+            json.dump(result,f,indent = 4)
+    except (IOError,OSError) as error:
+        print("Could not write the report of {0}: {1}".format(result["file"],error))
+        result["report"] = None
+
+def build_junit(results):
+    """
+    This function builds the JUnit XML summary of the batch, one test suite per scene and one test case per check
+
+    Args:
+        results: list of the scene results
+    Returns:
+        root : ElementTree element of the summary
+    """
+    root = ElementTree.Element("testsuites",name="materialQC")
+    totals = {"tests" : 0, "failures" : 0, "errors" : 0}
+
+    for result in results:
+        scene_name = os.path.basename(result["file"])
+        suite = ElementTree.SubElement(root,"testsuite",name=scene_name,file=result["file"],time=str(result.get("elapsed_seconds",0)))
+        counts = {"tests" : 0, "failures" : 0, "errors" : 0}
+
+        if result.get("error"): #the scene could not be QCed at all
+            case = ElementTree.SubElement(suite,"testcase",classname=scene_name,name="open")
+            ElementTree.SubElement(case,"error",message=result["error"]).text = result.get("log","")
+            counts["tests"] += 1
+            counts["errors"] += 1
+
+        for check in result["checks"]:
+            case = ElementTree.SubElement(suite,"testcase",classname=scene_name,name=check["label"])
+            counts["tests"] += 1
+            if check["status"] == "error":
+                ElementTree.SubElement(case,"error",message=check["exception"])
+                counts["errors"] += 1
+            elif check["status"] == "failed" and check["mandatory"]:
+                failure = ElementTree.SubElement(case,"failure",message="{0} errors".format(len(check["errors"])))
+                failure.text = "\n".join(check["errors"])
+                counts["failures"] += 1
+            elif check["status"] == "failed": #general checks only warn
+                ElementTree.SubElement(case,"system-out").text = "\n".join(check["errors"])
+
+        for key,value in counts.items():
+            suite.set(key,str(value))
+            totals[key] += value
+
+    for key,value in totals.items():
+        root.set(key,str(value))
+
+    return root
+
+def run_batch(paths,report_dir=None,junit_path=None,worker=run_mayapy_worker,processes=None,mayapy=mayapyBatch.DEFAULT_MAYAPY,group=None,job=None,checks=None,rules=None):
+    """
+    This is the main function that fans the scenes out across the worker pool and collects the results into the reports
+
+    Args:
+        paths: list of scene files
+        report_dir: directory to write the JSON report of every scene to (next to the scenes if None)
+        junit_path: path of the JUnit XML summary (not written if None)
+        worker: callable in format worker(path,options) -> result dict (a stub can be passed for testing)
+        processes: number of parallel workers (number of cores if None)
+        mayapy: mayapy executable used by run_mayapy_worker
+        group: group to scope the QC to (the whole scene if None)
+        job: name of the current job (the JOB environment variable of the worker if None)
+        checks: names of the checks to run (all the registered checks if None)
+        rules: path of the rules file (the default rules file if None)
+    Returns:
+        report : a dict containing the results of every scene in the same order as paths
+    """
+    start_time = time.time()
+
+    options = {"mayapy" : mayapy, "group" : group, "job" : job, "checks" : checks, "rules" : rules}
+
+    if report_dir and not os.path.isdir(report_dir):
+        os.makedirs(report_dir)
+
+    results = mayapyBatch.run_pool(paths,worker,options,get_error_result,processes=processes)
+    for result in results:
+        result.setdefault("status","error")
+        result.setdefault("checks",[])
+        write_report(result,report_dir) #per scene JSON report
+
+    report = {
+        "scenes" : results,
+        "total_scenes" : len(results),
+        "failed_scenes" : len([result for result in results if result["status"] != "passed"]),
+        "elapsed_seconds" : round(time.time() - start_time,3),
+    }
+
+    if junit_path:
+        ElementTree.ElementTree(build_junit(results)).write(junit_path,encoding="utf-8",xml_declaration=True)
+
+    return report
+
+def main(args=None,worker=run_mayapy_worker):
+    """
+    This is the command line entry point for both the batch and the mayapy worker
+
+    Args:
+        args: list of command line arguments (sys.argv if None)
+        worker: callable in format worker(path,options) -> result dict (a stub can be passed for testing)
+    Returns:
+        exit code
+    """
+    parser = argparse.ArgumentParser(description="Run the Material QC on scene files with a pool of mayapy processes")
+    parser.add_argument("files",nargs="*",help="scene files (.ma/.mb)")
+    parser.add_argument("--report-dir",default=None,help="directory of the JSON report of every scene (default: next to the scene)")
+    parser.add_argument("--junit",default="materialQC_junit.xml",help="path of the JUnit XML summary")
+    parser.add_argument("--group",default=None,help="group to scope the QC to (default: the whole scene)")
+    parser.add_argument("--job",default=None,help="name of the job the textures should be in (default: the JOB environment variable)")
+    parser.add_argument("--checks",default=None,help="comma seperated names of the checks to run (default: all)")
+    parser.add_argument("--rules",default=None,help="JSON or YAML rules file (default: MATERIALQC_RULES or materialQCRules.json)")
+    mayapyBatch.add_arguments(parser) #--mayapy, --processes and the worker mode
+    options = parser.parse_args(args)
+
+    checks = [check for check in options.checks.split(",") if check] if options.checks else None
+
+    #worker mode, running inside mayapy
+    if options.worker:
+        result = qc_scene(options.worker,group=options.group,job=options.job,checks=checks,rules=options.rules)
+        mayapyBatch.write_result(options.result,result)
+        return 0
+
+    if not options.files:
+        parser.error("Please pass the scenes to QC")
+
+    if not options.job and not os.environ.get("JOB"):
+        parser.error("Please pass the --job or set the JOB environment variable")
+
+    report = run_batch(options.files,report_dir=options.report_dir,junit_path=options.junit,worker=worker,processes=options.processes,mayapy=options.mayapy,group=options.group,job=options.job,checks=checks,rules=options.rules)
+
+    print("QCed {0} scenes ({1} failed) in {2:.2f} seconds. Summary: {3}".format(report["total_scenes"],report["failed_scenes"],report["elapsed_seconds"],options.junit))
+
+    return 1 if report["failed_scenes"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
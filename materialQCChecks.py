@@ -0,0 +1,345 @@
+"""
+Script Name: materialQCChecks.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This module holds the check registry of the Material QC tool. Every check is a pure function over a QCContext
+             (the shading snapshot plus the dicts derived from it), so the checks can run concurrently in a thread pool after a single
+             maya read. Studio specific checks can be added from other modules with the register_check decorator, listed in the
+             MATERIALQC_CHECKS environment variable.
+"""
+import collections
+import importlib
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import materialQCScene
+
+PLUGINS_ENV = "MATERIALQC_CHECKS" #modules with extra checks, seperated by os.pathsep
+
+#everything a check can read
+QCContext = collections.namedtuple("QCContext",[
+    "snapshot", #materialQCScene.ShadingSnapshot of the scene
+    "shading_dict", #SG : shader, for the shading groups in the QC scope
+    "shader_to_meshes", #shader : list of members
+    "texture_paths", #file node : texture path, without the turntable textures
+    "texture_tiles", #file node : frozenset of the UDIM tiles its meshes use, for the UDIM textures (None if the meshes werent read)
+    "job", #name of the current job
+    "group", #group the QC is scoped to (None for the whole scene)
+    "texture_validator", #materialQCTextures.TextureValidator that caches the files on disk
+    "rules", #materialQCRules.QCRules of the show
+])
+
+#what a check returns, errors are shown as primary followed by secondary in the error widget
+CheckResult = collections.namedtuple("CheckResult",["name","label","primary","secondary","exception"])
+
+#registered check
+Check = collections.namedtuple("Check",["name","label","function","mandatory"])
+
+CHECKS = collections.OrderedDict() #name : Check, in the order they are shown
+
+
+def register_check(name,label=None,mandatory=True):
+    """
+    This function returns a decorator that adds the decorated function to the check registry
+
+    Args:
+        name: unique name of the check
+        label: label shown in the error widget (name if None)
+        mandatory: if False, the check is listed under the general checks
+    Returns:
+        decorator
+    """
+    def decorator(function):
+        CHECKS[name] = Check(name,label or name,function,mandatory)
+        return function
+
+    return decorator
+
+def unregister_check(name):
+    """
+    This function removes a check from the registry
+
+    Args:
+        name: name of the check
+    Returns:
+        None
+    """
+    CHECKS.pop(name,None)
+
+def load_plugins(modules=None):
+    """
+    This function imports the modules holding extra checks, which register themselves on import
+
+    Args:
+        modules: list of module names (read from the MATERIALQC_CHECKS environment variable if None)
+    Returns:
+        loaded : list of the modules that could be imported
+    """
+    if modules is None:
+        modules = [module for module in os.environ.get(PLUGINS_ENV,"").split(os.pathsep) if module]
+
+    loaded = []
+    for module in modules:
+        try:
+            importlib.import_module(module)
+            loaded.append(module)
+        except Exception:
+            print("Could not load the Material QC checks from {0}".format(module))
+            traceback.print_exc()
+
+    return loaded
+
+def run_check(check,context):
+    """
+    This function runs a single check and turns any exception into a failed result, so one bad check doesnt stop the others
+
+    Args:
+        check: Check to run
+        context: QCContext of the scene
+    Returns:
+        result : CheckResult
+    """
+    try:
+        primary, secondary = check.function(context)
+    except Exception as error:
+        return CheckResult(check.name,check.label,[],[],"{0}: {1}".format(type(error).__name__,error))
+
+    return CheckResult(check.name,check.label,list(primary),list(secondary),None)
+
+def run_checks(context,names=None,max_workers=None):
+    """
+    This is the main function of the runner, it runs the checks concurrently and merges the results in registry order
+
+    Args:
+        context: QCContext of the scene
+        names: names of the checks to run (all the registered checks if None)
+        max_workers: number of threads (one per check if None)
+    Returns:
+        results : an ordered dict in format {name: CheckResult}
+    """
+    checks = [check for name,check in CHECKS.items() if names is None or name in names]
+
+    if not checks:
+        return collections.OrderedDict()
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(checks)) as executor:
+        results = list(executor.map(lambda check : run_check(check,context),checks)) #map keeps the registry order
+
+    return collections.OrderedDict((result.name,result) for result in results)
+
+####### BUILT-IN CHECKS #######
+
+@register_check("namingConvention","Naming Convention")
+def naming_convention(context):
+    """
+    This check returns the shading groups and shaders whose names dont match the naming rules (excluded nodes are skipped)
+
+    Args:
+        context: QCContext of the scene
+    Returns:
+        incorrectShadingGroups : list of all the shading groups with incorrect names
+        incorrectShaders : list of all the shaders with incorrect names
+    """
+    incorrectShadingGroups = []
+    incorrectShaders = []
+
+    rules = context.rules
+    for sg,shd in context.shading_dict.items():
+        if sg not in rules.excluded_shading_groups and not rules.shading_group.search(sg): #sg check condition
+            incorrectShadingGroups.append(sg)
+        if shd not in rules.excluded_shaders and not rules.shader.search(shd): #shd check condition
+            incorrectShaders.append(shd)
+
+    return incorrectShadingGroups, incorrectShaders
+
+def get_free_name(name,suffix,taken):
+    """
+    This function returns the name with the suffix, numbered before the suffix if that name is already taken
+
+    Args:
+        name: current name of the node
+        suffix: suffix to add
+        taken: set of the names that cant be used
+    Returns:
+        new_name : free name ending with the suffix
+    """
+    new_name = name + suffix
+    number = 1
+    while new_name in taken:
+        new_name = "{0}{1}{2}".format(name,number,suffix)
+        number += 1
+
+    return new_name
+
+def plan_renames(incorrectShadingGroups,incorrectShaders,existing_names,rules):
+    """
+    This function computes the new name of every incorrectly named node up front, resolving the name collisions in memory
+    (against the scene and against the other planned names), so the renames can be applied without maya picking the names
+
+    Args:
+        incorrectShadingGroups: list of the shading groups to rename
+        incorrectShaders: list of the shaders to rename
+        existing_names: set of every node name in the scene
+        rules: materialQCRules.QCRules with the suffixes to add
+    Returns:
+        plan : an ordered dict in format {current name: new name}
+    """
+    plan = collections.OrderedDict()
+    taken = set(existing_names)
+
+    for names,suffix in ((incorrectShadingGroups,rules.shading_group_suffix),(incorrectShaders,rules.shader_suffix)):
+        for name in names:
+            if name in plan:
+                continue
+            new_name = get_free_name(name,suffix,taken)
+            taken.add(new_name)
+            plan[name] = new_name
+
+    return plan
+
+@register_check("unusedNodes","Unused Nodes")
+def unused_nodes(context):
+    """
+    This check returns the shaders that are not assigned to anything and the file nodes without any connected output.
+    For a scoped QC only the shaders of the shading groups in scope are tested
+
+    Args:
+        context: QCContext of the scene
+    Returns:
+        unused_shaders : list of the unused shaders
+        unused_textures : list of the unused file nodes
+    """
+    shading_groups = list(context.shading_dict) if context.group else None
+
+    unused_shaders = materialQCScene.find_unused_shaders(context.snapshot,shading_groups)
+    unused_textures = materialQCScene.find_unused_textures(context.snapshot,context.texture_paths)
+
+    return unused_shaders, unused_textures
+
+@register_check("currentJob","Textures in Current Job")
+def textures_in_current_job(context):
+    """
+    This check returns the file nodes with a texture path outside of the current job. Without a job it raises,
+    so the check is reported as an error instead of passing every path
+
+    Args:
+        context: QCContext of the scene
+    Returns:
+        incorrectJobTextures : list of the file nodes
+        empty list
+    """
+    if not context.job:
+        raise RuntimeError("No job set, pass the job or set the JOB environment variable")
+
+    return [tex for tex,path in context.texture_paths.items() if context.job not in path], []
+
+@register_check("publishedTextures","Published Textures")
+def published_textures(context):
+    """
+    This check returns the file nodes with a texture path that doesnt match the published path rules
+
+    Args:
+        context: QCContext of the scene
+    Returns:
+        unpublishedTextures : list of the file nodes
+        empty list
+    """
+    return [tex for tex,path in context.texture_paths.items() if not context.rules.published.search(path)], []
+
+@register_check("duplicateTextures","Duplicate Textures")
+def duplicate_textures(context):
+    """
+    This check returns the file nodes sharing their texture path with another file node
+
+    Args:
+        context: QCContext of the scene
+    Returns:
+        duplicateTextures : list of the file nodes
+        empty list
+    """
+    occurences = collections.Counter(context.texture_paths.values())
+
+    return [tex for tex,path in context.texture_paths.items() if occurences[path] > 1], []
+
+@register_check("defaultShaders","Default Shaders")
+def lambert_meshes(context):
+    """
+    This check returns the meshes assigned to lambert1
+
+    Args:
+        context: QCContext of the scene
+    Returns:
+        lambertMeshes : list of the short names of the meshes
+        empty list
+    """
+    return [mesh.split("|")[-1] for mesh in context.snapshot.sg_members.get("initialShadingGroup",())], []
+
+@register_check("faceSelection","Face Selection",mandatory=False)
+def face_selection(context):
+    """
+    This check returns the shaders that are assigned to faces instead of whole meshes
+
+    Args:
+        context: QCContext of the scene
+    Returns:
+        faceAssignedShaders : list of the shaders
+        empty list
+    """
+    return [shd for shd,meshes in context.shader_to_meshes.items() if any(".f" in mesh for mesh in meshes)], []
+
+@register_check("missingTextures","Missing Textures",mandatory=False)
+def missing_textures(context):
+    """
+    This check returns the file nodes whose texture is not on disk and the UDIM file nodes missing tiles that their meshes use.
+    A sparse layout (1001, 1003) is fine as long as no shell sits in the tiles in between
+
+    Args:
+        context: QCContext of the scene
+    Returns:
+        missingTextures : list of the file nodes without any file on disk
+        missingTiles : list of the file nodes with missing UDIM tiles and the missing tiles, in format "file1 (1002, 1011)"
+    """
+    results = context.texture_validator.validate(context.texture_paths.values())
+    texture_tiles = context.texture_tiles or {}
+
+    missingTextures = []
+    missingTiles = []
+    for tex,path in context.texture_paths.items():
+        result = results.get(path)
+        if result is None: #empty path
+            missingTextures.append(tex)
+        elif not result.exists:
+            missingTextures.append(tex)
+        else:
+            tiles = sorted(texture_tiles.get(tex,frozenset()) - result.udims)
+            if tiles:
+                missingTiles.append("{0} ({1})".format(tex,", ".join(str(tile) for tile in tiles)))
+
+    return missingTextures, missingTiles
+
+@register_check("duplicateContent","Duplicate Texture Files",mandatory=False)
+def duplicate_content(context):
+    """
+    This check returns the file nodes whose image is also used through a different path (copies, symlinks, mount aliases)
+
+    Args:
+        context: QCContext of the scene
+    Returns:
+        duplicateFiles : list of the groups of file nodes with the same image, in format "file1, file2 (path1, path2)"
+        empty list
+    """
+    duplicates = context.texture_validator.find_duplicates(context.texture_paths.values())
+
+    #file nodes of every path
+    path_textures = {}
+    for tex,path in context.texture_paths.items():
+        path_textures.setdefault(path,[]).append(tex)
+
+    duplicateFiles = []
+    for paths in duplicates:
+        textures = [tex for path in paths for tex in path_textures.get(path,())]
+        duplicateFiles.append("{0} ({1})".format(", ".join(textures),", ".join(paths)))
+
+    return duplicateFiles, []
@@ -0,0 +1,228 @@
+"""
+Script Name: materialQCCore.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This module is the UI free core of the Material QC tool. It builds the QC context of the open scene (optionally scoped to
+             a group) from the shading snapshot and runs the registered checks on it, returning a plain dict report. The Material QC
+             window and the materialQCBatch command line both go through it, and it only needs maya.cmds (a stub works for tests).
+"""
+import os
+import time
+
+try:
+    import maya.cmds as cmds
+except ImportError: #lets the core be used with a stub cmds outside of maya
+    cmds = None
+
+import materialQCScene
+import materialQCChecks
+import materialQCTextures
+import materialQCRules
+
+SCOPE_ERROR = "Select a Group to QC . For Global QC of materials in the scene, try Removing existing Turntables and Optimizing the scene before running Material QC"
+
+
+def get_job():
+    """
+    This function returns the name of the current job, read when it is needed (empty if JOB is not set, which fails the current job check)
+
+    Args:
+        None
+    Returns:
+        job : name of the job
+    """
+    return os.environ.get("JOB","")
+
+def get_scope_shading_groups(snapshot,group=None):
+    """
+    This function returns the shading groups to QC, the ones assigned under the group or every shading group of the snapshot
+
+    Args:
+        snapshot: materialQCScene.ShadingSnapshot of the scene
+        group: group to scope the QC to (the whole scene if None)
+    Returns:
+        shading_groups : list of shading groups
+    """
+    if not group:
+        return list(snapshot.sg_shaders.keys())
+
+    shapes = cmds.listRelatives(group, allDescendents=True, shapes=True, fullPath=True) or [] #all the shapes under the group at once
+    if not shapes:
+        return []
+
+    return list(set(cmds.listConnections(shapes, type='shadingEngine') or [])) #shading groups of all the shapes in one call
+
+def get_shading_dict(snapshot,shading_groups):
+    """
+    This function maps the passed shading groups to their shader (except default materials and shading groups)
+
+    Args:
+        snapshot: materialQCScene.ShadingSnapshot of the scene
+        shading_groups: list of shading groups
+    Returns:
+        custom_shaders_and_groups : a dict in format {SG:Shader}
+    """
+    custom_shaders_and_groups = {}
+
+    for shading_group in shading_groups:
+        if shading_group in materialQCScene.DEFAULT_SHADING_GROUPS: #filter out the default shading group
+            continue
+
+        connected_shader = snapshot.sg_shaders.get(shading_group,())
+        if not connected_shader: #shading groups without a material, usually left over from turntables
+            raise RuntimeError(SCOPE_ERROR)
+
+        if connected_shader[0] not in materialQCScene.DEFAULT_MATERIALS:
+            custom_shaders_and_groups[shading_group] = connected_shader[0]
+
+    return custom_shaders_and_groups
+
+def get_shader_to_meshes(snapshot,shading_dict):
+    """
+    This function finds all the members assigned to each shader
+
+    Args:
+        snapshot: materialQCScene.ShadingSnapshot of the scene
+        shading_dict: dict in format {SG:Shader}
+    Returns:
+        shader_to_meshes: a dict in format {SHD: [mesh]}
+    """
+    shader_to_meshes = {}
+
+    for sg,shader in shading_dict.items():
+        if shader:
+            shader_to_meshes.setdefault(shader,[]).extend(snapshot.sg_members.get(sg,()))
+
+    return shader_to_meshes
+
+def get_texture_paths(snapshot,rules):
+    """
+    This function gets the texture paths of all the file nodes, except the excluded (turntable) textures of the rules
+
+    Args:
+        snapshot: materialQCScene.ShadingSnapshot of the scene
+        rules: materialQCRules.QCRules of the show
+    Returns:
+        texturePaths : a dict in format {texture : path of the texture}
+    """
+    excluded = rules.excluded_textures
+
+    return dict((file_texture,path) for file_texture,path in snapshot.texture_paths.items() if file_texture not in excluded)
+
+def get_texture_tiles(snapshot,texture_paths):
+    """
+    This function gets the UDIM tiles that the meshes of every UDIM texture use, read from their UV shells
+
+    Args:
+        snapshot: materialQCScene.ShadingSnapshot of the scene
+        texture_paths: a dict in format {texture : path of the texture}
+    Returns:
+        texture_tiles : a dict in format {texture : frozenset of UDIM tiles}, None outside of maya
+    """
+    if materialQCScene.om2 is None:
+        return None
+
+    udim_textures = [file_texture for file_texture,path in texture_paths.items() if materialQCTextures.has_udim_token(path)]
+
+    return materialQCScene.query_texture_tiles(snapshot,udim_textures)
+
+def build_context(snapshot=None,group=None,job=None,texture_validator=None,rules=None,texture_tiles=None):
+    """
+    This function builds the QC context of the scene
+
+    Args:
+        snapshot: materialQCScene.ShadingSnapshot of the scene (built with bulk queries if None)
+        group: group to scope the QC to (the whole scene if None)
+        job: name of the current job (the JOB environment variable if None)
+        texture_validator: materialQCTextures.TextureValidator to reuse (a new one if None)
+        rules: materialQCRules.QCRules to check with (the rules file with the overrides of the job if None)
+        texture_tiles: a dict in format {texture : UDIM tiles its meshes use} (read from the meshes if None)
+    Returns:
+        context : materialQCChecks.QCContext
+    """
+    if snapshot is None:
+        snapshot = materialQCScene.build_snapshot()
+
+    job = get_job() if job is None else job
+    if rules is None:
+        rules = materialQCRules.get_rules(show=job)
+
+    shading_dict = get_shading_dict(snapshot,get_scope_shading_groups(snapshot,group))
+    texture_paths = get_texture_paths(snapshot,rules)
+    if texture_tiles is None:
+        texture_tiles = get_texture_tiles(snapshot,texture_paths)
+
+    return materialQCChecks.QCContext(
+        snapshot = snapshot,
+        shading_dict = shading_dict,
+        shader_to_meshes = get_shader_to_meshes(snapshot,shading_dict),
+        texture_paths = texture_paths,
+        texture_tiles = texture_tiles,
+        job = job,
+        group = group,
+        texture_validator = texture_validator or materialQCTextures.TextureValidator(),
+        rules = rules,
+    )
+
+def result_to_dict(result):
+    """
+    This function turns a check result into a plain dict for the reports
+
+    Args:
+        result: materialQCChecks.CheckResult
+    Returns:
+        a dict containing the result of the check
+    """
+    errors = result.primary + result.secondary
+    check = materialQCChecks.CHECKS.get(result.name)
+
+    if result.exception:
+        status = "error"
+    elif errors:
+        status = "failed"
+    else:
+        status = "passed"
+
+    return {
+        "name" : result.name,
+        "label" : result.label,
+        "mandatory" : check.mandatory if check else True,
+        "status" : status,
+        "errors" : errors,
+        "exception" : result.exception,
+    }
+
+def run_qc(group=None,job=None,names=None,context=None,rules_path=None):
+    """
+    This is the main function of the core, it runs the registered checks on the open scene and returns the report
+
+    Args:
+        group: group to scope the QC to (the whole scene if None)
+        job: name of the current job (the JOB environment variable if None)
+        names: names of the checks to run (all the registered checks if None)
+        context: QCContext to run on (built from the scene if None)
+        rules_path: path of the rules file (the default rules file if None)
+    Returns:
+        report : a dict containing the results of every check
+    """
+    start_time = time.time()
+
+    if context is None:
+        job = get_job() if job is None else job
+        context = build_context(group=group,job=job,rules=materialQCRules.get_rules(rules_path,show=job))
+
+    checks = [result_to_dict(result) for result in materialQCChecks.run_checks(context,names).values()]
+
+    failed = [check["name"] for check in checks if check["mandatory"] and check["status"] != "passed"]
+    warnings = [check["name"] for check in checks if not check["mandatory"] and check["status"] != "passed"]
+
+    return {
+        "group" : context.group,
+        "job" : context.job,
+        "checks" : checks,
+        "failed_checks" : failed,
+        "warning_checks" : warnings,
+        "status" : "failed" if failed else "passed",
+        "elapsed_seconds" : round(time.time() - start_time,3),
+    }
@@ -0,0 +1,294 @@
+"""
+Script Name: materialQCErrorModel.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This module holds the error model of the Material QC tool. All the QC errors live in one tree model grouped by check,
+             the rows of a check are fetched lazily in batches as the view scrolls, and updating a check only inserts or removes
+             the rows that changed, so tens of thousands of errors never turn into tens of thousands of widgets.
+"""
+from PySide2 import QtCore,QtGui
+
+FETCH_BATCH = 500 #rows of a check added to the view at a time
+
+GROUP_COLOR = QtGui.QColor(75,75,75) #background of the check rows
+
+
+class ErrorGroup(object):
+    """
+    This class holds the errors of a single check in the error model
+
+    Methods:
+        __init__: Initializes the group
+        get_label: This function returns the text shown on the check row
+    """
+    def __init__(self,name,items):
+        """
+        This is the Constructor function to initialize the group
+
+        Args:
+            name: name of the check shown on the row
+            items: list of the errors
+        Returns:
+            None
+        """
+        self.name = name
+        self.items = items
+        self.loaded = min(len(items),FETCH_BATCH) #number of rows the view knows about
+
+    def get_label(self):
+        """
+        This function returns the text shown on the check row
+
+        Args:
+            None
+        Returns:
+            label : text of the row
+        """
+        if len(self.items) <= 1:
+            errorTxt = " Error:"
+        else:
+            errorTxt = " Errors:"
+
+        return self.name + " QC Found " + str(len(self.items)) + errorTxt
+
+
+class ErrorModel(QtCore.QAbstractItemModel):
+    """
+    This class is a two level tree model of the QC errors, the checks on top and their errors below
+
+    Methods:
+        __init__: Initializes the empty model
+        clear: This function removes every check from the model
+        get_group_row: This function returns the row of a check
+        set_errors: This function adds, updates or removes the errors of a check in place
+        update_group: This function replaces the errors of an existing check, touching only the changed rows
+        remove_group: This function removes a check from the model
+        index, parent, rowCount, columnCount, hasChildren, data, flags: QAbstractItemModel interface
+        canFetchMore, fetchMore: lazy loading of the errors of a check
+    """
+    def __init__(self,parent=None):
+        """
+        This is the Constructor function to initialize the empty model
+
+        Args:
+            parent: parent QObject
+        Returns:
+            None
+        """
+        super(ErrorModel,self).__init__(parent)
+
+        self.groups = [] #ErrorGroup of every check, in the order they are shown
+        self.group_names = {} #name : ErrorGroup
+
+    def clear(self):
+        """
+        This function removes every check from the model
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.beginResetModel()
+        self.groups = []
+        self.group_names = {}
+        self.endResetModel()
+
+    def get_group_row(self,name):
+        """
+        This function returns the row of a check
+
+        Args:
+            name: name of the check
+        Returns:
+            row of the check or -1
+        """
+        group = self.group_names.get(name)
+        if group is None:
+            return -1
+
+        return self.groups.index(group)
+
+    def set_errors(self,name,items):
+        """
+        This function adds, updates or removes the errors of a check in place (a check without errors is removed)
+
+        Args:
+            name: name of the check
+            items: list of the errors
+        Returns:
+            None
+        """
+        items = list(items)
+        group = self.group_names.get(name)
+
+        if group is None:
+            if items:
+                row = len(self.groups)
+                self.beginInsertRows(QtCore.QModelIndex(),row,row)
+                group = ErrorGroup(name,items)
+                self.groups.append(group)
+                self.group_names[name] = group
+                self.endInsertRows()
+        elif not items:
+            self.remove_group(name)
+        else:
+            self.update_group(group,items)
+
+    def update_group(self,group,items):
+        """
+        This function replaces the errors of an existing check. Only the rows between the common start and end of the old and new
+        errors are removed and inserted, so the cost follows the number of changed rows
+
+        Args:
+            group: ErrorGroup of the check
+            items: new list of the errors
+        Returns:
+            None
+        """
+        old_items = group.items
+        group_index = self.index(self.groups.index(group),0)
+
+        #length of the common start and end of the lists
+        common = min(len(old_items),len(items))
+        prefix = 0
+        while prefix < common and old_items[prefix] == items[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < common - prefix and old_items[-1 - suffix] == items[-1 - suffix]:
+            suffix += 1
+
+        old_end = len(old_items) - suffix #end of the changed rows in the old list
+        new_end = len(items) - suffix #end of the changed rows in the new list
+
+        if prefix >= group.loaded: #the changes are all in rows the view hasnt fetched yet
+            group.items = items
+        elif old_end <= group.loaded: #the changes are all in loaded rows, swap just the changed middle
+            if old_end > prefix:
+                self.beginRemoveRows(group_index,prefix,old_end - 1)
+                group.items = old_items[:prefix] + old_items[old_end:]
+                group.loaded -= old_end - prefix
+                self.endRemoveRows()
+            if new_end > prefix:
+                self.beginInsertRows(group_index,prefix,new_end - 1)
+                group.items = items
+                group.loaded += new_end - prefix
+                self.endInsertRows()
+            group.items = items
+        else: #the changes run past the loaded rows, drop the changed loaded rows and load the same number of new ones
+            loaded = group.loaded
+            self.beginRemoveRows(group_index,prefix,loaded - 1)
+            group.loaded = prefix
+            self.endRemoveRows()
+            group.items = items
+            new_loaded = min(len(items),loaded)
+            if new_loaded > prefix:
+                self.beginInsertRows(group_index,prefix,new_loaded - 1)
+                group.loaded = new_loaded
+                self.endInsertRows()
+
+        #keep the first batch loaded, a short list might never be scrolled to fetch more
+        first_batch = min(len(items),FETCH_BATCH)
+        if group.loaded < first_batch:
+            self.beginInsertRows(group_index,group.loaded,first_batch - 1)
+            group.loaded = first_batch
+            self.endInsertRows()
+
+        self.dataChanged.emit(group_index,group_index) #error count on the check row
+
+    def remove_group(self,name):
+        """
+        This function removes a check from the model
+
+        Args:
+            name: name of the check
+        Returns:
+            None
+        """
+        row = self.get_group_row(name)
+        if row < 0:
+            return
+
+        self.beginRemoveRows(QtCore.QModelIndex(),row,row)
+        del self.groups[row]
+        del self.group_names[name]
+        self.endRemoveRows()
+
+    ####### QAbstractItemModel #######
+
+    def index(self,row,column,parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row,column,parent):
+            return QtCore.QModelIndex()
+
+        if not parent.isValid():
+            return self.createIndex(row,column) #check row
+
+        return self.createIndex(row,column,self.groups[parent.row()]) #error row, pointing to its group
+
+    def parent(self,index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+
+        group = index.internalPointer()
+        if group is None:
+            return QtCore.QModelIndex()
+
+        return self.createIndex(self.groups.index(group),0)
+
+    def rowCount(self,parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self.groups)
+
+        if parent.internalPointer() is None:
+            return self.groups[parent.row()].loaded
+
+        return 0
+
+    def columnCount(self,parent=QtCore.QModelIndex()):
+        return 1
+
+    def hasChildren(self,parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return bool(self.groups)
+
+        return parent.internalPointer() is None and bool(self.groups[parent.row()].items)
+
+    def data(self,index,role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        group = index.internalPointer()
+        if role == QtCore.Qt.DisplayRole:
+            if group is None:
+                return self.groups[index.row()].get_label()
+            return group.items[index.row()]
+
+        if role == QtCore.Qt.BackgroundRole and group is None:
+            return GROUP_COLOR
+
+        return None
+
+    def flags(self,index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+    def canFetchMore(self,parent):
+        if not parent.isValid() or parent.internalPointer() is not None:
+            return False
+
+        group = self.groups[parent.row()]
+
+        return group.loaded < len(group.items)
+
+    def fetchMore(self,parent):
+        group = self.groups[parent.row()]
+        count = min(FETCH_BATCH,len(group.items) - group.loaded)
+        if count <= 0:
+            return
+
+        self.beginInsertRows(parent,group.loaded,group.loaded + count - 1)
+        group.loaded += count
+        self.endInsertRows()
@@ -0,0 +1,126 @@
+"""
+Script Name: materialQCRules.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This module loads the rules of the Material QC tool (naming patterns, published path patterns and excluded nodes) from a
+             JSON or YAML rules file with optional per show overrides. The file is read once, every list of patterns is compiled into
+             a single alternation and the exclusions are kept as frozensets, so checking tens of thousands of names stays cheap.
+"""
+import collections
+import json
+import os
+import re
+
+RULES_ENV = "MATERIALQC_RULES" #path of the rules file to use instead of the default one
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),"materialQCRules.json")
+
+#compiled rules that the checks read
+QCRules = collections.namedtuple("QCRules",[
+    "shading_group", #regex of the correct shading group names
+    "shader", #regex of the correct shader names
+    "shading_group_suffix", #suffix added to fix a shading group name
+    "shader_suffix", #suffix added to fix a shader name
+    "published", #regex of the published texture paths
+    "excluded_textures", #frozenset of the file nodes that are never QCed
+    "excluded_shaders", #frozenset of the shaders that are never QCed
+    "excluded_shading_groups", #frozenset of the shading groups that are never QCed
+])
+
+_cache = {} #(path, mtime, show) : QCRules
+
+
+def read_rules_file(path):
+    """
+    This function reads a JSON or YAML rules file (YAML needs PyYAML)
+
+    Args:
+        path: path of the rules file
+    Returns:
+        rules : dict of the raw rules
+    """
+    with open(path) as f:
+        if os.path.splitext(path)[-1].lower() in (".yaml",".yml"):
+            import yaml
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+def merge_rules(base,override):
+    """
+    This function merges the override rules into the base rules, nested dicts are merged and everything else is replaced
+
+    Args:
+        base: dict of the raw rules
+        override: dict of the rules to merge on top
+    Returns:
+        merged : new dict of the raw rules
+    """
+    merged = dict(base)
+    for key,value in override.items():
+        if isinstance(value,dict) and isinstance(merged.get(key),dict):
+            merged[key] = merge_rules(merged[key],value)
+        else:
+            merged[key] = value
+
+    return merged
+
+def compile_patterns(patterns):
+    """
+    This function compiles a list of regex patterns into a single alternation, so a name is matched in one pass
+
+    Args:
+        patterns: list of regex patterns
+    Returns:
+        regex : compiled regex (matches nothing if there are no patterns)
+    """
+    if not patterns:
+        return re.compile(r"(?!)")
+
+    return re.compile("|".join("(?:{0})".format(pattern) for pattern in patterns))
+
+def compile_rules(rules,show=None):
+    """
+    This function applies the overrides of the show and compiles the raw rules
+
+    Args:
+        rules: dict of the raw rules
+        show: name of the show (or job) whose overrides are applied
+    Returns:
+        rules : QCRules
+    """
+    if show and show in rules.get("shows",{}):
+        rules = merge_rules(rules,rules["shows"][show])
+
+    naming = rules.get("naming",{})
+    shading_group = naming.get("shading_group",{})
+    shader = naming.get("shader",{})
+    exclusions = rules.get("exclusions",{})
+
+    return QCRules(
+        shading_group = compile_patterns(shading_group.get("patterns",[])),
+        shader = compile_patterns(shader.get("patterns",[])),
+        shading_group_suffix = shading_group.get("suffix",""),
+        shader_suffix = shader.get("suffix",""),
+        published = compile_patterns(rules.get("paths",{}).get("published",[])),
+        excluded_textures = frozenset(exclusions.get("textures",[])),
+        excluded_shaders = frozenset(exclusions.get("shaders",[])),
+        excluded_shading_groups = frozenset(exclusions.get("shading_groups",[])),
+    )
+
+def get_rules(path=None,show=None):
+    """
+    This is the main function of the module, it returns the compiled rules, reading the file only once (or again when it changes)
+
+    Args:
+        path: path of the rules file (MATERIALQC_RULES or the materialQCRules.json next to this script if None)
+        show: name of the show (or job) whose overrides are applied
+    Returns:
+        rules : QCRules
+    """
+    path = path or os.environ.get(RULES_ENV) or DEFAULT_RULES_PATH
+
+    key = (path,os.path.getmtime(path),show)
+    if key not in _cache:
+        _cache[key] = compile_rules(read_rules_file(path),show)
+
+    return _cache[key]
@@ -0,0 +1,722 @@
+"""
+Script Name: materialQCScene.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This module holds the scene index of the Material QC tool. The shading groups, their shaders and members and the file
+             texture paths are scanned once, then kept current through OpenMaya DG callbacks that only mark the changed nodes as dirty.
+             A refresh re-queries just the dirty nodes instead of rescanning the whole scene.
+             The checks read an immutable ShadingSnapshot of the index, which can also be built directly with a few bulk queries.
+"""
+import collections
+import re
+import types
+
+try:
+    import maya.cmds as cmds
+except ImportError:
+    cmds = None
+
+try:
+    import maya.api.OpenMaya as om2
+except ImportError: #lets the index be used with a stub cmds outside of maya
+    om2 = None
+
+import udimShellEngine
+
+#node types kept in the index
+SHADING_GROUP_TYPE = "shadingEngine"
+FILE_TYPE = "file"
+
+#attributes of the file nodes that change their path
+FILE_PATH_ATTRIBUTES = frozenset(["fileTextureName"])
+
+#output attributes of a file node that count as "used"
+FILE_OUTPUT_ATTRIBUTES = frozenset(["outColor","outColorR","outColorG","outColorB","outAlpha"])
+
+#face range of a shading group member, like 'pCube1.f[0:3]' or 'pCube1.f[7]'
+FACE_MEMBER_REGEX = re.compile(r"^(.+)\.f\[(\d+)(?::(\d+))?\]$")
+
+#default nodes that are never reported
+DEFAULT_MATERIALS = frozenset(["lambert1","particleCloud1"])
+DEFAULT_SHADING_GROUPS = frozenset(["initialShadingGroup","initialParticleSE"])
+
+#immutable view of the shading graph that every check consumes
+ShadingSnapshot = collections.namedtuple("ShadingSnapshot",[
+    "sg_shaders", #shading group : tuple of materials connected to its surface shader
+    "sg_members", #shading group : tuple of members
+    "texture_paths", #file node : texture path
+    "file_connections", #file node : tuple of its connected output attributes
+    "materials", #frozenset of all the materials in the scene
+])
+
+
+def freeze_snapshot(sg_shaders,sg_members,texture_paths,file_connections,materials):
+    """
+    This function turns the passed dicts into an immutable ShadingSnapshot (read only mappings of tuples)
+
+    Args:
+        sg_shaders: dict in format {SG: [materials]}
+        sg_members: dict in format {SG: [members]}
+        texture_paths: dict in format {file: path}
+        file_connections: dict in format {file: [connected output attributes]}
+        materials: list of all the materials
+    Returns:
+        snapshot : ShadingSnapshot
+    """
+    return ShadingSnapshot(
+        sg_shaders = types.MappingProxyType(dict((sg,tuple(shaders)) for sg,shaders in sg_shaders.items())),
+        sg_members = types.MappingProxyType(dict((sg,tuple(members)) for sg,members in sg_members.items())),
+        texture_paths = types.MappingProxyType(dict(texture_paths)),
+        file_connections = types.MappingProxyType(dict((node,tuple(attributes)) for node,attributes in file_connections.items())),
+        materials = frozenset(materials),
+    )
+
+def split_plug(plug):
+    """
+    This function splits a plug name into its node and attribute
+
+    Args:
+        plug: plug name like 'node.attr[0]'
+    Returns:
+        node : name of the node
+        attribute : attribute part of the plug
+    """
+    node, _, attribute = plug.partition(".")
+
+    return node, attribute
+
+def query_shading_groups(shading_groups,materials):
+    """
+    This function gets the surface shaders and members of the passed shading groups with one listConnections call over all of them.
+    Only the shading groups with face assignments are queried with sets, to get their component strings
+
+    Args:
+        shading_groups: list of shading groups
+        materials: set of all the materials in the scene
+    Returns:
+        sg_shaders : a dict in format {SG: [materials]}
+        sg_members : a dict in format {SG: [members]}
+    """
+    sg_shaders = dict((sg,[]) for sg in shading_groups)
+    sg_members = dict((sg,[]) for sg in shading_groups)
+
+    if not shading_groups:
+        return sg_shaders, sg_members
+
+    #pairs of (shading group plug, source plug)
+    connections = cmds.listConnections(shading_groups,source=True,destination=False,connections=True,plugs=True) or []
+
+    face_sets = set() #shading groups with per face members
+    for sg_plug,source_plug in zip(connections[0::2],connections[1::2]):
+        sg, attribute = split_plug(sg_plug)
+        source_node = split_plug(source_plug)[0]
+
+        if attribute == "surfaceShader":
+            if source_node in materials:
+                sg_shaders[sg].append(source_node)
+        elif attribute.startswith("dagSetMembers"):
+            if ".objectGroups[" in source_plug:
+                face_sets.add(sg)
+            else:
+                sg_members[sg].append(source_node)
+
+    for sg in face_sets:
+        sg_members[sg] = cmds.sets(sg,query=True) or []
+
+    return sg_shaders, sg_members
+
+def query_texture_paths(file_nodes):
+    """
+    This function reads the texture path of the passed file nodes through the API (getAttr outside of maya)
+
+    Args:
+        file_nodes: list of file nodes
+    Returns:
+        texture_paths : a dict in format {file: path}
+    """
+    if om2 is None:
+        return dict((file_node,cmds.getAttr(file_node + ".fileTextureName") or "") for file_node in file_nodes)
+
+    selection_list = om2.MSelectionList()
+    for file_node in file_nodes:
+        selection_list.add(file_node)
+
+    texture_paths = {}
+    for index,file_node in enumerate(file_nodes):
+        node_fn = om2.MFnDependencyNode(selection_list.getDependNode(index))
+        texture_paths[file_node] = node_fn.findPlug("fileTextureName",False).asString()
+
+    return texture_paths
+
+def query_file_connections(file_nodes):
+    """
+    This function gets the connected output attributes of the passed file nodes with one listConnections call
+
+    Args:
+        file_nodes: list of file nodes
+    Returns:
+        file_connections : a dict in format {file: [connected output attributes]}
+    """
+    file_connections = dict((file_node,[]) for file_node in file_nodes)
+
+    if not file_nodes:
+        return file_connections
+
+    #pairs of (file plug, destination plug)
+    connections = cmds.listConnections(file_nodes,source=False,destination=True,connections=True,plugs=True) or []
+
+    for file_plug in connections[0::2]:
+        file_node, attribute = split_plug(file_plug)
+        if file_node in file_connections:
+            file_connections[file_node].append(attribute)
+
+    return file_connections
+
+def find_unused_textures(snapshot,file_nodes=None):
+    """
+    This function returns the file nodes without any connected output attribute, from the connections of the snapshot (no per node calls)
+
+    Args:
+        snapshot: ShadingSnapshot of the scene
+        file_nodes: file nodes to test (all the file nodes of the snapshot if None)
+    Returns:
+        unused_textures : list of the unused file nodes
+    """
+    if file_nodes is None:
+        file_nodes = snapshot.texture_paths.keys()
+
+    file_connections = snapshot.file_connections
+
+    return [file_node for file_node in file_nodes if FILE_OUTPUT_ATTRIBUTES.isdisjoint(file_connections.get(file_node,()))]
+
+def find_unused_shaders(snapshot,shading_groups=None):
+    """
+    This function returns the materials of the shading groups that are not assigned to anything, as a set difference of the materials
+    of the shading groups and the materials of the shading groups with members (default materials excluded). Materials without a
+    shading group (library materials, standardSurface1) are not candidates
+
+    Args:
+        snapshot: ShadingSnapshot of the scene
+        shading_groups: only test the materials of these shading groups (every shading group of the scene if None)
+    Returns:
+        unused_shaders : sorted list of the unused materials
+    """
+    #materials that have at least one member through any shading group of the scene
+    used = set()
+    for sg,members in snapshot.sg_members.items():
+        if members:
+            used.update(snapshot.sg_shaders.get(sg,()))
+
+    if shading_groups is None:
+        shading_groups = snapshot.sg_shaders.keys()
+
+    candidates = set()
+    for sg in shading_groups:
+        candidates.update(snapshot.sg_shaders.get(sg,()))
+
+    return sorted(candidates - used - DEFAULT_MATERIALS)
+
+def get_member_nodes(member):
+    """
+    This function returns the names of the nodes in the path of a shading group member, e.g. "|grp|pCube1.f[0:3]" gives grp and pCube1
+
+    Args:
+        member: member of a shading group (a node or a component, short or full path)
+    Returns:
+        nodes : list of the node names
+    """
+    return [node for node in member.split(".")[0].split("|") if node]
+
+def get_member_faces(member):
+    """
+    This function splits a shading group member into its mesh and the faces it covers
+
+    Args:
+        member: member of a shading group (a mesh or a face range)
+    Returns:
+        mesh : name of the mesh
+        faces : range of the face indices (None for the whole mesh)
+    """
+    match = FACE_MEMBER_REGEX.match(member)
+    if match is None:
+        return member.split(".")[0], None
+
+    start = int(match.group(2))
+    end = int(match.group(3) or start)
+
+    return match.group(1), range(start,end+1)
+
+def query_texture_tiles(snapshot,file_nodes):
+    """
+    This function gets the UDIM tiles that the passed file nodes must have on disk, the tiles used by the UV shells of the meshes
+    (or faces) assigned to the shading groups downstream of every file node. Every mesh is read once, however many textures it has
+
+    Args:
+        snapshot: ShadingSnapshot of the scene
+        file_nodes: list of the file nodes with a UDIM texture
+    Returns:
+        texture_tiles : a dict in format {file: frozenset of UDIM tiles}
+    """
+    shell_data = {} #mesh : shell data of udimShellEngine, None for the members that arent meshes
+
+    texture_tiles = {}
+    for file_node in file_nodes:
+        shading_groups = cmds.ls(cmds.listHistory(file_node,future=True,pruneDagObjects=True) or [],type=SHADING_GROUP_TYPE) or []
+
+        tiles = set()
+        for sg in shading_groups:
+            for member in snapshot.sg_members.get(sg,()):
+                mesh, faces = get_member_faces(member)
+                if mesh not in shell_data:
+                    try:
+                        shell_data[mesh] = udimShellEngine.get_udim_shell_data(mesh)
+                    except RuntimeError: #nurbs and other non mesh members
+                        shell_data[mesh] = None
+
+                if shell_data[mesh] is not None:
+                    tiles.update(udimShellEngine.get_used_tiles(shell_data[mesh],faces))
+
+        texture_tiles[file_node] = frozenset(tiles)
+
+    return texture_tiles
+
+def select_nodes(nodes,hierarchy=False):
+    """
+    This function replaces the active selection with the passed nodes in one go (one selection changed event, however many nodes).
+    The hierarchy of the DAG nodes is expanded with a single ls call, sets are selected as nodes and not as their members
+
+    Args:
+        nodes: list of nodes or components
+        hierarchy: if True, also select every DAG descendant of the nodes
+    Returns:
+        missing : list of the nodes that dont exist anymore
+    """
+    nodes = list(collections.OrderedDict.fromkeys(node for node in nodes if node)) #unique, in order
+
+    if om2 is None:
+        existing = [node for node in nodes if cmds.objExists(node)]
+        if hierarchy and existing:
+            existing = existing + (cmds.ls([node for node in existing if "." not in node],dag=True,long=True) or [])
+        if existing:
+            cmds.select(existing,replace=True,noExpand=True)
+        else:
+            cmds.select(clear=True)
+        return [node for node in nodes if node not in existing]
+
+    selection_list = om2.MSelectionList()
+    existing = []
+    missing = []
+    for node in nodes:
+        try:
+            selection_list.add(node)
+            existing.append(node)
+        except RuntimeError: #deleted or renamed since the QC
+            missing.append(node)
+
+    if hierarchy:
+        dag_nodes = [node for node in existing if "." not in node] #components have no hierarchy
+        for descendant in (cmds.ls(dag_nodes,dag=True,long=True) or [] if dag_nodes else []):
+            selection_list.add(descendant)
+
+    om2.MGlobal.setActiveSelectionList(selection_list,om2.MGlobal.kReplaceList)
+
+    return missing
+
+def apply_renames(plan,chunk_name="materialQC_rename"):
+    """
+    This function applies a rename plan in a single undo chunk
+
+    Args:
+        plan: dict in format {current name: new name}
+        chunk_name: name of the undo chunk
+    Returns:
+        renamed : a dict in format {current name: name given by maya}
+        failed : a dict in format {current name: error}
+    """
+    renamed = collections.OrderedDict()
+    failed = collections.OrderedDict()
+
+    cmds.undoInfo(openChunk=True,chunkName=chunk_name)
+    try:
+        for name,new_name in plan.items():
+            try:
+                renamed[name] = cmds.rename(name,new_name)
+            except RuntimeError as error: #locked, referenced or deleted nodes
+                failed[name] = str(error)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return renamed, failed
+
+def build_snapshot():
+    """
+    This function builds the ShadingSnapshot of the whole scene with a few bulk queries (no per node calls)
+
+    Args:
+        None
+    Returns:
+        snapshot : ShadingSnapshot
+    """
+    typed_nodes = cmds.ls(type=[SHADING_GROUP_TYPE,FILE_TYPE],showType=True) or []
+    shading_groups = [node for node,node_type in zip(typed_nodes[0::2],typed_nodes[1::2]) if node_type == SHADING_GROUP_TYPE]
+    file_nodes = [node for node,node_type in zip(typed_nodes[0::2],typed_nodes[1::2]) if node_type == FILE_TYPE]
+
+    materials = frozenset(cmds.ls(materials=True) or [])
+
+    sg_shaders, sg_members = query_shading_groups(shading_groups,materials)
+
+    return freeze_snapshot(sg_shaders,sg_members,query_texture_paths(file_nodes),query_file_connections(file_nodes),materials)
+
+
+class SceneIndex(object):
+    """
+    This class keeps an index of the shading groups and file textures of the scene, updated incrementally through DG callbacks
+
+    Methods:
+        __init__: Initializes the empty index
+        build: This function scans the whole scene once and fills the index
+        reset: This function empties the index, so the next refresh rebuilds it
+        refresh: This function re-queries the dirty nodes (or builds the index if it was never built)
+        query_node: This function queries a single node and updates its entries in the index
+        remove_node: This function removes a node from the index
+        mark_dirty: This function marks a node to be re-queried on the next refresh
+        get_shaders: This function returns the materials connected to the surface shader of a shading group
+        get_members: This function returns the members of a shading group
+        snapshot: This function returns an immutable ShadingSnapshot of the index
+        start: This function registers the DG callbacks that keep the index current
+        stop: This function removes all the callbacks of the index
+    """
+    def __init__(self):
+        """
+        This is the Constructor function to initialize the empty index
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.shading_groups = {} #shading group : list of materials connected to its surface shader
+        self.sg_members = {} #shading group : list of members
+        self.texture_paths = {} #file node : texture path
+        self.file_connections = {} #file node : list of its connected output attributes
+        self.materials = frozenset() #all the materials, as of the last refresh
+
+        self.dirty = set() #names of the nodes to re-query on the next refresh
+        self.built = False
+
+        self.callback_ids = [] #scene wide callbacks
+        self.node_callback_ids = {} #hash of the node handle : attribute changed callback of the node
+
+        #stats, to see what a refresh cost
+        self.full_scans = 0
+        self.node_queries = 0
+
+    def build(self):
+        """
+        This function scans the whole scene once with the bulk snapshot queries and fills the index
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        snapshot = build_snapshot()
+
+        self.shading_groups = dict((sg,list(shaders)) for sg,shaders in snapshot.sg_shaders.items())
+        self.sg_members = dict((sg,list(members)) for sg,members in snapshot.sg_members.items())
+        self.texture_paths = dict(snapshot.texture_paths)
+        self.file_connections = dict((node,list(attributes)) for node,attributes in snapshot.file_connections.items())
+        self.materials = snapshot.materials
+
+        self.dirty = set()
+        self.built = True
+        self.full_scans += 1
+
+    def reset(self):
+        """
+        This function empties the index, so the next refresh rebuilds it (used when a new scene is opened)
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.shading_groups = {}
+        self.sg_members = {}
+        self.texture_paths = {}
+        self.file_connections = {}
+        self.materials = frozenset()
+        self.dirty = set()
+        self.built = False
+
+    def refresh(self):
+        """
+        This function re-queries the dirty nodes (or builds the index if it was never built)
+
+        Args:
+            None
+        Returns:
+            number of nodes that were queried
+        """
+        if not self.built:
+            self.build()
+            return len(self.shading_groups) + len(self.texture_paths)
+
+        dirty = self.dirty
+        self.dirty = set()
+        for node in dirty:
+            self.query_node(node)
+
+        self.materials = frozenset(cmds.ls(materials=True) or []) #one bulk call, shaders are not tracked by the callbacks
+
+        return len(dirty)
+
+    def query_node(self,node):
+        """
+        This function queries a single node and updates its entries in the index
+
+        Args:
+            node: name of the shading group or file node
+        Returns:
+            None
+        """
+        self.node_queries += 1
+
+        if not cmds.objExists(node):
+            self.remove_node(node)
+            return
+
+        node_type = cmds.nodeType(node)
+        if node_type == SHADING_GROUP_TYPE:
+            self.shading_groups[node] = cmds.ls(cmds.listConnections(node + ".surfaceShader") or [], materials=True)
+            self.sg_members[node] = cmds.sets(node, query=True) or []
+        elif node_type == FILE_TYPE:
+            self.texture_paths[node] = cmds.getAttr(node + ".fileTextureName") or ""
+            self.file_connections[node] = query_file_connections([node])[node]
+
+    def remove_node(self,node):
+        """
+        This function removes a node from the index
+
+        Args:
+            node: name of the node
+        Returns:
+            None
+        """
+        self.shading_groups.pop(node,None)
+        self.sg_members.pop(node,None)
+        self.texture_paths.pop(node,None)
+        self.file_connections.pop(node,None)
+        self.dirty.discard(node)
+
+    def mark_dirty(self,node):
+        """
+        This function marks a node to be re-queried on the next refresh
+
+        Args:
+            node: name of the node
+        Returns:
+            None
+        """
+        if self.built:
+            self.dirty.add(node)
+
+    def get_shaders(self,shading_group):
+        """
+        This function returns the materials connected to the surface shader of a shading group
+
+        Args:
+            shading_group: name of the shading group
+        Returns:
+            list of materials
+        """
+        return self.shading_groups.get(shading_group,[])
+
+    def get_members(self,shading_group):
+        """
+        This function returns the members of a shading group
+
+        Args:
+            shading_group: name of the shading group
+        Returns:
+            list of members
+        """
+        return self.sg_members.get(shading_group,[])
+
+    def snapshot(self):
+        """
+        This function returns an immutable ShadingSnapshot of the index (call refresh first to include the latest changes)
+
+        Args:
+            None
+        Returns:
+            snapshot : ShadingSnapshot
+        """
+        return freeze_snapshot(self.shading_groups,self.sg_members,self.texture_paths,self.file_connections,self.materials)
+
+    ####### CALLBACKS #######
+
+    def start(self):
+        """
+        This function registers the DG callbacks that keep the index current
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        if self.callback_ids:
+            return #already running
+
+        for node_type in (SHADING_GROUP_TYPE,FILE_TYPE):
+            self.callback_ids.append(om2.MDGMessage.addNodeAddedCallback(self.node_added,node_type))
+            self.callback_ids.append(om2.MDGMessage.addNodeRemovedCallback(self.node_removed,node_type))
+
+        self.callback_ids.append(om2.MDGMessage.addConnectionCallback(self.connection_changed))
+        self.callback_ids.append(om2.MNodeMessage.addNameChangedCallback(om2.MObject.kNullObj,self.name_changed))
+        self.callback_ids.append(om2.MSceneMessage.addCallback(om2.MSceneMessage.kAfterOpen,self.scene_changed))
+        self.callback_ids.append(om2.MSceneMessage.addCallback(om2.MSceneMessage.kAfterNew,self.scene_changed))
+
+        #path changes of the existing file nodes
+        iterator = om2.MItDependencyNodes(om2.MFn.kFileTexture)
+        while not iterator.isDone():
+            self.add_file_callback(iterator.thisNode())
+            iterator.next()
+
+    def stop(self):
+        """
+        This function removes all the callbacks of the index
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        callback_ids = self.callback_ids + list(self.node_callback_ids.values())
+        if callback_ids:
+            om2.MMessage.removeCallbacks(callback_ids)
+
+        self.callback_ids = []
+        self.node_callback_ids = {}
+
+    def add_file_callback(self,node):
+        """
+        This function registers the attribute changed callback of a file node
+
+        Args:
+            node: MObject of the file node
+        Returns:
+            None
+        """
+        handle = om2.MObjectHandle(node).hashCode()
+        if handle not in self.node_callback_ids:
+            self.node_callback_ids[handle] = om2.MNodeMessage.addAttributeChangedCallback(node,self.attribute_changed)
+
+    def node_added(self,node,client_data):
+        """
+        This callback marks a new shading group or file node as dirty
+
+        Args:
+            node: MObject of the added node
+            client_data: unused
+        Returns:
+            None
+        """
+        self.mark_dirty(om2.MFnDependencyNode(node).name())
+
+        if node.hasFn(om2.MFn.kFileTexture):
+            self.add_file_callback(node)
+
+    def node_removed(self,node,client_data):
+        """
+        This callback removes a deleted shading group or file node from the index
+
+        Args:
+            node: MObject of the removed node
+            client_data: unused
+        Returns:
+            None
+        """
+        self.remove_node(om2.MFnDependencyNode(node).name())
+
+        callback_id = self.node_callback_ids.pop(om2.MObjectHandle(node).hashCode(),None)
+        if callback_id is not None:
+            om2.MMessage.removeCallback(callback_id)
+
+    def connection_changed(self,source_plug,destination_plug,made,client_data):
+        """
+        This callback marks a shading group as dirty when its surface shader or members are connected or disconnected,
+        and a file node when its outputs are connected or disconnected
+
+        Args:
+            source_plug: MPlug of the source
+            destination_plug: MPlug of the destination
+            made: True if the connection was made, False if it was broken
+            client_data: unused
+        Returns:
+            None
+        """
+        destination = destination_plug.node()
+        if destination.hasFn(om2.MFn.kShadingEngine):
+            self.mark_dirty(om2.MFnDependencyNode(destination).name())
+
+        source = source_plug.node()
+        if source.hasFn(om2.MFn.kFileTexture):
+            self.mark_dirty(om2.MFnDependencyNode(source).name())
+
+    def attribute_changed(self,message,plug,other_plug,client_data):
+        """
+        This callback marks a file node as dirty when its texture path is set
+
+        Args:
+            message: attribute message flags
+            plug: MPlug of the changed attribute
+            other_plug: MPlug on the other side of a connection
+            client_data: unused
+        Returns:
+            None
+        """
+        if message & om2.MNodeMessage.kAttributeSet and plug.partialName(useLongNames=True) in FILE_PATH_ATTRIBUTES:
+            self.mark_dirty(om2.MFnDependencyNode(plug.node()).name())
+
+    def name_changed(self,node,previous_name,client_data):
+        """
+        This callback keeps the index keyed by the current node names. Renamed shading groups and file nodes move to their new name,
+        shading groups that point to a renamed shader or member are re-queried
+
+        Args:
+            node: MObject of the renamed node
+            previous_name: name of the node before the rename
+            client_data: unused
+        Returns:
+            None
+        """
+        if not self.built or not previous_name:
+            return
+
+        name = om2.MFnDependencyNode(node).name()
+
+        if node.hasFn(om2.MFn.kShadingEngine) or node.hasFn(om2.MFn.kFileTexture):
+            self.remove_node(previous_name)
+            self.mark_dirty(name)
+            return
+
+        #shaders and members are stored by name in the shading group entries
+        for shading_group,shaders in self.shading_groups.items():
+            if previous_name in shaders:
+                self.mark_dirty(shading_group)
+        for shading_group,members in self.sg_members.items():
+            if any(previous_name in get_member_nodes(member) for member in members):
+                self.mark_dirty(shading_group)
+
+    def scene_changed(self,client_data):
+        """
+        This callback empties the index when a scene is opened or a new scene is made
+
+        Args:
+            client_data: unused
+        Returns:
+            None
+        """
+        self.reset()
@@ -0,0 +1,479 @@
+"""
+Script Name: materialQCTextures.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This module validates the texture paths of the Material QC tool on disk. UDIM, UV tile and frame tokens are expanded
+             against the files of their directory, the directories are listed concurrently with a bounded thread pool and the
+             listings are cached with their mtime, so a second QC run within the TTL doesnt touch the filesystem at all.
+             It also finds the same image behind different paths by hashing only the files that share a size, with the hashes cached on disk.
+"""
+import collections
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_TTL = 300.0 #seconds a directory listing is trusted without checking its mtime
+MAX_WORKERS = 16 #directories listed or files hashed at the same time, kept low so we dont flood the file server
+
+#content hashing of the duplicate textures
+HASH_CACHE_PATH = os.environ.get("MATERIALQC_HASH_CACHE",os.path.join(os.path.expanduser("~"),".materialQC_texture_hashes.json"))
+HASH_CHUNK = 1024*1024 #bytes read at a time
+PARTIAL_HASH_SIZE = 64*1024 #bytes hashed from the start of the file before hashing the whole file
+
+#tokens of a texture path and the regex they expand to
+TOKEN_REGEX = re.compile(r"(<udim>|<uvtile>|<f>|#+)",re.IGNORECASE)
+UDIM_TOKEN = "<udim>"
+TOKEN_PATTERNS = {
+    "<udim>" : r"(\d{4})",
+    "<uvtile>" : r"(u\d+_v\d+)",
+    "<f>" : r"(\d+)",
+}
+
+#cached listing of a directory
+DirectoryEntry = collections.namedtuple("DirectoryEntry",[
+    "mtime", #mtime of the directory when it was listed (None if it doesnt exist)
+    "checked", #time the listing was last confirmed
+    "files", #frozenset of the file names in the directory
+])
+
+#result of a single texture path
+TextureResult = collections.namedtuple("TextureResult",[
+    "path", #texture path as written on the file node
+    "exists", #True if the file (or at least one tile) exists
+    "files", #tuple of the matching files on disk
+    "udims", #frozenset of the UDIM tiles found on disk (empty if the first token isnt <UDIM>)
+])
+
+
+def get_file_pattern(file_name):
+    """
+    This function turns a file name with UDIM, UV tile or frame tokens into a compiled regex (None if it has no tokens)
+
+    Args:
+        file_name: file name like 'diffuse.<UDIM>.exr' or 'smoke.####.exr'
+    Returns:
+        pattern : compiled regex matching the expanded file names, with the UDIM numbers in group 1 if the first token is <UDIM>
+    """
+    parts = TOKEN_REGEX.split(file_name)
+    if len(parts) == 1:
+        return None
+
+    regex = ""
+    for index,part in enumerate(parts):
+        if index % 2 == 0: #literal text
+            regex += re.escape(part)
+        elif part.startswith("#"):
+            regex += r"(\d{" + str(len(part)) + r",})"
+        else:
+            regex += TOKEN_PATTERNS[part.lower()]
+
+    return re.compile(regex + "$")
+
+def has_udim_token(path):
+    """
+    This function returns True if the first token of the file name of the passed texture path is <UDIM>
+
+    Args:
+        path: texture path
+    Returns:
+        True or False
+    """
+    match = TOKEN_REGEX.search(os.path.basename(path))
+
+    return bool(match) and match.group(0).lower() == UDIM_TOKEN
+
+def list_directory(directory,cached=None,now=None):
+    """
+    This function lists a directory, reusing the cached listing if the mtime of the directory didnt change
+
+    Args:
+        directory: path of the directory
+        cached: DirectoryEntry of the last listing (None if never listed)
+        now: current time (time.time() if None)
+    Returns:
+        entry : DirectoryEntry
+        calls : number of filesystem calls made
+    """
+    now = time.time() if now is None else now
+
+    try:
+        mtime = os.stat(directory).st_mtime
+    except OSError:
+        return DirectoryEntry(None,now,frozenset()), 1
+
+    if cached is not None and cached.mtime == mtime:
+        return cached._replace(checked=now), 1
+
+    try:
+        files = frozenset(os.listdir(directory))
+    except OSError:
+        files = frozenset()
+
+    return DirectoryEntry(mtime,now,files), 2
+
+
+def hash_file(path,limit=None):
+    """
+    This function hashes a file, streamed in chunks so big textures are never fully loaded
+
+    Args:
+        path: path of the file
+        limit: number of bytes to hash from the start of the file (the whole file if None)
+    Returns:
+        digest : hex digest of the content
+    """
+    digest = hashlib.sha1()
+    remaining = limit
+
+    with open(path,"rb") as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(HASH_CHUNK if remaining is None else min(HASH_CHUNK,remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+
+    return digest.hexdigest()
+
+def group_by_hash(files,kind,cache,max_workers=MAX_WORKERS):
+    """
+    This function splits a list of files of the same size into groups with the same partial or full hash.
+    The files are hashed concurrently, reusing the cached hashes
+
+    Args:
+        files: list of (realpath, stat) with the same size
+        kind: "partial" or "full"
+        cache: TextureHashCache
+        max_workers: number of files hashed at the same time
+    Returns:
+        groups : list of lists of (realpath, stat) with more than one file
+    """
+    def get_hash(item):
+        path, stat = item
+        digest = cache.get(stat,kind)
+        if digest is not None:
+            return digest, False
+        try:
+            return hash_file(path,PARTIAL_HASH_SIZE if kind == "partial" else None), True
+        except (IOError,OSError):
+            return None, False
+
+    with ThreadPoolExecutor(max_workers=min(max_workers,len(files))) as executor:
+        digests = list(executor.map(get_hash,files))
+
+    groups = collections.defaultdict(list)
+    for item,(digest,computed) in zip(files,digests):
+        if digest is None:
+            continue
+        if computed:
+            cache.set(item[1],kind,digest) #cache writes stay on this thread
+        groups[digest].append(item)
+
+    return [group for group in groups.values() if len(group) > 1]
+
+def find_duplicate_files(paths,cache,max_workers=MAX_WORKERS):
+    """
+    This function finds the texture paths that point to the same image through different paths (copies, symlinks, mount aliases).
+    The paths are normalized with realpath, bucketed by size and only the files sharing a size are hashed, first the start of the
+    file then the whole file. Paths with tokens are only compared by their normalized path
+
+    Args:
+        paths: list of texture paths
+        cache: TextureHashCache
+        max_workers: number of files hashed at the same time
+    Returns:
+        duplicates : list of lists of the texture paths sharing the same content (each list has more than one path)
+    """
+    by_real_path = collections.defaultdict(set) #realpath : texture paths
+    for path in set(path for path in paths if path):
+        by_real_path[os.path.realpath(os.path.expandvars(path))].add(path)
+
+    #bucket the files by size
+    sizes = collections.defaultdict(list)
+    for real_path in by_real_path:
+        if TOKEN_REGEX.search(os.path.basename(real_path)):
+            continue
+        try:
+            stat = os.stat(real_path)
+        except OSError:
+            continue
+        sizes[stat.st_size].append((real_path,stat))
+
+    #same size, then same start of the file, then same content
+    same_files = []
+    for size,files in sizes.items():
+        if len(files) < 2:
+            continue
+        for group in group_by_hash(files,"partial",cache,max_workers):
+            if size > PARTIAL_HASH_SIZE:
+                same_files.extend(group_by_hash(group,"full",cache,max_workers))
+            else: #the partial hash already covers the whole file
+                same_files.append(group)
+
+    cache.save()
+
+    #map the real paths back to the texture paths
+    duplicates = []
+    grouped = set()
+    for group in same_files:
+        duplicates.append(sorted(path for real_path,stat in group for path in by_real_path[real_path]))
+        grouped.update(real_path for real_path,stat in group)
+
+    #different paths resolving to the same file (symlinks, mount aliases)
+    for real_path,texture_paths in by_real_path.items():
+        if len(texture_paths) > 1 and real_path not in grouped:
+            duplicates.append(sorted(texture_paths))
+
+    return sorted(duplicates)
+
+
+class TextureValidator(object):
+    """
+    This class checks that the texture paths exist on disk, caching the directory listings by path with their mtime and a TTL
+
+    Methods:
+        __init__: Initializes the empty cache
+        clear: This function empties the cache
+        get_stale_directories: This function returns the directories that have to be checked on disk
+        update_directories: This function lists the passed directories concurrently and caches them
+        validate_path: This function validates a single path against the cached listings
+        validate: This function validates a list of paths
+        find_duplicates: This function finds the paths sharing the same image content
+    """
+    def __init__(self,ttl=DEFAULT_TTL,max_workers=MAX_WORKERS):
+        """
+        This is the Constructor function to initialize the empty cache
+
+        Args:
+            ttl: seconds a directory listing is trusted without checking its mtime
+            max_workers: number of directories listed at the same time
+        Returns:
+            None
+        """
+        self.ttl = ttl
+        self.max_workers = max_workers
+
+        self.directories = {} #directory : DirectoryEntry
+        self.hashes = None #TextureHashCache, loaded on the first find_duplicates
+
+        #stats, to see what a validation cost
+        self.fs_calls = 0
+
+    def clear(self):
+        """
+        This function empties the cache, so the next validation checks every directory again
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.directories = {}
+
+    def get_stale_directories(self,directories,now):
+        """
+        This function returns the directories that were never listed or whose listing is older than the TTL
+
+        Args:
+            directories: set of directories
+            now: current time
+        Returns:
+            stale : list of directories
+        """
+        stale = []
+        for directory in directories:
+            entry = self.directories.get(directory)
+            if entry is None or now - entry.checked > self.ttl:
+                stale.append(directory)
+
+        return stale
+
+    def update_directories(self,directories,now=None):
+        """
+        This function lists the passed directories concurrently with a bounded thread pool and caches the listings
+
+        Args:
+            directories: list of directories
+            now: current time (time.time() if None)
+        Returns:
+            None
+        """
+        if not directories:
+            return
+
+        now = time.time() if now is None else now
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers,len(directories))) as executor:
+            results = list(executor.map(lambda directory : list_directory(directory,self.directories.get(directory),now),directories))
+
+        #merge the results on this thread
+        for directory,(entry,calls) in zip(directories,results):
+            self.directories[directory] = entry
+            self.fs_calls += calls
+
+    def validate_path(self,path):
+        """
+        This function validates a single path against the cached listing of its directory (no filesystem calls)
+
+        Args:
+            path: texture path
+        Returns:
+            result : TextureResult
+        """
+        directory, file_name = os.path.split(os.path.expandvars(path))
+        files = self.directories[directory].files
+
+        pattern = get_file_pattern(file_name)
+        if pattern is None:
+            exists = file_name in files
+            return TextureResult(path,exists,(os.path.join(directory,file_name),) if exists else (),frozenset())
+
+        matches = []
+        for name in files:
+            match = pattern.match(name)
+            if match:
+                matches.append((name,match))
+
+        udims = frozenset()
+        if has_udim_token(file_name):
+            udims = frozenset(int(match.group(1)) for name,match in matches)
+
+        found = tuple(sorted(os.path.join(directory,name) for name,match in matches))
+
+        return TextureResult(path,bool(found),found,udims)
+
+    def validate(self,paths,now=None):
+        """
+        This is the main function of the validator, it refreshes the stale directories and validates every path
+
+        Args:
+            paths: list of texture paths
+            now: current time (time.time() if None)
+        Returns:
+            results : a dict in format {path: TextureResult}
+        """
+        now = time.time() if now is None else now
+
+        paths = set(path for path in paths if path)
+        directories = set(os.path.dirname(os.path.expandvars(path)) for path in paths)
+
+        self.update_directories(self.get_stale_directories(directories,now),now)
+
+        return dict((path,self.validate_path(path)) for path in paths)
+
+    def find_duplicates(self,paths):
+        """
+        This function finds the texture paths sharing the same image content, with the hashes cached on disk
+
+        Args:
+            paths: list of texture paths
+        Returns:
+            duplicates : list of lists of the texture paths sharing the same content
+        """
+        if self.hashes is None:
+            self.hashes = TextureHashCache()
+
+        return find_duplicate_files(paths,self.hashes,self.max_workers)
+
+
+class TextureHashCache(object):
+    """
+    This class keeps the content hashes of the texture files on disk, keyed by device+inode and invalidated by size and mtime
+
+    Methods:
+        __init__: Initializes the cache and loads it from disk
+        load: This function loads the cache file
+        save: This function writes the cache file if anything changed
+        get: This function returns a cached hash of a file
+        set: This function stores a hash of a file
+    """
+    def __init__(self,path=None):
+        """
+        This is the Constructor function to initialize the cache and load it from disk
+
+        Args:
+            path: path of the cache file (HASH_CACHE_PATH if None)
+        Returns:
+            None
+        """
+        self.path = path or HASH_CACHE_PATH
+        self.entries = {} #"device:inode" : {"size","mtime","partial","full"}
+        self.changed = False
+
+        self.load()
+
+    def load(self):
+        """
+        This function loads the cache file (an unreadable cache is just ignored)
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (IOError,OSError,ValueError):
+            self.entries = {}
+
+    def save(self):
+        """
+        This function writes the cache file if anything changed, through a temporary file so a crash never leaves half a cache
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        if not self.changed:
+            return
+
+        temp_path = "{0}.{1}.tmp".format(self.path,os.getpid())
+        try:
+            with open(temp_path,"w") as f:
+                json.dump(self.entries,f)
+            os.replace(temp_path,self.path)
+            self.changed = False
+        except (IOError,OSError):
+            print("Could not save the texture hash cache to {0}".format(self.path))
+
+    def get(self,stat,kind):
+        """
+        This function returns a cached hash of a file, if the file didnt change since it was hashed
+
+        Args:
+            stat: os.stat result of the file
+            kind: "partial" or "full"
+        Returns:
+            hash string or None
+        """
+        entry = self.entries.get("{0}:{1}".format(stat.st_dev,stat.st_ino))
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return entry.get(kind)
+
+        return None
+
+    def set(self,stat,kind,digest):
+        """
+        This function stores a hash of a file
+
+        Args:
+            stat: os.stat result of the file
+            kind: "partial" or "full"
+            digest: hash string
+        Returns:
+            None
+        """
+        key = "{0}:{1}".format(stat.st_dev,stat.st_ino)
+        entry = self.entries.get(key)
+        if not entry or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime:
+            entry = self.entries[key] = {"size" : stat.st_size, "mtime" : stat.st_mtime}
+
+        entry[kind] = digest
+        self.changed = True
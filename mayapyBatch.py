@@ -0,0 +1,125 @@
+"""
+Script Name: mayapyBatch.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This module holds the mayapy fan out shared by the batch command lines (udimBatchSeperator, materialQCBatch). Every file is
+             sent to its own mayapy process that re-runs the calling script in worker mode (--worker/--result) and writes its result
+             to a temporary JSON file, while a thread pool keeps one process per core busy and collects the results in order.
+"""
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAYAPY = os.environ.get("MAYAPY","mayapy") #mayapy executable used for the workers
+
+LOG_TAIL = 4000 #number of characters of the worker log kept in the report
+
+
+def add_arguments(parser):
+    """
+    This function adds the arguments shared by the batch command lines, the mayapy options and the hidden worker mode ones
+
+    Args:
+        parser: argparse.ArgumentParser of the command line
+    Returns:
+        None
+    """
+    parser.add_argument("--mayapy",default=DEFAULT_MAYAPY,help="mayapy executable")
+    parser.add_argument("--processes",type=int,default=None,help="number of parallel mayapy processes (default: number of cores)")
+    parser.add_argument("--worker",default=None,help=argparse.SUPPRESS) #file to process inside mayapy
+    parser.add_argument("--result",default=None,help=argparse.SUPPRESS) #result json of the worker
+
+def write_result(result_path,result):
+    """
+    This function writes the result of a worker, it is called in worker mode inside mayapy
+
+    Args:
+        result_path: path passed with --result
+        result: dict containing the result of the file
+    Returns:
+        None
+    """
+    with open(result_path,"w") as f:
+        json.dump(result,f,indent = 4)
+
+def run_mayapy_worker(script,path,arguments,error_result,mayapy=DEFAULT_MAYAPY):
+    """
+    This function launches one mayapy process that runs the script in worker mode on the passed file, and returns its result
+
+    Args:
+        script: path of the command line script to run inside mayapy
+        path: path of the file to process
+        arguments: list of the extra command line arguments of the worker
+        error_result: callable in format error_result(path,message) -> result dict, used if the worker dies before writing its result
+        mayapy: mayapy executable
+    Returns:
+        result : a dict containing the result of the file (with the "returncode" and the end of the "log" of the worker)
+    """
+    handle, result_path = tempfile.mkstemp(prefix=os.path.splitext(os.path.basename(script))[0]+"_",suffix=".json")
+    os.close(handle)
+
+    command = [mayapy,os.path.abspath(script),"--worker",path,"--result",result_path] + list(arguments)
+
+    try:
+        process = subprocess.Popen(command,stdout=subprocess.PIPE,stderr=subprocess.STDOUT,universal_newlines=True)
+        log = process.communicate()[0] or ""
+
+        if os.path.getsize(result_path):
+            with open(result_path) as f:
+                result = json.load(f)
+        else: #the worker died before writing its result
+            result = error_result(path,"mayapy exited with code {0}".format(process.returncode))
+
+        result["returncode"] = process.returncode
+        result["log"] = log[-LOG_TAIL:]
+    finally:
+        os.remove(result_path)
+
+    return result
+
+def run_worker(worker,path,options,error_result):
+    """
+    This function calls the worker for the passed file and turns any exception into an error result, so one bad file doesnt stop the batch
+
+    Args:
+        worker: callable in format worker(path,options) -> result dict
+        path: path of the file to process
+        options: dict of batch options
+        error_result: callable in format error_result(path,message) -> result dict
+    Returns:
+        result : a dict containing the result of the file
+    """
+    start_time = time.time()
+    try:
+        result = worker(path,options)
+    except Exception as error:
+        result = error_result(path,"{0}: {1}".format(type(error).__name__,error))
+
+    result.setdefault("file",path)
+    result["elapsed_seconds"] = round(time.time() - start_time,3)
+
+    return result
+
+def run_pool(paths,worker,options,error_result,processes=None):
+    """
+    This is the main function of the module that fans the files out across the worker pool
+
+    Args:
+        paths: list of the files to process
+        worker: callable in format worker(path,options) -> result dict (a stub can be passed for testing)
+        options: dict of batch options passed to the worker
+        error_result: callable in format error_result(path,message) -> result dict
+        processes: number of parallel workers (number of cores if None)
+    Returns:
+        results : list of the result of every file in the same order as paths
+    """
+    processes = processes or os.cpu_count() or 1
+
+    #every thread just waits on its own mayapy process, so a thread pool is enough to keep one process per core busy
+    with ThreadPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(lambda path : run_worker(worker,path,options,error_result),paths))
@@ -0,0 +1,180 @@
+"""
+Script Name: progressReporter.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This module holds a throttled progress reporter for the long loops of the tools. Instead of repainting the UI on every
+             iteration it only emits at most N updates per second (or every K percent) to a sink (Qt widgets, a logger, or nothing)
+"""
+import time
+
+
+def null_sink(percent,message):
+    """
+    This function is the sink for headless runs, it ignores every update
+
+    Args:
+        percent: progress in percent
+        message: progress message
+    Returns:
+        None
+    """
+    pass
+
+def qt_sink(progress_bar=None,label=None,prefix="",process_events=True):
+    """
+    This function returns a sink that updates a progress bar and/or a label
+
+    Args:
+        progress_bar: QProgressBar to set the percent on
+        label: QLabel to set the message on
+        prefix: text shown above the message in the label
+        process_events: if True, forces the GUI updates on every emitted update
+    Returns:
+        sink : callable in format sink(percent,message)
+    """
+    def sink(percent,message):
+        if progress_bar is not None:
+            progress_bar.setValue(percent)
+        if label is not None and message:
+            label.setText(prefix+message)
+        if process_events:
+            _process_events()
+
+    return sink
+
+def log_sink(logger):
+    """
+    This function returns a sink that writes the updates to a logger
+
+    Args:
+        logger: logger to write to
+    Returns:
+        sink : callable in format sink(percent,message)
+    """
+    def sink(percent,message):
+        logger.info("{0} ({1}%)".format(message,percent))
+
+    return sink
+
+def _process_events():
+    """
+    This function forces the GUI updates with whichever Qt binding maya is running (imported here so headless runs dont need Qt)
+
+    Args:
+        None
+    Returns:
+        None
+    """
+    try:
+        from PySide2 import QtWidgets
+    except ImportError:
+        from PySide6 import QtWidgets
+
+    QtWidgets.QApplication.processEvents()
+
+class ProgressReporter(object):
+    """
+    This class reports the progress of a loop to a sink, throttled so the sink only sees a few updates per second
+
+    Methods:
+        __init__: Initializes the reporter with the total number of steps and the throttling settings
+        percent: This function returns the current progress in percent
+        update: This function sets the current step and emits it to the sink if the throttling allows it
+        step: This function advances the current step and emits it to the sink if the throttling allows it
+        finish: This function emits the final update
+    """
+    def __init__(self,total,sink=None,message="",max_rate=10.0,every_percent=None,start=0,end=100):
+        """
+        This is the Constructor function to initialize the reporter
+
+        Args:
+            total: total number of steps of the loop
+            sink: callable in format sink(percent,message), null_sink if None
+            message: message template, formatted with {current} and {total} only when an update is emitted
+            max_rate: maximum number of updates per second (None to disable the time throttle)
+            every_percent: emit every K percent regardless of the time throttle (None to disable)
+            start: percent reported at step 0 (for loops that fill only a part of a progress bar)
+            end: percent reported at the last step
+        Returns:
+            None
+        """
+        self.total = max(int(total),0)
+        self.sink = sink or null_sink
+        self.message = message
+        self.min_interval = 1.0 / max_rate if max_rate else None
+        self.every_percent = every_percent
+        self.start = start
+        self.end = end
+
+        self.current = 0
+        self.last_time = None
+        self.last_percent = None
+
+    def percent(self):
+        """
+        This function returns the current progress in percent
+
+        Args:
+            None
+        Returns:
+            progress in percent
+        """
+        if not self.total:
+            return self.end
+
+        return self.start + int((float(min(self.current,self.total)) / self.total) * (self.end - self.start))
+
+    def update(self,current,force=False):
+        """
+        This function sets the current step and emits it to the sink if the throttling allows it
+
+        Args:
+            current: current step
+            force: emits the update regardless of the throttling
+        Returns:
+            True if the update was emitted
+        """
+        self.current = current
+        percent = self.percent()
+        now = time.time()
+
+        #first and last steps are always emitted
+        if not force and self.last_time is not None and current < self.total:
+            if percent == self.last_percent:
+                return False #nothing visible changed
+
+            time_due = self.min_interval is not None and (now - self.last_time) >= self.min_interval
+            percent_due = self.every_percent is not None and (percent - self.last_percent) >= self.every_percent
+
+            if self.min_interval is not None or self.every_percent is not None:
+                if not time_due and not percent_due:
+                    return False
+
+        self.last_time = now
+        self.last_percent = percent
+        self.sink(percent,self.message.format(current=current,total=self.total))
+
+        return True
+
+    def step(self,amount=1):
+        """
+        This function advances the current step and emits it to the sink if the throttling allows it
+
+        Args:
+            amount: number of steps to advance
+        Returns:
+            True if the update was emitted
+        """
+        return self.update(self.current + amount)
+
+    def finish(self):
+        """
+        This function emits the final update
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.update(self.total,force=True)
@@ -13,6 +13,8 @@ from PySide2 import QtCore, QtUiTools, QtWidgets,QtGui
 
 from shiboken2 import wrapInstance
 
+import progressReporter #throttled progress updates
+
 def getDock(name="ShaderCreatorDock"):
     """
     This function gets the dock from Maya's interface
@@ -181,35 +183,16 @@ class ShaderCreatorMayaWindow(QtWidgets.QWidget):
             arnoldshaderWidgets = self.findChildren(ArnoldShaderCreator)
             vp2shaderWidgets = self.findChildren(VP2ShaderCreator)
 
+            allShaderWidgets = arnoldshaderWidgets + vp2shaderWidgets
 
-            i = 0 #counter variable for keeping track of iterations
-            if vp2shaderWidgets:
-                total_steps = len(arnoldshaderWidgets + vp2shaderWidgets)
-                for widget in arnoldshaderWidgets:
-                    widget.createShader()
-                    
-                    #update progress bar
-                    i=i+1 #add the step counter
-                    progress_value = int((float(i) / total_steps) * 50)
-                    self.progressBar.setValue(progress_value)#set the value
+            #throttled progress bar updates
+            progress = progressReporter.ProgressReporter(len(allShaderWidgets),sink=progressReporter.qt_sink(self.progressBar))
 
-                for widget in vp2shaderWidgets:
-                    widget.createShader()
+            for widget in allShaderWidgets:
+                widget.createShader()
 
-                    #update progress bar
-                    i=i+1 #add the step counter
-                    progress_value = int((float(i) / total_steps) * 100)
-                    self.progressBar.setValue(progress_value)#set the value
-            else:
-                total_steps = len(arnoldshaderWidgets)
-                i = 0
-                for widget in arnoldshaderWidgets:
-                    widget.createShader()
-                    
-                    #update progress bar
-                    i=i+1 #add the step counter
-                    progress_value = int((float(i) / total_steps) * 100)
-                    self.progressBar.setValue(progress_value)#set the value
+                #update progress bar
+                progress.step()
 
         def browseFolder(self):
             """
@@ -0,0 +1,12 @@
+"""
+Script Name: conftest.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: Shared setup of the tests. The scripts live flat at the root of the repo, so the root is put on the path to import them
+             outside of maya
+"""
+import os
+import sys
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
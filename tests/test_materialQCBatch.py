@@ -0,0 +1,88 @@
+"""
+Script Name: test_materialQCBatch.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: Tests of the Material QC batch command line with a stub worker instead of mayapy
+"""
+import json
+import os
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+import materialQCBatch
+
+
+def make_check(name,status="passed",mandatory=True,errors=(),exception=None):
+    return {"name" : name, "label" : name, "mandatory" : mandatory, "status" : status, "errors" : list(errors), "exception" : exception}
+
+#QC report of every stub scene
+SCENE_RESULTS = {
+    "clean" : {"status" : "passed", "checks" : [make_check("namingConvention"),make_check("missingTextures",mandatory=False)]},
+    "naming" : {"status" : "failed", "checks" : [make_check("namingConvention","failed",errors=["bad_SG","bad_MAT"]),make_check("missingTextures",mandatory=False)]},
+    "warning" : {"status" : "passed", "checks" : [make_check("namingConvention"),make_check("missingTextures","failed",mandatory=False,errors=["wood_file"])]},
+    "job" : {"status" : "failed", "checks" : [make_check("currentJob","error",exception="RuntimeError: No job set")]},
+}
+
+def stub_worker(path,options):
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name == "crash":
+        raise RuntimeError("mayapy crashed")
+
+    return json.loads(json.dumps(SCENE_RESULTS[name])) #a fresh copy, like a worker process
+
+@pytest.fixture
+def scenes(tmp_path):
+    return [str(tmp_path / "{0}.mb".format(name)) for name in ("clean","naming","warning","job","crash")]
+
+def test_run_batch(scenes,tmp_path):
+    report_dir = str(tmp_path / "reports")
+    junit_path = str(tmp_path / "summary.xml")
+
+    report = materialQCBatch.run_batch(scenes,report_dir=report_dir,junit_path=junit_path,worker=stub_worker,processes=2)
+
+    assert report["total_scenes"] == 5
+    assert report["failed_scenes"] == 3
+    assert [result["file"] for result in report["scenes"]] == scenes #same order as the scenes
+    assert report["scenes"][4]["status"] == "error"
+    assert report["scenes"][4]["error"] == "RuntimeError: mayapy crashed"
+
+    #one JSON report per scene
+    for scene,result in zip(scenes,report["scenes"]):
+        assert result["report"] == materialQCBatch.get_report_path(scene,report_dir)
+        with open(result["report"]) as f:
+            assert json.load(f)["file"] == scene
+
+    #JUnit summary, general checks only warn
+    root = ElementTree.parse(junit_path).getroot()
+    assert root.get("tests") == "8"
+    assert root.get("failures") == "1"
+    assert root.get("errors") == "2"
+
+    suites = dict((suite.get("name"),suite) for suite in root.findall("testsuite"))
+    assert suites["naming.mb"].find("testcase/failure").text == "bad_SG\nbad_MAT"
+    assert suites["warning.mb"].find("testcase/system-out").text == "wood_file"
+    assert suites["job.mb"].find("testcase/error").get("message") == "RuntimeError: No job set"
+    assert suites["crash.mb"].find("testcase/error").get("message") == "RuntimeError: mayapy crashed"
+
+def test_main_exit_code(scenes,tmp_path):
+    arguments = ["--report-dir",str(tmp_path),"--junit",str(tmp_path / "summary.xml"),"--job","myJob"]
+
+    assert materialQCBatch.main(scenes[:1] + arguments,worker=stub_worker) == 0
+    assert materialQCBatch.main(scenes[2:3] + arguments,worker=stub_worker) == 0 #general checks only warn
+    assert materialQCBatch.main(scenes + arguments,worker=stub_worker) == 1
+
+def test_main_needs_a_job(scenes,monkeypatch):
+    monkeypatch.delenv("JOB",raising=False)
+
+    with pytest.raises(SystemExit) as error:
+        materialQCBatch.main(scenes,worker=stub_worker)
+
+    assert error.value.code == 2
+
+def test_main_needs_scenes():
+    with pytest.raises(SystemExit) as error:
+        materialQCBatch.main(["--job","myJob"],worker=stub_worker)
+
+    assert error.value.code == 2
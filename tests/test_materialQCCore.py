@@ -0,0 +1,182 @@
+"""
+Script Name: test_materialQCCore.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: Tests of the UI free Material QC core on a stub shading snapshot and a stub maya.cmds, no maya needed
+"""
+import os
+
+import pytest
+
+import materialQCCore
+import materialQCScene
+
+
+class StubCmds(object):
+    """
+    This class stands in for maya.cmds with the two queries the core makes to scope the QC to a group
+
+    Methods:
+        __init__: Initializes the stub with the shapes of every group and the shading groups of every shape
+        listRelatives: This function returns the shapes under a group
+        listConnections: This function returns the shading groups of the shapes
+    """
+    def __init__(self,group_shapes,shape_shading_groups):
+        self.group_shapes = group_shapes
+        self.shape_shading_groups = shape_shading_groups
+
+    def listRelatives(self,group,allDescendents=False,shapes=False,fullPath=False):
+        return list(self.group_shapes.get(group,[]))
+
+    def listConnections(self,shapes,type=None):
+        return [sg for shape in shapes for sg in self.shape_shading_groups.get(shape,[])]
+
+
+@pytest.fixture
+def textures(tmp_path):
+    #published textures of the job on disk, so the texture checks only fail for the scene issues
+    directory = tmp_path / "jobs" / "myJob" / "release" / "textures"
+    directory.mkdir(parents=True)
+    paths = {}
+    for name,content in (("wood",b"wood"),("metal",b"metal")):
+        path = directory / "{0}.1001.exr".format(name)
+        path.write_bytes(content)
+        paths[name] = str(path)
+
+    return paths
+
+@pytest.fixture
+def snapshot(textures):
+    return materialQCScene.freeze_snapshot(
+        sg_shaders = {
+            "wood_MATSG" : ["wood_MAT"],
+            "metal_MATSG" : ["metal_MAT"],
+            "badName_SG" : ["badName_MAT"],
+            "unused_MATSG" : ["unused_MAT"],
+            "initialShadingGroup" : ["lambert1"],
+        },
+        sg_members = {
+            "wood_MATSG" : ["|asset_GRP|table|tableShape"],
+            "metal_MATSG" : ["|asset_GRP|lamp|lampShape"],
+            "badName_SG" : ["|prop_GRP|cup|cupShape"],
+            "unused_MATSG" : [],
+            "initialShadingGroup" : ["|prop_GRP|saucer|saucerShape"],
+        },
+        texture_paths = {"wood_file" : textures["wood"], "metal_file" : textures["metal"]},
+        file_connections = {"wood_file" : ["outColor"], "metal_file" : ["outColor"]},
+        materials = ["wood_MAT","metal_MAT","badName_MAT","unused_MAT","lambert1","standardSurface1"],
+    )
+
+def get_check(report,name):
+    return [check for check in report["checks"] if check["name"] == name][0]
+
+def test_run_qc_scene(snapshot):
+    report = materialQCCore.run_qc(context=materialQCCore.build_context(snapshot=snapshot,job="myJob"))
+
+    assert report["status"] == "failed"
+    assert report["job"] == "myJob"
+    assert sorted(report["failed_checks"]) == ["defaultShaders","namingConvention","unusedNodes"]
+    assert report["warning_checks"] == []
+
+    assert get_check(report,"namingConvention")["errors"] == ["badName_SG"]
+    assert get_check(report,"unusedNodes")["errors"] == ["unused_MAT"] #standardSurface1 has no shading group
+    assert get_check(report,"defaultShaders")["errors"] == ["saucerShape"]
+    assert get_check(report,"currentJob")["status"] == "passed"
+    assert get_check(report,"publishedTextures")["status"] == "passed"
+    assert get_check(report,"missingTextures")["status"] == "passed"
+
+def test_run_qc_group(snapshot,monkeypatch):
+    stub = StubCmds({"asset_GRP" : ["tableShape","lampShape"]},{"tableShape" : ["wood_MATSG"],"lampShape" : ["metal_MATSG"]})
+    monkeypatch.setattr(materialQCCore,"cmds",stub)
+
+    context = materialQCCore.build_context(snapshot=snapshot,group="asset_GRP",job="myJob")
+    report = materialQCCore.run_qc(context=context)
+
+    assert sorted(context.shading_dict) == ["metal_MATSG","wood_MATSG"]
+    assert report["group"] == "asset_GRP"
+    assert report["failed_checks"] == ["defaultShaders"] #lambert1 is checked over the whole scene
+    assert get_check(report,"namingConvention")["status"] == "passed"
+    assert get_check(report,"unusedNodes")["status"] == "passed"
+
+def test_run_qc_without_job(snapshot,monkeypatch):
+    monkeypatch.delenv("JOB",raising=False)
+
+    report = materialQCCore.run_qc(context=materialQCCore.build_context(snapshot=snapshot))
+
+    check = get_check(report,"currentJob")
+    assert check["status"] == "error"
+    assert "JOB" in check["exception"]
+    assert "currentJob" in report["failed_checks"]
+
+def test_run_qc_wrong_job(snapshot):
+    report = materialQCCore.run_qc(context=materialQCCore.build_context(snapshot=snapshot,job="otherJob"))
+
+    assert sorted(get_check(report,"currentJob")["errors"]) == ["metal_file","wood_file"]
+
+def test_run_qc_names(snapshot):
+    report = materialQCCore.run_qc(context=materialQCCore.build_context(snapshot=snapshot,job="myJob"),names=["namingConvention"])
+
+    assert [check["name"] for check in report["checks"]] == ["namingConvention"]
+
+def test_group_without_shapes(snapshot,monkeypatch):
+    monkeypatch.setattr(materialQCCore,"cmds",StubCmds({},{}))
+
+    context = materialQCCore.build_context(snapshot=snapshot,group="empty_GRP",job="myJob")
+
+    assert context.shading_dict == {}
+
+def test_shading_group_without_material(snapshot):
+    broken = snapshot._replace(sg_shaders=dict(snapshot.sg_shaders,turntable_SG=()))
+
+    with pytest.raises(RuntimeError):
+        materialQCCore.build_context(snapshot=broken,job="myJob")
+
+def test_excluded_textures(snapshot):
+    excluded = snapshot._replace(texture_paths=dict(snapshot.texture_paths,dome_custom0_file="/lookdev/dome.exr"))
+
+    context = materialQCCore.build_context(snapshot=excluded,job="myJob")
+
+    assert sorted(context.texture_paths) == ["metal_file","wood_file"]
+    assert os.path.exists(context.texture_paths["wood_file"])
+
+@pytest.fixture
+def udim_snapshot(snapshot,textures):
+    #sparse UDIM layout on disk, 1002 is skipped on purpose
+    directory = os.path.dirname(textures["wood"])
+    for tile in (1001,1003):
+        with open(os.path.join(directory,"tiles.{0}.exr".format(tile)),"wb") as f:
+            f.write(b"tiles")
+
+    return snapshot._replace(texture_paths=dict(snapshot.texture_paths,tiles_file=os.path.join(directory,"tiles.<UDIM>.exr")))
+
+def test_sparse_udims(udim_snapshot):
+    #only the tiles used by the meshes have to be on disk
+    context = materialQCCore.build_context(snapshot=udim_snapshot,job="myJob",texture_tiles={"tiles_file" : frozenset([1001,1003])})
+
+    assert get_check(materialQCCore.run_qc(context=context),"missingTextures")["status"] == "passed"
+
+def test_missing_udims(udim_snapshot):
+    context = materialQCCore.build_context(snapshot=udim_snapshot,job="myJob",texture_tiles={"tiles_file" : frozenset([1001,1002,1003,1011])})
+
+    check = get_check(materialQCCore.run_qc(context=context),"missingTextures")
+    assert check["status"] == "failed"
+    assert check["errors"] == ["tiles_file (1002, 1011)"]
+
+def test_udims_without_meshes(udim_snapshot):
+    #outside of maya the meshes arent read, so no tile is reported
+    context = materialQCCore.build_context(snapshot=udim_snapshot,job="myJob")
+
+    assert context.texture_tiles is None
+    assert get_check(materialQCCore.run_qc(context=context),"missingTextures")["status"] == "passed"
+
+@pytest.mark.parametrize("member,mesh,faces",[
+    ("|asset_GRP|table|tableShape","|asset_GRP|table|tableShape",None),
+    ("pCube1.f[0:3]","pCube1",[0,1,2,3]),
+    ("|grp|pCube1.f[7]","|grp|pCube1",[7]),
+])
+def test_get_member_faces(member,mesh,faces):
+    member_mesh, member_faces = materialQCScene.get_member_faces(member)
+
+    assert member_mesh == mesh
+    assert (member_faces if member_faces is None else list(member_faces)) == faces
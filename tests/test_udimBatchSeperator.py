@@ -0,0 +1,75 @@
+"""
+Script Name: test_udimBatchSeperator.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: Tests of the batch UDIM seperation command line with a stub worker instead of mayapy
+"""
+import json
+import os
+
+import pytest
+
+import udimBatchSeperator
+
+
+#seperation result of every stub file
+FILE_RESULTS = {
+    "props" : {"status" : "ok", "separated" : [{"mesh" : "|cup", "udims" : [1001,1002]},{"mesh" : "|saucer", "udims" : [1001,1011]}], "skipped" : ["|spoon"], "errors" : []},
+    "single" : {"status" : "ok", "separated" : [], "skipped" : ["|table"], "errors" : []},
+    "cross" : {"status" : "error", "separated" : [], "skipped" : [], "errors" : [{"mesh" : "|lamp", "error" : "shell across UDIMS", "cross_shells" : [{"shell" : 3, "udims" : [1001,1002]}]}]},
+    "noStatus" : {"separated" : [{"mesh" : "|chair", "udims" : [1001,1002]}]},
+}
+
+def stub_worker(path,options):
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name == "crash":
+        raise RuntimeError("mayapy crashed")
+
+    result = json.loads(json.dumps(FILE_RESULTS[name])) #a fresh copy, like a worker process
+    result["options"] = options
+
+    return result
+
+@pytest.fixture
+def files(tmp_path):
+    return [str(tmp_path / name) for name in ("props.mb","single.ma","cross.obj","noStatus.fbx","crash.mb")]
+
+def test_run_batch(files,tmp_path):
+    report_path = str(tmp_path / "report.json")
+
+    report = udimBatchSeperator.run_batch(files,report_path=report_path,worker=stub_worker,processes=3,mode="duplicate",output_dir="/out")
+
+    assert report["total_files"] == 5
+    assert report["failed_files"] == 2
+    assert report["separated_meshes"] == 3
+    assert [result["file"] for result in report["files"]] == files #same order as the files
+    assert [result["status"] for result in report["files"]] == ["ok","ok","error","ok","error"]
+    assert report["files"][4]["errors"] == [{"mesh" : None, "error" : "RuntimeError: mayapy crashed"}]
+    assert report["files"][0]["options"]["mode"] == "duplicate"
+    assert report["files"][0]["options"]["output_dir"] == "/out"
+
+    with open(report_path) as f:
+        assert json.load(f)["failed_files"] == 2
+
+def test_main_exit_code(files,tmp_path):
+    report_path = str(tmp_path / "report.json")
+
+    assert udimBatchSeperator.main(files[:2] + ["--report",report_path],worker=stub_worker) == 0
+    assert udimBatchSeperator.main(files + ["--report",report_path],worker=stub_worker) == 1
+
+def test_main_needs_files():
+    with pytest.raises(SystemExit) as error:
+        udimBatchSeperator.main([],worker=stub_worker)
+
+    assert error.value.code == 2
+
+def test_get_output_path():
+    assert udimBatchSeperator.get_output_path("/assets/props.obj") == os.path.join("/assets","props_udimSplit.obj")
+    assert udimBatchSeperator.get_output_path("/assets/props.mb","/out") == os.path.join("/out","props_udimSplit.mb")
+
+def test_export_types():
+    #the seperated meshes are saved with the export translators, not the import ones
+    assert sorted(udimBatchSeperator.MESH_EXPORT_TYPES) == sorted(udimBatchSeperator.MESH_TYPES)
+    assert udimBatchSeperator.MESH_EXPORT_TYPES[".obj"] == "OBJexport"
+    assert udimBatchSeperator.MESH_EXPORT_TYPES[".fbx"] == "FBX export"
@@ -0,0 +1,141 @@
+"""
+Script Name: test_udimShellEngine.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: Tests of the UDIM classification of udimShellEngine with plain UV arrays, no maya needed
+"""
+import random
+
+import numpy as np
+import pytest
+
+import udimShellEngine
+
+
+@pytest.mark.parametrize("u_coord,v_coord,tile",[
+    (0.5,0.5,1001),
+    (0.0,0.0,1001),
+    (1.5,0.5,1002),
+    (9.5,0.5,1010),
+    (0.5,1.5,1011),
+    (3.25,2.75,1024),
+    (-0.5,0.5,1000),
+    (0.5,-0.5,991),
+])
+def test_udim_from_uv(u_coord,v_coord,tile):
+    assert udimShellEngine.udim_from_uv(u_coord,v_coord) == tile
+
+def test_get_shell_bounds():
+    shell_ids = [0,1,0,1,0]
+    u_array = [0.1,1.2,0.4,1.8,0.3]
+    v_array = [0.2,0.5,0.9,0.6,0.1]
+
+    bounds = udimShellEngine.get_shell_bounds(2,shell_ids,u_array,v_array)
+
+    assert bounds == [(0.1,0.4,0.1,0.9),(1.2,1.8,0.5,0.6)]
+
+def test_get_shell_tiles():
+    bounds = [(0.1,0.4,0.1,0.9),(1.2,1.8,0.5,0.6),(0.8,1.2,0.1,0.2),(0.1,0.2,0.8,1.1)]
+
+    assert udimShellEngine.get_shell_tiles(bounds) == [1001,1002,None,None]
+
+def test_classify_shells():
+    shell_ids = [2,0,1,0,2,1,3,3]
+    u_array = [2.1,0.1,0.9,0.4,2.3,1.1,-0.5,0.5]
+    v_array = [1.5,0.2,0.5,0.8,1.6,0.5,0.2,0.3]
+
+    bounds, tiles, cross_tile = udimShellEngine.classify_shells(u_array,v_array,shell_ids)
+
+    np.testing.assert_allclose(bounds,[[0.1,0.4,0.2,0.8],[0.9,1.1,0.5,0.5],[2.1,2.3,1.5,1.6],[-0.5,0.5,0.2,0.3]])
+    assert tiles.tolist() == [1001,1001,1013,1000]
+    assert cross_tile.tolist() == [False,True,False,True]
+
+def test_classify_shells_negative_uvs():
+    #a shell across U 0 is split by the tile border, truncating would put both sides in 1001
+    bounds, tiles, cross_tile = udimShellEngine.classify_shells([-0.75,-0.25,-0.5,0.25],[0.5,0.5,-0.5,-0.25],[0,0,1,1])
+
+    assert tiles.tolist() == [1000,990]
+    assert cross_tile.tolist() == [False,True]
+
+def test_classify_shells_without_uvs():
+    bounds, tiles, cross_tile = udimShellEngine.classify_shells([0.5,0.6],[0.5,0.6],[0,2],shell_count=3)
+
+    assert tiles.tolist() == [1001,-1,1001]
+    assert cross_tile.tolist() == [False,False,False]
+    assert np.isinf(bounds[1]).all()
+
+def test_classify_shells_empty():
+    bounds, tiles, cross_tile = udimShellEngine.classify_shells([],[],[])
+
+    assert bounds.shape == (0,4)
+    assert not tiles.size
+    assert not cross_tile.size
+
+def test_classify_shells_matches_python_fallback():
+    generator = random.Random(7)
+    shell_count = 200
+    shell_ids = [generator.randrange(shell_count) for i in range(5000)]
+    u_array = [generator.uniform(-2.0,6.0) for i in range(5000)]
+    v_array = [generator.uniform(-1.0,3.0) for i in range(5000)]
+
+    bounds, tiles, cross_tile = udimShellEngine.classify_shells(u_array,v_array,shell_ids,shell_count)
+
+    python_bounds = udimShellEngine.get_shell_bounds(shell_count,shell_ids,u_array,v_array)
+    python_tiles = udimShellEngine.get_shell_tiles(python_bounds)
+
+    np.testing.assert_allclose(bounds,np.asarray(python_bounds))
+    assert [None if crossing else tile for tile,crossing in zip(tiles.tolist(),cross_tile.tolist())] == python_tiles
+
+def test_get_tile_span():
+    assert udimShellEngine.get_tile_span((0.5,1.5,0.5,1.5)) == [1001,1002,1011,1012]
+    assert udimShellEngine.get_tile_span((-0.5,0.5,0.2,0.4)) == [1000,1001]
+
+def test_get_used_tiles():
+    shell_data = {
+        "shell_tiles" : [1001,1003,None],
+        "shell_bounds" : [(0.1,0.9,0.1,0.9),(2.1,2.9,0.1,0.9),(0.5,1.5,1.2,1.4)],
+        "face_shells" : [0,0,1,-1,2],
+    }
+
+    assert udimShellEngine.get_used_tiles(shell_data) == set([1001,1003,1011,1012])
+    assert udimShellEngine.get_used_tiles(shell_data,[0,1,3]) == set([1001])
+    assert udimShellEngine.get_used_tiles(shell_data,range(2,4)) == set([1003])
+
+def test_offset_shell_uvs():
+    u_moved, v_moved = udimShellEngine.offset_shell_uvs([0.1,0.2,0.3],[0.4,0.5,0.6],[0,1,0],[(1.0,0.0),(0.0,2.0)])
+
+    np.testing.assert_allclose(u_moved,[1.1,0.2,1.3])
+    np.testing.assert_allclose(v_moved,[0.4,2.5,0.6])
+
+def test_group_shell_uvs(monkeypatch):
+    shell_ids = [1,0,1,3,0,1]
+
+    assert [list(uvs) for uvs in udimShellEngine.group_shell_uvs(4,shell_ids)] == [[1,4],[0,2,5],[],[3]]
+    assert udimShellEngine.group_shell_uvs(0,[]) == []
+
+    monkeypatch.setattr(udimShellEngine,"np",None) #pure python fallback
+    assert udimShellEngine.group_shell_uvs(4,shell_ids) == [[1,4],[0,2,5],[],[3]]
+
+def test_shell_world_areas():
+    #two quads of one unit each, the second one in its own shell, given as a flat x,y,z list
+    points = [0,0,0, 1,0,0, 1,1,0, 0,1,0, 2,0,0, 3,0,0, 3,0,1, 2,0,1]
+    areas = udimShellEngine.get_shell_world_areas(2,[0,0,0,0,1,1,1,1],points,[4,4],[0,1,2,3,4,5,6,7],[4,4],[0,1,2,3,4,5,6,7])
+
+    np.testing.assert_allclose(areas,[1.0,1.0])
+
+def test_shell_index_matches_python_fallback(monkeypatch):
+    generator = random.Random(11)
+    shell_count = 50
+    shell_ids = [generator.randrange(shell_count) for i in range(2000)]
+    u_array = [generator.uniform(0.0,3.0) for i in range(2000)]
+    v_array = [generator.uniform(0.0,2.0) for i in range(2000)]
+
+    shell_index = udimShellEngine.UVShellIndex(shell_count,shell_ids,u_array,v_array)
+
+    monkeypatch.setattr(udimShellEngine,"np",None)
+    python_index = udimShellEngine.UVShellIndex(shell_count,shell_ids,u_array,v_array)
+
+    assert [shell_index.get_shell_uvs(shell_id) for shell_id in range(shell_count)] == python_index.shell_uvs
+    assert shell_index.get_components(0) == python_index.get_components(0)
+    np.testing.assert_allclose(shell_index.shell_bounds,python_index.shell_bounds)
@@ -0,0 +1,216 @@
+"""
+Script Name: udimBatchSeperator.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This script seperates the UDIMS of many scene files or exported meshes headlessly. Every file is sent to its own mayapy
+             process (one per core) which runs the same get_udim_shells / split_mesh_into_udims logic as the UDIM Seperator tool,
+             and all the results are collected into one JSON report.
+
+Usage:
+    python udimBatchSeperator.py asset1.mb asset2.ma prop.obj --report udim_report.json
+    python udimBatchSeperator.py *.mb --report udim_report.json --mayapy /usr/autodesk/maya2023/bin/mayapy --processes 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import mayapyBatch #shared mayapy worker pool
+
+#file types that can be seperated
+SCENE_TYPES = {".ma" : "mayaAscii", ".mb" : "mayaBinary"}
+MESH_TYPES = {".obj" : "OBJ", ".fbx" : "FBX"} #import translators
+MESH_EXPORT_TYPES = {".obj" : "OBJexport", ".fbx" : "FBX export"} #export translators
+MESH_PLUGINS = {".obj" : "objExport", ".fbx" : "fbxmaya"}
+
+
+def get_output_path(path,output_dir=None):
+    """
+    This function returns the path the seperated file is saved to
+
+    Args:
+        path: path of the source file
+        output_dir: directory to save to (next to the source file if None)
+    Returns:
+        output_path : path of the seperated file
+    """
+    directory, file_name = os.path.split(path)
+    name, extension = os.path.splitext(file_name)
+
+    return os.path.join(output_dir or directory,"{0}_udimSplit{1}".format(name,extension))
+
+def seperate_file(path,mode="partition",output_dir=None):
+    """
+    This function runs inside mayapy. It opens (or imports) the passed file, seperates every mesh with more than one UDIM and saves the result
+
+    Args:
+        path: path of the scene file or exported mesh
+        mode: split mode passed to split_mesh_into_udims
+        output_dir: directory to save the seperated file to
+    Returns:
+        result : a dict containing the seperation info of the file
+    """
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    import maya.cmds as cmds
+
+    sys.path.insert(0,os.path.dirname(os.path.abspath(__file__))) #for accessing the UDIM Seperator next to this script
+    import udimSeperator_Shells
+
+    extension = os.path.splitext(path)[-1].lower()
+
+    result = {"file" : path, "output" : None, "separated" : [], "skipped" : [], "errors" : []}
+
+    #open or import the file
+    cmds.file(new=True,force=True)
+    if extension in SCENE_TYPES:
+        cmds.file(path,open=True,force=True)
+    elif extension in MESH_TYPES:
+        cmds.loadPlugin(MESH_PLUGINS[extension],quiet=True)
+        cmds.file(path,i=True,type=MESH_TYPES[extension],ignoreVersion=True)
+    else:
+        raise ValueError("Unsupported file type: {0}".format(path))
+
+    seperator = udimSeperator_Shells.UDIM_SEPERATOR_CORE()
+    meshes = seperator.get_meshes(cmds.ls(assemblies=True))[0]
+
+    seperator.undo_enabled = False #nothing to undo in a batch run
+    seperator.suspend_refresh = False #no viewport in mayapy
+
+    #same steps as UDIM_SEPERATOR.main for every mesh in the file
+    with seperator.seperator_operation():
+        for mesh in meshes:
+            try:
+                tiles_shells_dict = seperator.get_udim_shells(mesh)
+
+                if len(tiles_shells_dict.keys())<=1:
+                    result["skipped"].append(mesh)
+                    continue
+
+                seperator.split_mesh_into_udims(mesh,tiles_shells_dict,mode=mode)
+                result["separated"].append({"mesh" : mesh, "udims" : sorted(tiles_shells_dict.keys())})
+
+            except udimSeperator_Shells.UVShellError as error:
+                #report every shell spanning across UDIMS, not just the first one
+                cross_shells = seperator.get_udim_analysis(mesh)["cross_shells"]
+                result["errors"].append({"mesh" : mesh, "error" : str(error), "cross_shells" : [{"shell" : cross_shell["shell"], "udims" : cross_shell["udims"]} for cross_shell in cross_shells]})
+            except RuntimeError as error:
+                result["errors"].append({"mesh" : mesh, "error" : "RunTime error while trying to split: {0}".format(error)})
+
+    #save the seperated file
+    if result["separated"]:
+        output_path = get_output_path(path,output_dir)
+        if extension in SCENE_TYPES:
+            cmds.file(rename=output_path)
+            cmds.file(save=True,force=True,type=SCENE_TYPES[extension])
+        else:
+            cmds.file(output_path,exportAll=True,force=True,type=MESH_EXPORT_TYPES[extension])
+        result["output"] = output_path
+
+    result["status"] = "error" if result["errors"] else "ok"
+
+    return result
+
+def get_error_result(path,message):
+    """
+    This function returns the result of a file that could not be seperated at all
+
+    Args:
+        path: path of the scene file or exported mesh
+        message: error message
+    Returns:
+        result : a dict containing the seperation info of the file
+    """
+    return {"file" : path, "status" : "error", "errors" : [{"mesh" : None, "error" : message}]}
+
+def run_mayapy_worker(path,options):
+    """
+    This function launches one mayapy process that seperates the passed file, and returns its result
+
+    Args:
+        path: path of the scene file or exported mesh
+        options: dict of batch options ("mayapy","mode","output_dir")
+    Returns:
+        result : a dict containing the seperation info of the file
+    """
+    arguments = ["--mode",options["mode"]]
+    if options.get("output_dir"):
+        arguments.extend(["--output-dir",options["output_dir"]])
+
+    return mayapyBatch.run_mayapy_worker(__file__,path,arguments,get_error_result,mayapy=options["mayapy"])
+
+def run_batch(paths,report_path=None,worker=run_mayapy_worker,processes=None,mode="partition",mayapy=mayapyBatch.DEFAULT_MAYAPY,output_dir=None):
+    """
+    This is the main function that fans the files out across the worker pool and collects the results into one report
+
+    Args:
+        paths: list of scene files or exported meshes
+        report_path: path of the JSON report to write (not written if None)
+        worker: callable in format worker(path,options) -> result dict (a stub can be passed for testing)
+        processes: number of parallel workers (number of cores if None)
+        mode: split mode passed to split_mesh_into_udims
+        mayapy: mayapy executable used by run_mayapy_worker
+        output_dir: directory to save the seperated files to
+    Returns:
+        report : a dict containing the results of every file in the same order as paths
+    """
+    start_time = time.time()
+
+    options = {"mayapy" : mayapy, "mode" : mode, "output_dir" : output_dir}
+
+    results = mayapyBatch.run_pool(paths,worker,options,get_error_result,processes=processes)
+    for result in results:
+        result.setdefault("status","ok")
+
+    report = {
+        "files" : results,
+        "total_files" : len(results),
+        "failed_files" : len([result for result in results if result["status"] != "ok"]),
+        "separated_meshes" : sum(len(result.get("separated",[])) for result in results),
+        "elapsed_seconds" : round(time.time() - start_time,3),
+    }
+
+    if report_path:
+        with open(report_path,"w") as f:
+            json.dump(report,f,indent = 4)
+
+    return report
+
+def main(args=None,worker=run_mayapy_worker):
+    """
+    This is the command line entry point for both the batch and the mayapy worker
+
+    Args:
+        args: list of command line arguments (sys.argv if None)
+        worker: callable in format worker(path,options) -> result dict (a stub can be passed for testing)
+    Returns:
+        exit code
+    """
+    parser = argparse.ArgumentParser(description="Seperate the UDIMS of scene files or exported meshes with a pool of mayapy processes")
+    parser.add_argument("files",nargs="*",help="scene files (.ma/.mb) or exported meshes (.obj/.fbx)")
+    parser.add_argument("--report",default="udim_report.json",help="path of the JSON report")
+    parser.add_argument("--mode",default="partition",choices=["partition","duplicate"],help="split mode")
+    parser.add_argument("--output-dir",default=None,help="directory to save the seperated files to")
+    mayapyBatch.add_arguments(parser) #--mayapy, --processes and the worker mode
+    options = parser.parse_args(args)
+
+    #worker mode, running inside mayapy
+    if options.worker:
+        result = seperate_file(options.worker,mode=options.mode,output_dir=options.output_dir)
+        mayapyBatch.write_result(options.result,result)
+        return 0
+
+    if not options.files:
+        parser.error("Please pass the files to seperate")
+
+    report = run_batch(options.files,report_path=options.report,worker=worker,processes=options.processes,mode=options.mode,mayapy=options.mayapy,output_dir=options.output_dir)
+
+    print("Seperated {0} meshes in {1} files ({2} failed) in {3:.2f} seconds. Report: {4}".format(report["separated_meshes"],report["total_files"],report["failed_files"],report["elapsed_seconds"],options.report))
+
+    return 1 if report["failed_files"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,10 @@ import maya.OpenMaya as om
 import pprint
 import logging
 import time 
+import sys
+import contextlib
+import udimShellEngine #OpenMaya API based shell engine
+import progressReporter #throttled progress updates
 
 #create custom Exception
 class UVShellError(Exception):
@@ -35,7 +39,414 @@ stream_handler.setFormatter(formatter)
 # Add the handler to the logger
 logger.addHandler(stream_handler)
 
-class UDIM_SEPERATOR(QtWidgets.QWidget):
+#cached UDIM analysis of every mesh in format {mesh: {"hash": str, "tile_shells": {UDIM: [shell ids]}, "tile_faces": {UDIM: [faces]}}}
+UDIM_ANALYSIS_CACHE = {}
+
+class UDIM_SEPERATOR_CORE(object):
+    """
+    This is a UDIM_SEPERATOR_CORE class that holds the UI free functionality of the tool, so it can also run headless in mayapy
+
+    Methods:
+        get_progress_reporter : This function returns the progress reporter used by the long loops of the tool (null sink without UI)
+        seperator_operation : This function wraps the whole seperation in a single named undo chunk (or disables undo) and suspends the viewport refresh
+        get_meshes : This function returns all the mesh transforms inside the passed items, including those within groups
+        get_udim_analysis : This function analyzes the UV shells of the passed geometry and caches the result
+        get_udim_shells : This is the function that returns a dictionary of all the shells in the passed geometry based on the UDIM
+        find_cross_udim_shells : This function collects every shell spanning across UDIMS in all the passed meshes in a single pass
+        analyze_udims : This function analyzes the UDIMS of the passed meshes without changing the scene and caches the result
+        split_mesh_into_udims: This function splits a mesh into multiple meshes based on UDIMs defined in the tiles_faces_dict.
+        get_udim_mesh_name: This function returns the name of the split mesh for the passed UDIM
+        duplicate_mesh_into_udims: This function creates the UDIM meshes by duplicating the whole mesh for every UDIM
+        partition_mesh_into_udims: This function creates the UDIM meshes from a single working copy by partitioning its faces
+    """
+    status_message = "" #current status of the tool
+    undo_enabled = True #False disables the undo queue entirely while seperating (batch runs)
+    suspend_refresh = True #suspends the viewport refresh while seperating
+
+    def get_progress_reporter(self,total,message):
+        """
+        This function returns the progress reporter used by the long loops of the tool (null sink without UI)
+
+        Args:
+            total: total number of steps of the loop
+            message: message template with {current} and {total}
+        Returns:
+            ProgressReporter instance
+        """
+        return progressReporter.ProgressReporter(total,sink=progressReporter.null_sink,message=message)
+
+    @contextlib.contextmanager
+    def seperator_operation(self,chunk_name="UDIM Seperator"):
+        """
+        This function wraps the whole seperation in a single named undo chunk (or disables undo) and suspends the viewport refresh
+
+        Args:
+            chunk_name: name of the undo chunk
+        Returns:
+            None
+        """
+        undo_state = cmds.undoInfo(query=True,state=True)
+
+        if self.undo_enabled:
+            cmds.undoInfo(openChunk=True,chunkName=chunk_name)
+        else:
+            cmds.undoInfo(stateWithoutFlush=False) #turn off undo without flushing the queue
+
+        if self.suspend_refresh:
+            cmds.refresh(suspend=True)
+
+        try:
+            yield
+        finally:
+            if self.suspend_refresh:
+                cmds.refresh(suspend=False)
+                cmds.refresh() #redraw once at the end
+
+            if self.undo_enabled:
+                cmds.undoInfo(closeChunk=True)
+            else:
+                cmds.undoInfo(stateWithoutFlush=undo_state) #restore the undo state
+
+    def get_meshes(self,items):
+        """
+        This function returns all the mesh transforms inside the passed items, including those within groups
+
+        Args:
+            items: list of selected items
+        Returns:
+            all_selected_meshes : list of the mesh transforms (full path)
+            skipped_objects : number of items without any meshes
+        """
+        # Flatten the list of all meshes in the selection, including those within groups
+        all_selected_meshes = []
+        skipped_objects = 0 #tracker for skipped items
+
+        for item in items:
+            
+            # Find all mesh objects in the hierarchy (including groups)
+            all_meshes = cmds.listRelatives(item, allDescendents=True, type="mesh", fullPath=True) or []
+
+            # Remove any intermediate objects (if they exist)
+            all_meshes = [mesh for mesh in all_meshes if not cmds.getAttr("{0}.intermediateObject".format(mesh))]
+
+            logger.debug("Removed Intermediates: "+ str(all_meshes))
+
+            all_meshes = [cmds.listRelatives(mesh, parent=True, fullPath=True)[0] for mesh in all_meshes]  # get parent transform nodes
+
+            if not all_meshes:
+                logger.info("Skipping {} as it contains no meshes.".format(item))
+                skipped_objects += 1
+                continue
+
+            all_selected_meshes.extend(all_meshes)
+
+        return all_selected_meshes, skipped_objects
+
+    def get_udim_analysis(self,geometry,use_cache=True):
+        """
+        This function analyzes the UV shells of the passed geometry and caches the result
+
+        Args:
+            geometry: mesh to determine the UDIMS
+            use_cache: if True, reuses the cached analysis when the topology and UVs of the mesh did not change
+        Returns:
+            analysis : a dict in format {"hash": str, "tile_shells": {UDIM: [shell ids]}, "tile_faces": {UDIM: [faces]}, "cross_shells": [..]}
+        """
+        # Ensure the input geometry is valid
+        if not cmds.objExists(geometry):
+            raise ValueError("{0} Geometry does not exist.".format(geometry))
+
+        # Reuse the cached analysis if the mesh is unchanged
+        mesh_hash = udimShellEngine.get_mesh_hash(geometry)
+        cached_analysis = UDIM_ANALYSIS_CACHE.get(geometry)
+        if use_cache and cached_analysis and cached_analysis["hash"] == mesh_hash:
+            logger.debug("Using the cached UDIM analysis of {0}".format(geometry))
+            return cached_analysis
+
+        # Get the shells, their bounding boxes and UDIM tiles in one pass through the API
+        shell_data = udimShellEngine.get_udim_shell_data(geometry)
+
+        # Shells spanning across UDIMS have no tile
+        cross_shells = []
+        for cross_shell in udimShellEngine.get_cross_tile_shells(shell_data):
+            cross_shell["uvs"] = udimShellEngine.to_components(geometry,"map",cross_shell["uvs"])
+            cross_shells.append(cross_shell)
+
+        # Dictionary to store UDIM tile number and the faces of its shells
+        udim_shells_dict = {}
+
+        for udim,faces in udimShellEngine.get_tile_faces(shell_data).items():
+            udim_shells_dict[udim] = udimShellEngine.to_components(geometry,"f",faces) #format {1001:['obj.f[0:20]','obj..'...]}
+            logger.debug("Added {0} faces to {1} in the dictionary".format(len(faces),str(udim)))
+
+        # Cache the analysis for the next run
+        analysis = {
+            "hash" : mesh_hash,
+            "tile_shells" : udimShellEngine.get_tile_shells(shell_data),
+            "tile_faces" : udim_shells_dict,
+            "cross_shells" : cross_shells,
+        }
+        UDIM_ANALYSIS_CACHE[geometry] = analysis
+
+        return analysis
+
+    def get_udim_shells(self,geometry,use_cache=True):
+        """
+        This is the function that returns a dictionary of all the shells in the passed geometry based on the UDIM
+        
+        Args:
+            geometry: mesh to determine the UDIMS
+            use_cache: if True, reuses the cached analysis when the topology and UVs of the mesh did not change
+        Returns:
+            udim_shells_dict : a dictionary containing the UDIM and the faces of its shells in the passed geometry
+        """
+        analysis = self.get_udim_analysis(geometry,use_cache=use_cache)
+
+        if analysis["cross_shells"]:
+            cross_shell = analysis["cross_shells"][0]
+            udims = ", ".join(str(udim) for udim in cross_shell["udims"])
+
+            #select the incorrect shell
+            cmds.select(cl=True)
+            cmds.select(cross_shell["uvs"])
+
+            #error it out
+            om.MGlobal.displayError("There is a shell that is spanning across UDIMS (check {0})".format(udims))
+            raise UVShellError("There is a shell that is spanning across UDIMS (check {0})".format(udims))
+
+        return analysis["tile_faces"]
+
+    def find_cross_udim_shells(self,meshes,select=True):
+        """
+        This function collects every shell spanning across UDIMS in all the passed meshes in a single pass, instead of stopping at the first one
+
+        Args:
+            meshes: list of mesh transforms
+            select: if True, selects all the offending shells at once
+        Returns:
+            cross_udim_shells : a dict in format {mesh: [{"shell": shell id, "udims": [UDIMS spanned], "uvs": [uv components]}]}
+        """
+        cross_udim_shells = {}
+
+        #throttled GUI updates
+        progress = self.get_progress_reporter(len(meshes),"Checking UV Shells: ({current}/{total})")
+
+        for mesh in meshes:
+            cross_shells = self.get_udim_analysis(mesh)["cross_shells"]
+            if cross_shells:
+                cross_udim_shells[mesh] = cross_shells
+            progress.step()
+
+        #select all the offending shells as one selection
+        if select and cross_udim_shells:
+            shell_uvs = [uv for cross_shells in cross_udim_shells.values() for cross_shell in cross_shells for uv in cross_shell["uvs"]]
+            cmds.select(shell_uvs,replace=True)
+
+        return cross_udim_shells
+
+    def analyze_udims(self,meshes):
+        """
+        This function analyzes the UDIMS of the passed meshes without changing the scene and caches the result, so a following split
+        reuses the analysis instead of evaluating all the shells again
+
+        Args:
+            meshes: list of mesh transforms
+        Returns:
+            analysis_report : a dict in format {mesh: {UDIM: number of shells}} ({mesh: {"error": message, "cross_shells": [..]}} for meshes with UV errors)
+        """
+        analysis_report = {}
+
+        for mesh in meshes:
+            analysis = self.get_udim_analysis(mesh)
+
+            if analysis["cross_shells"]:
+                analysis_report[mesh] = {
+                    "error" : "{0} shell(s) spanning across UDIMS".format(len(analysis["cross_shells"])),
+                    "cross_shells" : [(cross_shell["shell"],cross_shell["udims"]) for cross_shell in analysis["cross_shells"]],
+                }
+                continue
+
+            analysis_report[mesh] = dict((udim,len(shells)) for udim,shells in sorted(analysis["tile_shells"].items()))
+
+        return analysis_report
+
+    def split_mesh_into_udims(self,mesh,tiles_shells_dict,mode="partition"):
+        """
+        This function splits a mesh into multiple meshes based on UDIMs defined in the tiles_shells_dict.
+
+        Args:
+            mesh (str): The name of the original mesh to split.
+            tiles_shells_dict (dict): Dictionary with UDIMs as keys and lists of face strings as values (from get_udim_shells).
+            mode (str): "partition" builds every UDIM mesh from a single working copy, "duplicate" duplicates the whole mesh for every UDIM
+        Returns:
+            None
+        """
+        logger.info("Splitting "+mesh.split('|')[-1])
+
+        mesh_name = mesh.split('|')[-1] #get only the last name
+
+        # Create the new meshes with the chosen split mode
+        if mode == "partition":
+            new_meshes = self.partition_mesh_into_udims(mesh,tiles_shells_dict)
+        else:
+            new_meshes = self.duplicate_mesh_into_udims(mesh,tiles_shells_dict)
+
+        # Create a new group for the split meshes
+        group_name = "{}_GRP".format(mesh_name.split("_render")[0])
+        cmds.group(new_meshes, name=group_name)
+
+        # Delete the original mesh
+        cmds.delete(mesh)
+        UDIM_ANALYSIS_CACHE.pop(mesh,None) #the cached analysis is no longer valid
+        logger.info("Deleted original mesh: {0}".format(mesh.split('|')[-1]))
+
+    def get_udim_mesh_name(self,mesh,udim):
+        """
+        This function returns the name of the split mesh for the passed UDIM
+
+        Args:
+            mesh (str): The name of the original mesh.
+            udim (int): UDIM tile number
+        Returns:
+            new_mesh_name : name of the new mesh
+        """
+        mesh_name = mesh.split('|')[-1] #get only the last name
+
+        #set suffix for duplicates
+        if "_render_GEO" in mesh: #if there is already a suffix
+            new_mesh_name = "{0}_{1}_render_GEO".format(mesh_name.split("_render")[0], udim)
+
+        else:
+            suffix = "_render_GEO"
+            new_mesh_name = "{0}_{1}".format(mesh_name, udim)+suffix
+
+        return new_mesh_name
+
+    def duplicate_mesh_into_udims(self,mesh,tiles_shells_dict):
+        """
+        This function creates the UDIM meshes by duplicating the whole mesh for every UDIM and deleting the faces of the other UDIMs.
+
+        Args:
+            mesh (str): The name of the original mesh to split.
+            tiles_shells_dict (dict): Dictionary with UDIMs as keys and lists of face strings as values.
+        Returns:
+            new_meshes : list of the new mesh names
+        """
+        # Create a list to hold the new mesh names
+        new_meshes = [] 
+
+        #throttled GUI updates
+        progress = self.get_progress_reporter(len(tiles_shells_dict.keys()),"Splitting Mesh: ({current}/{total})")
+        progress.update(0)
+
+        # Iterate through the udim dictionary
+        for udim, shell_faces in tiles_shells_dict.items():
+            
+            new_mesh_name = self.get_udim_mesh_name(mesh,udim)
+
+            #get only the f[1],f[2]... list
+            only_faces_list = []
+            for original_face in shell_faces:
+                only_faces_list.append(original_face.split('.')[-1])
+            
+
+            # Duplicate the original mesh
+            new_mesh = cmds.duplicate(mesh,name = new_mesh_name)[0]  # Get the new mesh name
+
+            faces_to_be_kept = []
+
+            #build the new faces list
+            for face in only_faces_list:
+                faces_to_be_kept.append(new_mesh_name+"."+face)
+
+            #clear selection
+            cmds.select(cl=True)
+
+            #selec the appropriate faces
+            cmds.select(faces_to_be_kept)  
+            cmds.select(new_mesh_name+".f[*]", tgl=True) #invert selection
+            cmds.delete() 
+
+            # Add the new mesh to the list
+            new_meshes.append(new_mesh_name)
+
+            logger.info("Created mesh: {0} with faces: {1}".format(new_mesh_name, str(shell_faces))) 
+
+            #update Tracker
+            progress.step()
+
+        return new_meshes
+
+    def partition_mesh_into_udims(self,mesh,tiles_shells_dict):
+        """
+        This function creates the UDIM meshes from a single working copy of the mesh. The faces of every UDIM are chipped off once,
+        the copy is separated and the pieces are combined back per UDIM, so only one extra copy of the mesh is ever in memory.
+
+        Args:
+            mesh (str): The name of the original mesh to split.
+            tiles_shells_dict (dict): Dictionary with UDIMs as keys and lists of face strings as values.
+        Returns:
+            new_meshes : list of the new mesh names
+        """
+        # Create a list to hold the new mesh names
+        new_meshes = [] 
+
+        mesh_name = mesh.split('|')[-1] #get only the last name
+
+        # Single working copy of the mesh
+        working_mesh = cmds.duplicate(mesh,name = mesh_name+"_udimSplit_TMP")[0]
+        cmds.delete(working_mesh,constructionHistory=True)
+
+        #detach the faces of every UDIM from each other (face indices stay the same)
+        for udim, shell_faces in tiles_shells_dict.items():
+            faces_to_chip = [working_mesh+"."+face.split('.')[-1] for face in shell_faces]
+            cmds.polyChipOff(faces_to_chip, duplicate=False, keepFacesTogether=True, constructionHistory=False)
+
+        #separate the working copy into its pieces, each piece now belongs to a single UDIM
+        pieces = cmds.ls(cmds.polySeparate(working_mesh, constructionHistory=False), type="transform", long=True)
+
+        # Dictionary to store UDIM tile number and its pieces
+        udim_pieces = {}
+        for piece in pieces:
+            udim = udimShellEngine.get_mesh_tile(piece)
+            if udim not in tiles_shells_dict:
+                continue #faces without UVs dont belong to any UDIM
+            if udim not in udim_pieces:
+                udim_pieces[udim] = []
+            udim_pieces[udim].append(piece)
+
+        #throttled GUI updates
+        progress = self.get_progress_reporter(len(udim_pieces.keys()),"Splitting Mesh: ({current}/{total})")
+        progress.update(0)
+
+        # Iterate through the udim pieces and build one mesh per UDIM
+        for udim, udim_meshes in sorted(udim_pieces.items()):
+
+            new_mesh_name = self.get_udim_mesh_name(mesh,udim)
+
+            if len(udim_meshes) == 1:
+                #a single piece only needs to be taken out of the working copy
+                piece = cmds.parent(udim_meshes[0], world=True)[0]
+                new_mesh = cmds.rename(piece, new_mesh_name)
+            else:
+                #combine the pieces of this UDIM back into one mesh
+                new_mesh = cmds.polyUnite(udim_meshes, name=new_mesh_name, mergeUVSets=1, constructionHistory=False)[0]
+
+            # Add the new mesh to the list
+            new_meshes.append(new_mesh)
+
+            logger.info("Created mesh: {0} with faces: {1}".format(new_mesh, str(tiles_shells_dict[udim]))) 
+
+            #update Tracker
+            progress.step()
+
+        #remove whatever is left of the working copy
+        if cmds.objExists(working_mesh):
+            cmds.delete(working_mesh)
+
+        return new_meshes
+
+class UDIM_SEPERATOR(QtWidgets.QWidget,UDIM_SEPERATOR_CORE):
     """
     This is a UDIM_SEPERATOR class that lets us create the UI for this tool 
     
@@ -43,8 +454,11 @@ class UDIM_SEPERATOR(QtWidgets.QWidget):
         __init__: This is the Constructor function to initialize all the necessary variables ,and call the build_UI method
         build_UI: This method builds the UI for the tool and makes respective connections 
         main : This is the main function that contains the main functionality to call other methods
-        get_udim_shells : This is the function that returns a dictionary of all the shells in the passed geometry based on the UDIM
-        split_mesh_into_udims: This function splits a mesh into multiple meshes based on UDIMs defined in the tiles_faces_dict.
+        analyze : This function runs the analyze only mode on the selection and reports the UDIMS of every mesh
+        report_cross_udim_shells : This function reports all the shells spanning across UDIMS in the log and the UI
+        update_status : This function shows the passed progress message under the status label and forces the GUI updates
+        get_progress_reporter : This function returns a progress reporter that updates the status label at a throttled rate
+        (the UDIM functionality itself is inherited from UDIM_SEPERATOR_CORE)
     """
     def __init__(self):
         """ 
@@ -93,16 +507,38 @@ class UDIM_SEPERATOR(QtWidgets.QWidget):
         #create layout
         self.main_layout = QtWidgets.QGridLayout()
 
-        #add button
+        #add buttons
+        analyze_btn = QtWidgets.QPushButton("Analyze selected object(s)")
+        analyze_btn.setToolTip("Reports the UDIMS of the selection without changing the scene (the result is reused by the seperation)")
         seperate_btn = QtWidgets.QPushButton("Seperate selected object(s)")
 
+        #split mode dropdown
+        self.mode_dropdown = QtWidgets.QComboBox()
+        self.mode_dropdown.addItem("Partition Faces (Low Memory)","partition")
+        self.mode_dropdown.addItem("Duplicate per UDIM","duplicate")
+
+        #collect all UV errors checkbox
+        self.collect_errors_checkbox = QtWidgets.QCheckBox("Collect all UV errors first")
+        self.collect_errors_checkbox.setToolTip("Checks every selected mesh for shells spanning across UDIMS before splitting and selects all of them at once")
+        self.collect_errors_checkbox.setChecked(True)
+
+        #undo checkbox
+        self.undo_checkbox = QtWidgets.QCheckBox("Undo")
+        self.undo_checkbox.setToolTip("Records the whole seperation as a single undo step. Turn it off for faster runs on big selections")
+        self.undo_checkbox.setChecked(True)
+
         #set  and add to layout
         self.setLayout(self.main_layout)
-        self.main_layout.addWidget(seperate_btn,0,0)
-        self.main_layout.addWidget(self.progress_bar,1,0)
-        self.main_layout.addWidget(self.status_label,2,0)
+        self.main_layout.addWidget(analyze_btn,0,0)
+        self.main_layout.addWidget(seperate_btn,0,1)
+        self.main_layout.addWidget(self.mode_dropdown,0,2)
+        self.main_layout.addWidget(self.collect_errors_checkbox,0,3)
+        self.main_layout.addWidget(self.undo_checkbox,0,4)
+        self.main_layout.addWidget(self.progress_bar,1,0,1,5)
+        self.main_layout.addWidget(self.status_label,2,0,1,5)
 
         #connections
+        analyze_btn.clicked.connect(self.analyze)
         seperate_btn.clicked.connect(self.main)
 
     def main(self):
@@ -134,120 +570,114 @@ class UDIM_SEPERATOR(QtWidgets.QWidget):
             logger.debug(selected_items)
 
             # Flatten the list of all meshes in the selection, including those within groups
-            all_selected_meshes = []
-
-            for item in selected_items:
-                
-                # Find all mesh objects in the hierarchy (including groups)
-                all_meshes = cmds.listRelatives(item, allDescendents=True, type="mesh", fullPath=True) or []
-
-                # Remove any intermediate objects (if they exist)
-                all_meshes = [mesh for mesh in all_meshes if not cmds.getAttr("{0}.intermediateObject".format(mesh))]
+            all_selected_meshes, skipped_objects = self.get_meshes(selected_items)
 
-                logger.debug("Removed Intermediates: "+ str(all_meshes))
-
-                all_meshes = [cmds.listRelatives(mesh, parent=True, fullPath=True)[0] for mesh in all_meshes]  # get parent transform nodes
-
-                if not all_meshes:
-                    logger.info("Skipping {} as it contains no meshes.".format(item))
-                    skipped_objects += 1
-                    continue
+            logger.debug("Selected Meshes: "+ str(all_selected_meshes))
 
-                all_selected_meshes.extend(all_meshes)
-                
+            #collect every shell spanning across UDIMS in one pass before splitting anything
+            if self.collect_errors_checkbox.isChecked():
+                cross_udim_shells = self.find_cross_udim_shells(all_selected_meshes)
 
-            logger.debug("Selected Meshes: "+ str(all_selected_meshes))
+                if cross_udim_shells:
+                    self.report_cross_udim_shells(cross_udim_shells)
+                    return
 
             total_steps = len(all_selected_meshes) #total steps for progress
 
+            self.undo_enabled = self.undo_checkbox.isChecked()
+
             i=0 #tracker for iterations
             udim_meshes = [] #tracker for number of objects with udims
             seperated_meshes=0 #tracker for seperated objects
-            skipped_objects = 0 #tracker for skipped meshes
             
 
-            #iterate through all the meshes
-            for mesh in all_selected_meshes:
+            #seperate everything as a single operation (one undo chunk, no viewport redraws)
+            seperation_start = time.time()
+            with self.seperator_operation():
+                #iterate through all the meshes
+                for mesh in all_selected_meshes:
                 
-                #start label
-                shells_message = "Initializing Shells Check..."
-                if i == 0:
-                    self.status_label.setText(shells_message)
-                    self.progress_bar.setValue(1) #start progress
-                else:
-                    self.status_label.setText(self.status_message+"\n"+shells_message) #go to next line
-
-                i=i+1 #add the step counter
-                                    #update label
-                self.status_message = "Status : {0}/{1} | Current Object : {2} | Seperated Objects : {3} | Skipped Objects: {4}".format(str(i),str(total_steps),mesh.split('|')[-1], str(seperated_meshes),str(skipped_objects))
-                self.status_label.setText(self.status_message)
-
-                shape_node = cmds.listRelatives(mesh, shapes=True) #go inside the transform node
-
-                if not shape_node:
-                    #error out in the UI
-                    message = "Found an Invalid Selection "
-                    self.status_label.setText(message)
-
-                    om.MGlobal.displayWarning("Found an Invalid Selection ")
-                    return
+                    #start label
+                    shells_message = "Initializing Shells Check..."
+                    if i == 0:
+                        self.status_label.setText(shells_message)
+                        self.progress_bar.setValue(1) #start progress
+                    else:
+                        self.status_label.setText(self.status_message+"\n"+shells_message) #go to next line
 
-                try:
-                    node_type = cmds.nodeType(shape_node[0]) #node type of shape
-                    logging.debug(node_type)
-                    if node_type == "mesh":
-                        tiles_shells_dict = self.get_udim_shells(mesh)
+                    i=i+1 #add the step counter
+                                        #update label
+                    self.status_message = "Status : {0}/{1} | Current Object : {2} | Seperated Objects : {3} | Skipped Objects: {4}".format(str(i),str(total_steps),mesh.split('|')[-1], str(seperated_meshes),str(skipped_objects))
+                    self.status_label.setText(self.status_message)
 
-                        if len(tiles_shells_dict.keys())==1:
-                            logger.info("Skipping {0} since there is only one single UDIM".format(mesh))
-                            #update tracker  
-                            skipped_objects+=1
+                    shape_node = cmds.listRelatives(mesh, shapes=True) #go inside the transform node
+
+                    if not shape_node:
+                        #error out in the UI
+                        message = "Found an Invalid Selection "
+                        self.status_label.setText(message)
+
+                        om.MGlobal.displayWarning("Found an Invalid Selection ")
+                        return
+
+                    try:
+                        node_type = cmds.nodeType(shape_node[0]) #node type of shape
+                        logging.debug(node_type)
+                        if node_type == "mesh":
+                            tiles_shells_dict = self.get_udim_shells(mesh)
+
+                            if len(tiles_shells_dict.keys())<=1:
+                                logger.info("Skipping {0} since there is only one single UDIM".format(mesh))
+                                #update tracker  
+                                skipped_objects+=1
 
-                        else:
-                            
-                            #set the message in UI
-                            mesh_message = "Initializing Mesh Split..."
-                            if i ==0:
-                                self.status_label.setText(mesh_message)
                             else:
-                                self.status_label.setText(self.status_message+"\n"+mesh_message) #go to next line
+                            
+                                #set the message in UI
+                                mesh_message = "Initializing Mesh Split..."
+                                if i ==0:
+                                    self.status_label.setText(mesh_message)
+                                else:
+                                    self.status_label.setText(self.status_message+"\n"+mesh_message) #go to next line
 
 
-                            QtWidgets.QApplication.processEvents() #force the GUI updates
+                                QtWidgets.QApplication.processEvents() #force the GUI updates
 
-                            self.split_mesh_into_udims(mesh,tiles_shells_dict) #split the mesh
-                            #update tracker
-                            seperated_meshes+=1
-                            udim_meshes.append(mesh)
+                                self.split_mesh_into_udims(mesh,tiles_shells_dict,mode=self.mode_dropdown.currentData()) #split the mesh
+                                #update tracker
+                                seperated_meshes+=1
+                                udim_meshes.append(mesh)
                     
-                    else:
-                        logger.info("Skipping since {0} is not a mesh".format(mesh.split('|')[-1]))
-                        skipped_objects+=1
+                        else:
+                            logger.info("Skipping since {0} is not a mesh".format(mesh.split('|')[-1]))
+                            skipped_objects+=1
 
-                except UVShellError:
-                    #update progressbar
-                    self.progress_bar.setValue(100)
-                    self.progress_bar.setStyleSheet("QProgressBar {border: 0px;} QProgressBar::chunk {background-color: rgb(200, 0, 0);};")
+                    except UVShellError:
+                        #update progressbar
+                        self.progress_bar.setValue(100)
+                        self.progress_bar.setStyleSheet("QProgressBar {border: 0px;} QProgressBar::chunk {background-color: rgb(200, 0, 0);};")
 
-                    #update label
-                    error_message = "UV Error: There is a shell that is spanning across UDIMS in {0} (Check log)".format(mesh.split('|')[-1])
-                    self.status_label.setText(error_message)
+                        #update label
+                        error_message = "UV Error: There is a shell that is spanning across UDIMS in {0} (Check log)".format(mesh.split('|')[-1])
+                        self.status_label.setText(error_message)
 
-                    return
-                except RuntimeError:
-                    logger.error("There was a RunTime error while Trying to Split".format(mesh.split('|')[-1]))
-                except:
-                    logger.error("There seems to be an error in the mesh/UV".format(mesh.split('|')[-1]))
-                    skipped_objects+=1
+                        return
+                    except RuntimeError:
+                        logger.error("There was a RunTime error while Trying to Split".format(mesh.split('|')[-1]))
+                    except:
+                        logger.error("There seems to be an error in the mesh/UV".format(mesh.split('|')[-1]))
+                        skipped_objects+=1
 
 
-                #update label
-                self.status_message = "Status : {0}/{1} | Current Object : {2} | Seperated Objects : {3} | Skipped Objects: {4}".format(str(i),str(total_steps),mesh.split('|')[-1], str(seperated_meshes),str(skipped_objects))
-                self.status_label.setText(self.status_message)
+                    #update label
+                    self.status_message = "Status : {0}/{1} | Current Object : {2} | Seperated Objects : {3} | Skipped Objects: {4}".format(str(i),str(total_steps),mesh.split('|')[-1], str(seperated_meshes),str(skipped_objects))
+                    self.status_label.setText(self.status_message)
+
+                    #update progress bar
+                    progress_value = int((float(i) / total_steps) * 100)
+                    self.progress_bar.setValue(progress_value)#set the value
 
-                #update progress bar
-                progress_value = int((float(i) / total_steps) * 100)
-                self.progress_bar.setValue(progress_value)#set the value
+            seperation_time = time.time() - seperation_start
 
 
             #set final label   
@@ -269,179 +699,97 @@ class UDIM_SEPERATOR(QtWidgets.QWidget):
         #LOG the FINAL OUTPUT
         end_time = time.time()  # Record the end time
         elapsed_time = (end_time - start_time) / 60  # Calculate the time taken
-        logger.info("Function completed in {0:.2f} minutes".format(elapsed_time))  # Log the time taken
+        seconds_per_object = seperation_time / seperated_meshes if seperated_meshes else 0.0 #to compare runs with different undo/refresh settings
+        logger.info("Function completed in {0:.2f} minutes (Seperation : {1:.2f} seconds | {2:.2f} seconds per seperated object | Undo : {3} | Viewport refresh suspended : {4})".format(elapsed_time,seperation_time,seconds_per_object,"single chunk" if self.undo_enabled else "disabled",self.suspend_refresh))  # Log the time taken
 
-    def get_udim_shells(self,geometry):
+    def report_cross_udim_shells(self,cross_udim_shells):
         """
-        This is the function that returns a dictionary of all the shells in the passed geometry based on the UDIM
-        
+        This function reports all the shells spanning across UDIMS in the log and the UI
+
         Args:
-            geometry: mesh to determine the UDIMS
+            cross_udim_shells: dict returned by find_cross_udim_shells
         Returns:
-            udim_shells_dict : a dictionary containing the UDIM and shells data of the passed geometry
+            None
         """
-        # Ensure the input geometry is valid
-        if not cmds.objExists(geometry):
-            raise ValueError("{0} Geometry does not exist.".format(geometry))
-
-        # Get the total number of UV shells
-        shell_count = cmds.polyEvaluate(geometry, uvShell=True)
-        
-        #update the UI
-
+        shell_count = 0
+        for mesh,cross_shells in cross_udim_shells.items():
+            for cross_shell in cross_shells:
+                logger.error("{0} shell {1} is spanning across UDIMS {2}".format(mesh.split('|')[-1],cross_shell["shell"],", ".join(str(udim) for udim in cross_shell["udims"])))
+                shell_count+=1
+
+        #update progressbar
+        self.progress_bar.setValue(100)
+        self.progress_bar.setStyleSheet("QProgressBar {border: 0px;} QProgressBar::chunk {background-color: rgb(200, 0, 0);};")
+
+        #update label
+        error_message = "UV Error: {0} shell(s) spanning across UDIMS in {1} object(s) are selected (Check log)".format(shell_count,len(cross_udim_shells))
+        self.status_label.setText(error_message)
+        om.MGlobal.displayError(error_message)
+
+    def analyze(self):
+        """
+        This function runs the analyze only mode on the selection and reports the UDIMS of every mesh
 
-        # Initialize a dict to store UV shells
-        uv_shells = {} 
-        
-        # Iterate over each shell ID to retrieve its UVs 
-        for shell_id in range(shell_count):
-            # Query the UVs in the current shell
-            uv_shell = cmds.polyEvaluate(geometry, uvsInShell=shell_id)
-            uv_shells[shell_id]=uv_shell #format {0:'obj.map[1:20],'obj..'...'}
-        
-        
-        # Dictionary to store UDIM tile number and UV Shells
-        udim_shells_dict = {} 
+        Args:
+            None
+        Returns:
+            analysis_report : a dict in format {mesh: {UDIM: number of shells}}
+        """
+        start_time = time.time()  # Record the start time
 
-        # Iterate over each shells
-        for shell_id,shell_uvs in uv_shells.items():
+        if not cmds.ls(sl=True):
+            #error out in the UI
+            self.status_label.setText("Nothing is selected")
+            om.MGlobal.displayError("Please select a mesh to analyze")
+            raise RuntimeError("Please select a mesh to analyze")
 
-            message = "Analyzing UV Shells: ({0}/{1})".format(shell_id+1,shell_count)
+        meshes, skipped_objects = self.get_meshes(cmds.ls(sl=True))
 
-            self.status_label.setText(self.status_message+"\n"+message)
-            QtWidgets.QApplication.processEvents() #force the GUI updates
-            
-            #calculate the bouding box
-            bbox = cmds.polyEvaluate(shell_uvs,bc2=True) #return (umin,umax)(vmin,vmax)
-            logger.debug("Calculating Bounding box of shell: {} ".format(shell_uvs))
-            
-            # Tracker to see if all UVs belong to the same UDIM tile
-            uv_udim = None
-            shell_in_single_udim = True
-            
-            #store the correct coordinates from the bounding box return value
-            minimum_coord = (bbox[0][0],bbox[1][0]) #save only the minimum coordinate (u,v)
-            maximum_coord = (bbox[0][1],bbox[1][1])
-            
-            #make a list out of it
-            coord_to_check = [minimum_coord,maximum_coord]
+        self.status_message = "Analyzing {0} object(s)".format(len(meshes))
+        self.status_label.setText(self.status_message)
+        self.progress_bar.setValue(0) #reset progress
 
-            logger.debug("Checking if the above shells exist in single UDIM")
+        analysis_report = self.analyze_udims(meshes)
 
-            # Loop over the above list to check UDIM tiles
-            for uv_coord in coord_to_check:
-                
-                u_coord, v_coord = uv_coord[0], uv_coord[1]
+        #log the report
+        logger.info("UDIM analysis report:\n"+pprint.pformat(analysis_report))
 
-                # Determining UDIM tile
-                
-                #integer conversion to get the whole number
-                u_tile = int(u_coord) 
-                v_tile = int(v_coord)
-
-                current_udim = 1001 + u_tile+ (v_tile * 10) #UDIM Tile number formula 1001+(10×V_tile)+(U_tile)
-
-                # On first UV, initialize the UDIM
-                if uv_udim is None:
-                    uv_udim = current_udim
-                # If UVs don't match the first UV's UDIM, this shell crosses UDIMs
-                elif current_udim != uv_udim:
-                    shell_in_single_udim = False
-                    break
-
-            # If all UVs are in the same UDIM, append this shell to the dictionary
-            if shell_in_single_udim:
-                if uv_udim not in udim_shells_dict:
-                    udim_shells_dict[uv_udim] = []
-                udim_shells_dict[uv_udim].extend(shell_uvs)
-                logging.debug("Added shell to {0} in the dictionary".format(str(uv_udim)))
-            else:
-                #select the incorrect shell
-                cmds.select(cl=True)
-                cmds.select(shell_uvs)
+        #set final label
+        udim_meshes = [mesh for mesh,udims in analysis_report.items() if "error" not in udims and len(udims)>1]
+        error_meshes = [mesh for mesh,udims in analysis_report.items() if "error" in udims]
+        self.status_message = "Analyzed Objects : {0} | Objects to seperate : {1} | Objects with UV Errors : {2} | Skipped Objects: {3} (Check log)".format(len(meshes),len(udim_meshes),len(error_meshes),skipped_objects)
+        self.status_label.setText(self.status_message)
+        self.progress_bar.setValue(100)
 
-                #error it out
-                om.MGlobal.displayError("There is a shell that is spanning across UDIMS (check {0})".format(current_udim))
-                raise UVShellError("There is a shell that is spanning across UDIMS (check {0})".format(current_udim))
-                return None
+        logger.info("Analysis completed in {0:.2f} seconds".format(time.time() - start_time))
 
-        return udim_shells_dict
+        return analysis_report
 
-    def split_mesh_into_udims(self,mesh,tiles_shells_dict):
+    def update_status(self,message):
         """
-        This function splits a mesh into multiple meshes based on UDIMs defined in the tiles_shells_dict.
+        This function shows the passed progress message under the status label and forces the GUI updates
 
         Args:
-            mesh (str): The name of the original mesh to split.
-            tiles_faces_dict (dict): Dictionary with UDIMs as keys and lists of face strings as values.
+            message: progress message to display
         Returns:
             None
         """
-        logger.info("Splitting "+mesh.split('|')[-1])
-
-        # Create a list to hold the new mesh names
-        new_meshes = [] 
+        self.status_label.setText(self.status_message+"\n"+message)
+        QtWidgets.QApplication.processEvents() #force the GUI updates
 
-        mesh_name = mesh.split('|')[-1] #get only the last name
-        
-        #trackers for GUI Updates
-        total_count = len(tiles_shells_dict.keys())
-        i = 1 
-        # Iterate through the udim dictionary
-        for udim, uv_shells in tiles_shells_dict.items():
-            message = "Splitting Mesh: ({0}/{1})".format(i,total_count)
-            self.status_label.setText(self.status_message+"\n"+message)
-            QtWidgets.QApplication.processEvents() #force the GUI updates
-            
-            #set suffix for duplicates
-            if "_render_GEO" in mesh: #if there is already a suffix
-                new_mesh_name = "{0}_{1}_render_GEO".format(mesh_name.split("_render")[0], udim)
-                
-            else:
-                suffix = "_render_GEO"
-                new_mesh_name = "{0}_{1}".format(mesh_name, udim)+suffix
-
-            #get only the map[1],map[2]... list
-            only_uvs_list = []
-            for original_uv_shell in uv_shells:
-                only_uvs_list.append(original_uv_shell.split('.')[-1])
-            
-
-            # Duplicate the original mesh
-            new_mesh = cmds.duplicate(mesh,name = new_mesh_name)[0]  # Get the new mesh name
-
-            shells_to_be_kept = []
-
-            #build the new shells list
-            for uv_shell in only_uvs_list:
-                shells_to_be_kept.append(new_mesh_name+"."+uv_shell)
-
-            #convert the uvs to faces
-            faces_to_be_kept = cmds.polyListComponentConversion(shells_to_be_kept, toFace=True)
-
-            #clear selection
-            cmds.select(cl=True)
-
-            #selec the appropriate faces
-            cmds.select(faces_to_be_kept)  
-            cmds.select(new_mesh_name+".f[*]", tgl=True) #invert selection
-            cmds.delete() 
-
-            # Add the new mesh to the list
-            new_meshes.append(new_mesh_name)
-
-            logger.info("Created mesh: {0} with shells: {1}".format(new_mesh_name, str(uv_shells))) 
-
-            #update Tracker
-            i+=1
-        # Create a new group for the split meshes
-        group_name = "{}_GRP".format(mesh_name.split("_render")[0])
-        cmds.group(new_meshes, name=group_name)
+    def get_progress_reporter(self,total,message):
+        """
+        This function returns a progress reporter that updates the status label at a throttled rate
 
-        # Delete the original mesh
-        cmds.delete(mesh)
-        logger.info("Deleted original mesh: {0}".format(mesh.split('|')[-1]))
+        Args:
+            total: total number of steps of the loop
+            message: message template with {current} and {total}
+        Returns:
+            ProgressReporter instance
+        """
+        return progressReporter.ProgressReporter(total,sink=lambda percent,message : self.update_status(message),message=message)
 
 #make instance of the main class and show it
-UV_window = UDIM_SEPERATOR()
-UV_window.show()
+if __name__ == "__main__":
+    UV_window = UDIM_SEPERATOR()
+    UV_window.show()
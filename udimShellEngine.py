@@ -0,0 +1,787 @@
+"""
+Script Name: udimShellEngine.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This module reads the UV shells of a mesh through the OpenMaya API and works out the UDIM tile of every shell in one pass
+"""
+import array
+import hashlib
+import math
+
+try:
+    import maya.cmds as cmds
+except ImportError:
+    cmds = None
+
+try:
+    import maya.api.OpenMaya as om2
+except ImportError: #lets the UV maths below be used and tested outside of maya
+    om2 = None
+
+try:
+    import numpy as np
+except ImportError: #fall back to the pure python shell bounds
+    np = None
+
+
+def get_mesh_fn(mesh):
+    """
+    This function returns the MFnMesh function set for the passed mesh
+
+    Args:
+        mesh: name of the mesh (transform or shape)
+    Returns:
+        mesh_fn : MFnMesh of the mesh
+    """
+    selection_list = om2.MSelectionList()
+    selection_list.add(mesh)
+    dag_path = selection_list.getDagPath(0)
+    dag_path.extendToShape() #go inside the transform node
+
+    return om2.MFnMesh(dag_path)
+
+def udim_from_uv(u_coord,v_coord):
+    """
+    This function returns the UDIM tile number of the passed UV coordinate (the tile is floored, so negative UVs get their own tiles)
+
+    Args:
+        u_coord: U coordinate
+        v_coord: V coordinate
+    Returns:
+        UDIM tile number
+    """
+    return 1001 + int(math.floor(u_coord)) + (int(math.floor(v_coord)) * 10) #UDIM Tile number formula 1001+(10×V_tile)+(U_tile)
+
+def get_shell_bounds(shell_count,shell_ids,u_array,v_array):
+    """
+    This function calculates the UV bounding box of every shell in a single pass over the flat UV arrays
+
+    Args:
+        shell_count: number of UV shells
+        shell_ids: shell id of every UV (same length as the UV arrays)
+        u_array: U coordinate of every UV
+        v_array: V coordinate of every UV
+    Returns:
+        shell_bounds : a list of (umin,umax,vmin,vmax) for every shell id
+    """
+    min_u = [float("inf")] * shell_count
+    max_u = [float("-inf")] * shell_count
+    min_v = [float("inf")] * shell_count
+    max_v = [float("-inf")] * shell_count
+
+    for uv_index,shell_id in enumerate(shell_ids):
+        u_coord = u_array[uv_index]
+        v_coord = v_array[uv_index]
+
+        if u_coord < min_u[shell_id]:
+            min_u[shell_id] = u_coord
+        if u_coord > max_u[shell_id]:
+            max_u[shell_id] = u_coord
+        if v_coord < min_v[shell_id]:
+            min_v[shell_id] = v_coord
+        if v_coord > max_v[shell_id]:
+            max_v[shell_id] = v_coord
+
+    return list(zip(min_u,max_u,min_v,max_v))
+
+def get_shell_tiles(shell_bounds):
+    """
+    This function returns the UDIM tile of every shell, or None if the shell is spanning across UDIMS
+
+    Args:
+        shell_bounds: a list of (umin,umax,vmin,vmax) for every shell id
+    Returns:
+        shell_tiles : a list containing the UDIM tile (or None) for every shell id
+    """
+    shell_tiles = []
+
+    for min_u,max_u,min_v,max_v in shell_bounds:
+        min_udim = udim_from_uv(min_u,min_v)
+        max_udim = udim_from_uv(max_u,max_v)
+
+        if min_udim == max_udim:
+            shell_tiles.append(min_udim)
+        else:
+            shell_tiles.append(None) #shell is spanning across UDIMS
+
+    return shell_tiles
+
+def classify_shells(u_array,v_array,shell_ids,shell_count=None):
+    """
+    This function is the vectorized version of get_shell_bounds and get_shell_tiles. It sorts the UVs by shell once
+    and reduces every shell's min/max with numpy, so the UDIM test runs in bulk instead of a python loop per shell
+
+    Args:
+        u_array: U coordinate of every UV
+        v_array: V coordinate of every UV
+        shell_ids: shell id of every UV (same length as the UV arrays)
+        shell_count: number of UV shells (max shell id + 1 if None)
+    Returns:
+        shell_bounds : a (shell_count,4) array of (umin,umax,vmin,vmax) for every shell id
+        shell_tiles : an array containing the UDIM tile of the minimum corner of every shell (-1 for shells without UVs)
+        cross_tile : a boolean array that is True for the shells spanning across UDIMS
+    """
+    u_array = np.asarray(u_array,dtype=np.float64)
+    v_array = np.asarray(v_array,dtype=np.float64)
+    shell_ids = np.asarray(shell_ids,dtype=np.int64)
+
+    if shell_count is None:
+        shell_count = int(shell_ids.max()) + 1 if shell_ids.size else 0
+
+    shell_bounds = np.empty((shell_count,4),dtype=np.float64)
+    shell_bounds[:,0::2] = np.inf #min columns
+    shell_bounds[:,1::2] = -np.inf #max columns
+    shell_tiles = np.full(shell_count,-1,dtype=np.int64)
+    cross_tile = np.zeros(shell_count,dtype=bool)
+
+    if not shell_ids.size:
+        return shell_bounds, shell_tiles, cross_tile
+
+    #group the UVs of every shell together so each shell is one contiguous slice
+    order = np.argsort(shell_ids,kind="stable")
+    sorted_ids = shell_ids[order]
+    sorted_u = u_array[order]
+    sorted_v = v_array[order]
+
+    starts = np.flatnonzero(np.concatenate(([True],sorted_ids[1:] != sorted_ids[:-1]))) #first UV of every shell
+    present = sorted_ids[starts] #shell ids that own UVs
+
+    shell_bounds[present,0] = np.minimum.reduceat(sorted_u,starts)
+    shell_bounds[present,1] = np.maximum.reduceat(sorted_u,starts)
+    shell_bounds[present,2] = np.minimum.reduceat(sorted_v,starts)
+    shell_bounds[present,3] = np.maximum.reduceat(sorted_v,starts)
+
+    #same formula as udim_from_uv, for every shell at once
+    min_tiles = 1001 + np.floor(shell_bounds[present,0]).astype(np.int64) + np.floor(shell_bounds[present,2]).astype(np.int64) * 10
+    max_tiles = 1001 + np.floor(shell_bounds[present,1]).astype(np.int64) + np.floor(shell_bounds[present,3]).astype(np.int64) * 10
+
+    shell_tiles[present] = min_tiles
+    cross_tile[present] = min_tiles != max_tiles
+
+    return shell_bounds, shell_tiles, cross_tile
+
+def offset_shell_uvs(u_array,v_array,shell_ids,shell_offsets):
+    """
+    This function moves every UV by the offset of its shell in one pass over the flat UV arrays
+
+    Args:
+        u_array: U coordinate of every UV
+        v_array: V coordinate of every UV
+        shell_ids: shell id of every UV (same length as the UV arrays)
+        shell_offsets: a list of (u_offset,v_offset) for every shell id
+    Returns:
+        u_array : moved U coordinate of every UV
+        v_array : moved V coordinate of every UV
+    """
+    if np is not None:
+        offsets_array = np.asarray(shell_offsets,dtype=np.float64).reshape(-1,2)
+        shell_ids = np.asarray(shell_ids,dtype=np.int64)
+        u_moved = np.asarray(u_array,dtype=np.float64) + offsets_array[shell_ids,0]
+        v_moved = np.asarray(v_array,dtype=np.float64) + offsets_array[shell_ids,1]
+        return u_moved.tolist(), v_moved.tolist()
+
+    u_moved = [u_coord + shell_offsets[shell_id][0] for u_coord,shell_id in zip(u_array,shell_ids)]
+    v_moved = [v_coord + shell_offsets[shell_id][1] for v_coord,shell_id in zip(v_array,shell_ids)]
+
+    return u_moved, v_moved
+
+def get_face_shells(mesh_fn,shell_ids,uv_set):
+    """
+    This function returns the shell id of every face of the mesh (-1 for faces without UVs)
+
+    Args:
+        mesh_fn: MFnMesh of the mesh
+        shell_ids: shell id of every UV
+        uv_set: name of the UV set
+    Returns:
+        face_shells : a list containing the shell id of every face
+    """
+    uv_counts, uv_ids = mesh_fn.getAssignedUVs(uv_set)
+
+    face_shells = []
+    offset = 0 #index of the first face vertex UV of the current face
+    for uv_count in uv_counts:
+        if uv_count:
+            face_shells.append(shell_ids[uv_ids[offset]])
+        else:
+            face_shells.append(-1) #unmapped face
+        offset += uv_count
+
+    return face_shells
+
+def get_udim_shell_data(mesh,uv_set=None):
+    """
+    This is the main function of the engine that returns the shell ids, the bounds and the UDIM tile of every shell of the mesh
+
+    Args:
+        mesh: name of the mesh
+        uv_set: name of the UV set (current UV set if None)
+    Returns:
+        shell_data : a dict in format {"shell_count": int, "shell_ids": [..], "shell_bounds": [..], "shell_tiles": [..], "face_shells": [..]}
+    """
+    mesh_fn = get_mesh_fn(mesh)
+
+    if not uv_set:
+        uv_set = mesh_fn.currentUVSetName()
+
+    #read everything in one go as flat arrays
+    shell_count, shell_ids = mesh_fn.getUvShellsIds(uv_set)
+    u_array, v_array = mesh_fn.getUVs(uv_set)
+
+    shell_ids = list(shell_ids)
+
+    if np is not None:
+        bounds_array, tiles_array, cross_tile = classify_shells(u_array,v_array,shell_ids,shell_count)
+        shell_bounds = [tuple(bounds) for bounds in bounds_array.tolist()]
+        shell_tiles = [None if crossing else tile for tile,crossing in zip(tiles_array.tolist(),cross_tile.tolist())]
+    else:
+        shell_bounds = get_shell_bounds(shell_count,shell_ids,u_array,v_array)
+        shell_tiles = get_shell_tiles(shell_bounds)
+
+    shell_data = {
+        "shell_count" : shell_count,
+        "shell_ids" : shell_ids,
+        "shell_bounds" : shell_bounds,
+        "shell_tiles" : shell_tiles,
+        "face_shells" : get_face_shells(mesh_fn,shell_ids,uv_set),
+    }
+
+    return shell_data
+
+def get_mesh_tile(mesh,uv_set=None):
+    """
+    This function returns the UDIM tile of the first mapped UV of the mesh (used for meshes that sit in a single UDIM)
+
+    Args:
+        mesh: name of the mesh
+        uv_set: name of the UV set (current UV set if None)
+    Returns:
+        UDIM tile number, or None if the mesh has no mapped faces
+    """
+    mesh_fn = get_mesh_fn(mesh)
+
+    if not uv_set:
+        uv_set = mesh_fn.currentUVSetName()
+
+    uv_counts, uv_ids = mesh_fn.getAssignedUVs(uv_set)
+    if not len(uv_ids):
+        return None
+
+    u_coord, v_coord = mesh_fn.getUV(uv_ids[0],uv_set)
+
+    return udim_from_uv(u_coord,v_coord)
+
+def get_mesh_hash(mesh,uv_set=None):
+    """
+    This function returns a hash of the topology and UVs of the mesh, used to know if a cached analysis is still valid
+
+    Args:
+        mesh: name of the mesh
+        uv_set: name of the UV set (current UV set if None)
+    Returns:
+        hex digest of the hash
+    """
+    mesh_fn = get_mesh_fn(mesh)
+
+    if not uv_set:
+        uv_set = mesh_fn.currentUVSetName()
+
+    vertex_counts, vertex_ids = mesh_fn.getVertices()
+    uv_counts, uv_ids = mesh_fn.getAssignedUVs(uv_set)
+    u_array, v_array = mesh_fn.getUVs(uv_set)
+
+    mesh_hash = hashlib.md5(uv_set.encode("utf-8"))
+    for values,typecode in ((vertex_counts,"i"),(vertex_ids,"i"),(uv_counts,"i"),(uv_ids,"i"),(u_array,"f"),(v_array,"f")):
+        mesh_hash.update(array.array(typecode,values).tobytes())
+
+    return mesh_hash.hexdigest()
+
+def compress_indices(indices):
+    """
+    This function compresses a list of component indices into (start,end) ranges
+
+    Args:
+        indices: list of component indices
+    Returns:
+        ranges : a list of (start,end) tuples
+    """
+    ranges = []
+
+    for index in sorted(set(indices)):
+        if ranges and index == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0],index) #extend the current range
+        else:
+            ranges.append((index,index))
+
+    return ranges
+
+def to_components(mesh,component,indices):
+    """
+    This function converts a list of component indices into maya component strings like 'obj.f[0:10]'
+
+    Args:
+        mesh: name of the mesh
+        component: component type ('f','map','vtx'...)
+        indices: list of component indices
+    Returns:
+        components : a list of component strings
+    """
+    components = []
+
+    for start,end in compress_indices(indices):
+        if start == end:
+            components.append("{0}.{1}[{2}]".format(mesh,component,start))
+        else:
+            components.append("{0}.{1}[{2}:{3}]".format(mesh,component,start,end))
+
+    return components
+
+def get_tile_span(shell_bounds):
+    """
+    This function returns all the UDIM tiles covered by the passed bounding box
+
+    Args:
+        shell_bounds: (umin,umax,vmin,vmax) of the shell
+    Returns:
+        list of UDIM tile numbers
+    """
+    min_u,max_u,min_v,max_v = shell_bounds
+
+    return [udim_from_uv(u_tile,v_tile) for v_tile in range(int(math.floor(min_v)),int(math.floor(max_v))+1) for u_tile in range(int(math.floor(min_u)),int(math.floor(max_u))+1)]
+
+def get_used_tiles(shell_data,faces=None):
+    """
+    This function returns the UDIM tiles used by the shells of the passed faces, a shell across UDIMS uses every tile its bounds cover
+
+    Args:
+        shell_data: dict returned by get_udim_shell_data
+        faces: face indices to look at (every face of the mesh if None)
+    Returns:
+        tiles : set of UDIM tile numbers
+    """
+    face_shells = shell_data["face_shells"]
+    if faces is None:
+        shells = set(face_shells)
+    else:
+        shells = set(face_shells[face] for face in faces if face < len(face_shells))
+    shells.discard(-1) #unmapped faces
+
+    tiles = set()
+    for shell_id in shells:
+        tile = shell_data["shell_tiles"][shell_id]
+        if tile is None: #across UDIMS
+            tiles.update(get_tile_span(shell_data["shell_bounds"][shell_id]))
+        else:
+            tiles.add(tile)
+
+    return tiles
+
+def get_cross_tile_shells(shell_data):
+    """
+    This function returns every shell spanning across UDIMS with the tiles it spans and its UV indices (gathered in one pass over the UVs)
+
+    Args:
+        shell_data: dict returned by get_udim_shell_data
+    Returns:
+        cross_shells : a list in format [{"shell": shell id, "udims": [UDIM tiles], "uvs": [uv indices]}]
+    """
+    shell_uvs = dict((shell_id,[]) for shell_id,tile in enumerate(shell_data["shell_tiles"]) if tile is None)
+
+    if shell_uvs:
+        for uv_index,shell_id in enumerate(shell_data["shell_ids"]):
+            if shell_id in shell_uvs:
+                shell_uvs[shell_id].append(uv_index)
+
+    cross_shells = []
+    for shell_id in sorted(shell_uvs.keys()):
+        cross_shells.append({
+            "shell" : shell_id,
+            "udims" : get_tile_span(shell_data["shell_bounds"][shell_id]),
+            "uvs" : shell_uvs[shell_id],
+        })
+
+    return cross_shells
+
+def get_tile_shells(shell_data):
+    """
+    This function groups the shell ids of the mesh by their UDIM tile
+
+    Args:
+        shell_data: dict returned by get_udim_shell_data
+    Returns:
+        tile_shells : a dict in format {UDIM: [shell ids]}
+    """
+    tile_shells = {}
+
+    for shell_id,tile in enumerate(shell_data["shell_tiles"]):
+        if tile is None:
+            continue #shell spanning across UDIMS
+
+        if tile not in tile_shells:
+            tile_shells[tile] = []
+        tile_shells[tile].append(shell_id)
+
+    return tile_shells
+
+def get_tile_faces(shell_data):
+    """
+    This function groups the face indices of the mesh by the UDIM tile of their shell
+
+    Args:
+        shell_data: dict returned by get_udim_shell_data
+    Returns:
+        tile_faces : a dict in format {UDIM: [face indices]}
+    """
+    shell_tiles = shell_data["shell_tiles"]
+    tile_faces = {}
+
+    for face_index,shell_id in enumerate(shell_data["face_shells"]):
+        if shell_id < 0:
+            continue #faces without UVs dont belong to any UDIM
+
+        tile = shell_tiles[shell_id]
+        if tile is None:
+            continue #shell spanning across UDIMS
+
+        if tile not in tile_faces:
+            tile_faces[tile] = []
+        tile_faces[tile].append(face_index)
+
+    return tile_faces
+
+def get_face_triangles(uv_counts,uv_ids):
+    """
+    This function fans every face into triangles of UV (or vertex) indices (face with N UVs gives N-2 triangles)
+
+    Args:
+        uv_counts: number of UVs (or vertices) of every face
+        uv_ids: UV (or vertex) index of every face vertex
+    Returns:
+        triangles : a (triangle_count,3) array of UV (or vertex) indices
+        triangle_faces : face index of every triangle
+    """
+    uv_counts = np.asarray(uv_counts,dtype=np.int64)
+    uv_ids = np.asarray(uv_ids,dtype=np.int64)
+
+    face_starts = np.cumsum(uv_counts) - uv_counts #index of the first face vertex of every face
+    triangle_counts = np.maximum(uv_counts - 2,0)
+
+    triangle_faces = np.repeat(np.arange(len(uv_counts)),triangle_counts)
+    #position of every triangle inside its face (0,1,2...)
+    triangle_steps = np.arange(triangle_counts.sum()) - np.repeat(np.cumsum(triangle_counts) - triangle_counts,triangle_counts)
+
+    first = face_starts[triangle_faces]
+    triangles = np.stack([uv_ids[first],uv_ids[first + triangle_steps + 1],uv_ids[first + triangle_steps + 2]],axis=1)
+
+    return triangles, triangle_faces
+
+def get_shell_uv_areas(shell_count,shell_ids,u_array,v_array,uv_counts,uv_ids):
+    """
+    This function calculates the UV area of every shell by summing the area of every face of the shell
+
+    Args:
+        shell_count: number of UV shells
+        shell_ids: shell id of every UV
+        u_array: U coordinate of every UV
+        v_array: V coordinate of every UV
+        uv_counts: number of UVs of every face
+        uv_ids: UV index of every face vertex
+    Returns:
+        shell_areas : a list containing the UV area of every shell id
+    """
+    if np is not None:
+        uv_points = np.stack([np.asarray(u_array,dtype=np.float64),np.asarray(v_array,dtype=np.float64)],axis=1)
+        triangles, triangle_faces = get_face_triangles(uv_counts,uv_ids)
+        areas = get_triangle_areas(triangles,uv_points)
+
+        triangle_shells = np.asarray(shell_ids,dtype=np.int64)[triangles[:,0]]
+        return np.bincount(triangle_shells,weights=areas,minlength=shell_count).tolist()
+
+    shell_areas = [0.0] * shell_count
+    offset = 0 #index of the first face vertex UV of the current face
+    for uv_count in uv_counts:
+        face_uvs = uv_ids[offset:offset + uv_count]
+        offset += uv_count
+        if uv_count < 3:
+            continue
+
+        #shoelace formula over the face outline
+        area = 0.0
+        for index in range(uv_count):
+            current = face_uvs[index]
+            following = face_uvs[(index + 1) % uv_count]
+            area += u_array[current] * v_array[following] - u_array[following] * v_array[current]
+
+        shell_areas[shell_ids[face_uvs[0]]] += abs(area) * 0.5
+
+    return shell_areas
+
+def get_triangle_areas(triangles,points):
+    """
+    This function calculates the area of every triangle in bulk
+
+    Args:
+        triangles: a (triangle_count,3) array of point indices
+        points: a (point_count,2) array of UVs or a (point_count,3) array of positions
+    Returns:
+        areas : an array containing the area of every triangle
+    """
+    edges_1 = points[triangles[:,1]] - points[triangles[:,0]]
+    edges_2 = points[triangles[:,2]] - points[triangles[:,0]]
+
+    if points.shape[1] == 2:
+        return np.abs(edges_1[:,0] * edges_2[:,1] - edges_1[:,1] * edges_2[:,0]) * 0.5 #2D cross product is already the signed area
+
+    cross = np.cross(edges_1,edges_2)
+
+    return np.sqrt((cross * cross).sum(axis=1)) * 0.5
+
+def get_shell_world_areas(shell_count,shell_ids,points,vertex_counts,vertex_ids,uv_counts,uv_ids):
+    """
+    This function calculates the 3D surface area of every shell from the mesh point array (needs numpy)
+
+    Args:
+        shell_count: number of UV shells
+        shell_ids: shell id of every UV
+        points: position of every vertex, as a flat x,y,z list or a (point_count,3) array
+        vertex_counts: number of vertices of every face
+        vertex_ids: vertex index of every face vertex
+        uv_counts: number of UVs of every face (0 for unmapped faces)
+        uv_ids: UV index of every face vertex of the mapped faces
+    Returns:
+        shell_areas : a list containing the 3D surface area of every shell id
+    """
+    points = np.asarray(points,dtype=np.float64).reshape(-1,3)
+    uv_counts = np.asarray(uv_counts,dtype=np.int64)
+    uv_ids = np.asarray(uv_ids,dtype=np.int64)
+
+    #shell of every face, from the first UV of the face
+    face_shells = np.full(len(uv_counts),-1,dtype=np.int64)
+    mapped = uv_counts > 0
+    uv_starts = np.cumsum(uv_counts) - uv_counts
+    face_shells[mapped] = np.asarray(shell_ids,dtype=np.int64)[uv_ids[uv_starts[mapped]]]
+
+    triangles, triangle_faces = get_face_triangles(vertex_counts,vertex_ids)
+    areas = get_triangle_areas(triangles,points)
+
+    triangle_shells = face_shells[triangle_faces]
+    keep = triangle_shells >= 0 #unmapped faces dont belong to any shell
+
+    return np.bincount(triangle_shells[keep],weights=areas[keep],minlength=shell_count).tolist()
+
+def group_shell_uvs(shell_count,shell_ids):
+    """
+    This function gathers the UV indices of every shell, with one stable sort of the shell ids split at the shell sizes
+
+    Args:
+        shell_count: number of UV shells
+        shell_ids: shell id of every UV
+    Returns:
+        shell_uvs : a list containing the UV indices of every shell id (views of one sorted array with numpy, lists without)
+    """
+    if np is None:
+        shell_uvs = [[] for i in range(shell_count)]
+        for uv_index,shell_id in enumerate(shell_ids):
+            shell_uvs[shell_id].append(uv_index)
+        return shell_uvs
+
+    if not shell_count:
+        return []
+
+    shell_ids = np.asarray(shell_ids,dtype=np.int64)
+    order = np.argsort(shell_ids,kind="stable") #UV indices grouped by shell, in UV order inside every shell
+    splits = np.cumsum(np.bincount(shell_ids,minlength=shell_count))[:-1] #end of every shell but the last
+
+    return np.split(order,splits) #no per UV python objects, the views are only read when a shell is queried
+
+def get_texel_densities(uv_areas,world_areas,resolution):
+    """
+    This function returns the texel density of every shell in pixels per scene unit (px/cm with the default maya units)
+
+    Args:
+        uv_areas: UV area of every shell (in tiles)
+        world_areas: 3D surface area of every shell
+        resolution: texture resolution of a tile in pixels
+    Returns:
+        densities : a list containing the texel density of every shell (0 for shells without area)
+    """
+    densities = []
+
+    for uv_area,world_area in zip(uv_areas,world_areas):
+        if uv_area > 0.0 and world_area > 0.0:
+            densities.append(math.sqrt(uv_area / world_area) * resolution)
+        else:
+            densities.append(0.0)
+
+    return densities
+
+class UVShellIndex(object):
+    """
+    This class indexes the UV shells of a mesh once (UV indices, bounding box and UV area of every shell id),
+    so the layout tools can query and move the shells without selecting them
+
+    Methods:
+        __init__: Initializes the index from the flat UV arrays and shell ids of the mesh
+        get_shell_uvs: This function returns the UV indices of the passed shell
+        get_components: This function returns the UV components of the passed shell
+        offset_shells: This function moves every shell by its offset and updates the index
+        get_texel_densities: This function returns the texel density of every shell
+        scale_shells: This function scales every shell around its minimum corner and updates the index
+        apply: This function writes the UVs of the index back to the mesh with a single setUVs
+    """
+    def __init__(self,shell_count,shell_ids,u_array,v_array,uv_counts=None,uv_ids=None,mesh=None,mesh_fn=None,uv_set=None,world_areas=None):
+        """
+        This is the Constructor function to initialize the index
+
+        Args:
+            shell_count: number of UV shells
+            shell_ids: shell id of every UV
+            u_array: U coordinate of every UV
+            v_array: V coordinate of every UV
+            uv_counts: number of UVs of every face (the shell areas are 0 if None)
+            uv_ids: UV index of every face vertex
+            mesh: name of the mesh
+            mesh_fn: MFnMesh of the mesh (needed by apply)
+            uv_set: name of the UV set
+            world_areas: 3D surface area of every shell (needed by get_texel_densities)
+        Returns:
+            None
+        """
+        self.mesh = mesh
+        self.mesh_fn = mesh_fn
+        self.uv_set = uv_set
+
+        self.shell_count = shell_count
+        self.shell_ids = list(shell_ids)
+        self.u_array = list(u_array)
+        self.v_array = list(v_array)
+
+        #UV indices and bounding box of every shell, in bulk with numpy
+        if np is not None:
+            shell_ids_array = np.asarray(self.shell_ids,dtype=np.int64) #converted once for both
+            self.shell_uvs = group_shell_uvs(shell_count,shell_ids_array)
+            self.shell_bounds = list(map(tuple,classify_shells(self.u_array,self.v_array,shell_ids_array,shell_count)[0].tolist()))
+        else:
+            self.shell_uvs = group_shell_uvs(shell_count,self.shell_ids)
+            self.shell_bounds = get_shell_bounds(shell_count,self.shell_ids,self.u_array,self.v_array)
+
+        if uv_counts is not None:
+            self.shell_areas = get_shell_uv_areas(shell_count,self.shell_ids,self.u_array,self.v_array,list(uv_counts),list(uv_ids))
+        else:
+            self.shell_areas = [0.0] * shell_count
+
+        self.shell_world_areas = world_areas
+
+    def get_shell_uvs(self,shell_id):
+        """
+        This function returns the UV indices of the passed shell
+
+        Args:
+            shell_id: id of the shell
+        Returns:
+            list of UV indices
+        """
+        return list(self.shell_uvs[shell_id])
+
+    def get_components(self,shell_id):
+        """
+        This function returns the UV components of the passed shell
+
+        Args:
+            shell_id: id of the shell
+        Returns:
+            components : a list of component strings like 'obj.map[0:10]'
+        """
+        return to_components(self.mesh,"map",self.shell_uvs[shell_id])
+
+    def offset_shells(self,shell_offsets):
+        """
+        This function moves every shell by its offset and updates the index (the mesh is only changed by apply)
+
+        Args:
+            shell_offsets: a list of (u_offset,v_offset) for every shell id
+        Returns:
+            None
+        """
+        self.u_array, self.v_array = offset_shell_uvs(self.u_array,self.v_array,self.shell_ids,shell_offsets)
+
+        #moving a shell moves its bounds, no need to go over the UVs again
+        self.shell_bounds = [(min_u + u_offset,max_u + u_offset,min_v + v_offset,max_v + v_offset) for (min_u,max_u,min_v,max_v),(u_offset,v_offset) in zip(self.shell_bounds,shell_offsets)]
+
+    def get_texel_densities(self,resolution):
+        """
+        This function returns the texel density of every shell
+
+        Args:
+            resolution: texture resolution of a tile in pixels
+        Returns:
+            densities : a list containing the texel density of every shell in pixels per scene unit
+        """
+        return get_texel_densities(self.shell_areas,self.shell_world_areas,resolution)
+
+    def scale_shells(self,shell_scales):
+        """
+        This function scales every shell around its minimum corner and updates the index (the mesh is only changed by apply)
+
+        Args:
+            shell_scales: scale of every shell id
+        Returns:
+            None
+        """
+        pivots_u = [bounds[0] for bounds in self.shell_bounds]
+        pivots_v = [bounds[2] for bounds in self.shell_bounds]
+
+        if np is not None:
+            shell_ids = np.asarray(self.shell_ids,dtype=np.int64)
+            scales = np.asarray(shell_scales,dtype=np.float64)[shell_ids]
+            pivots_u_array = np.asarray(pivots_u,dtype=np.float64)[shell_ids]
+            pivots_v_array = np.asarray(pivots_v,dtype=np.float64)[shell_ids]
+            self.u_array = (pivots_u_array + (np.asarray(self.u_array,dtype=np.float64) - pivots_u_array) * scales).tolist()
+            self.v_array = (pivots_v_array + (np.asarray(self.v_array,dtype=np.float64) - pivots_v_array) * scales).tolist()
+        else:
+            self.u_array = [pivots_u[shell_id] + (u_coord - pivots_u[shell_id]) * shell_scales[shell_id] for u_coord,shell_id in zip(self.u_array,self.shell_ids)]
+            self.v_array = [pivots_v[shell_id] + (v_coord - pivots_v[shell_id]) * shell_scales[shell_id] for v_coord,shell_id in zip(self.v_array,self.shell_ids)]
+
+        self.shell_bounds = [(min_u,min_u + (max_u - min_u) * scale,min_v,min_v + (max_v - min_v) * scale) for (min_u,max_u,min_v,max_v),scale in zip(self.shell_bounds,shell_scales)]
+        self.shell_areas = [area * scale * scale for area,scale in zip(self.shell_areas,shell_scales)]
+
+    def apply(self):
+        """
+        This function writes the UVs of the index back to the mesh with a single setUVs. It is not undoable and the write is lost
+        on the next evaluation of a mesh with construction history, so delete the history first
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.mesh_fn.setUVs(self.u_array,self.v_array,self.uv_set)
+
+def get_shell_index(mesh,uv_set=None,world_areas=False):
+    """
+    This function reads the UVs, the shell ids and the faces of the mesh in one go and returns its shell index
+
+    Args:
+        mesh: name of the mesh
+        uv_set: name of the UV set (current UV set if None)
+        world_areas: if True, also calculates the 3D surface area of every shell from the world space points (needs numpy and maya.cmds)
+    Returns:
+        shell_index : UVShellIndex of the mesh
+    """
+    mesh_fn = get_mesh_fn(mesh)
+
+    if not uv_set:
+        uv_set = mesh_fn.currentUVSetName()
+
+    shell_count, shell_ids = mesh_fn.getUvShellsIds(uv_set)
+    u_array, v_array = mesh_fn.getUVs(uv_set)
+    uv_counts, uv_ids = mesh_fn.getAssignedUVs(uv_set)
+
+    shell_world_areas = None
+    if world_areas:
+        vertex_counts, vertex_ids = mesh_fn.getVertices()
+        points = cmds.xform(mesh + ".vtx[*]",query=True,worldSpace=True,translation=True) #flat x,y,z list in one call, an MPointArray converts point by point
+        shell_world_areas = get_shell_world_areas(shell_count,shell_ids,points,vertex_counts,vertex_ids,uv_counts,uv_ids)
+
+    return UVShellIndex(shell_count,shell_ids,u_array,v_array,uv_counts,uv_ids,mesh=mesh,mesh_fn=mesh_fn,uv_set=uv_set,world_areas=shell_world_areas)
@@ -3,14 +3,39 @@ Script Name: uv3dDistribute.py
 Author: Ram Yogeshwaran
 Company: The Mill
 Contact: Ram.Yogeshwaran@themill.com
-Description: This script is used to layout already unwrapped meshes based on a specific 3D Axis (X or Z)
+Description: This script is used to layout already unwrapped meshes based on a specific 3D Axis (X, Y, Z or a diagonal)
+             The shells are packed into the UDIM tiles by uvLayoutEngine with the selected layout algorithm
 """
 
+import os
+import sys
+import multiprocessing
 import maya.cmds as cmds
+import maya.api.OpenMaya as om2
 from collections import OrderedDict
 import pprint
 import maya.mel as mel
+import numpy as np
 from PySide2 import QtCore,QtGui,QtWidgets
+import progressReporter #throttled progress updates
+import uvLayoutEngine #shell packing algorithms
+import udimShellEngine #bulk UV reads and writes through the API
+
+#direction every axis of the dropdown sorts the meshes along (diagonals are normalized)
+AXIS_DIRECTIONS = OrderedDict([
+    ("X axis" , (1.0,0.0,0.0)),
+    ("-X axis" , (-1.0,0.0,0.0)),
+    ("Y axis" , (0.0,1.0,0.0)),
+    ("-Y axis" , (0.0,-1.0,0.0)),
+    ("Z axis" , (0.0,0.0,1.0)),
+    ("-Z axis" , (0.0,0.0,-1.0)),
+    ("XZ diagonal" , (0.70710678,0.0,0.70710678)),
+    ("X-Z diagonal" , (0.70710678,0.0,-0.70710678)),
+    ("XY diagonal" , (0.70710678,0.70710678,0.0)),
+    ("XYZ diagonal" , (0.57735027,0.57735027,0.57735027)),
+])
+
+PARALLEL_GROUPS = 4 #fewer tile groups are packed serially, starting the mayapy workers would take longer than packing them
 
 
 class UV_Distribute(QtWidgets.QWidget):
@@ -22,11 +47,18 @@ class UV_Distribute(QtWidgets.QWidget):
         build_UI: This is the function that builds the basic window and connects the UI with their respective functions.
         clear_help: This function clears the help_label from the ui
         main: This is the main function that contains the main functionality to call other distribution methods.
-        get_positions: This function gets all the object centers of all selected meshes and returns it
-        sort_positions: This function sorts the positions dict, based on the direction of the axis 
+        get_centers: This function gets the world bounding box centers of all selected meshes from a single selection list, every node is measured once
+        get_positions: This function gets all the object centers of all selected meshes and projects them onto the axis
+        sort_positions: This function sorts the meshes by their position along the axis 
         distribute_uvs: This function stacks all the selected meshes and distributes them in the UV viewport based on the distribution value 
+        distribute_shells: This function stacks the shells of the meshes, packs them with the layout engine and moves them
+        layout_tile_groups: This function splits the meshes into groups of tiles and packs every group in a pool of mayapy processes
+        get_process_context: This function returns the multiprocessing context for the layout workers
+        scale_to_texel_density: This function scales every shell of the shell index to the target texel density
+        get_shell_index: This function reads all the UVs and UV shells of the given geometry in one go and returns its shell index
+        move_uv_shells: This function moves every UV shell of a mesh by its offset and writes all the UVs back with a single setUVs
         get_uv_shells: This function returns the list of UV shells for the given geometry 
-        get_uv_shell_bbox: This function returns the list of UV shell's bounding box for the given geometry.
+        get_uv_shell_bbox: This function returns the UV shell's bounding box from the shell index.
         move_uv_shell: This function moves the given UV shell by u_offset and v_offset left or right)
 
     """
@@ -66,10 +98,43 @@ class UV_Distribute(QtWidgets.QWidget):
 
         #add dropdown box
         self.dropdown = QtWidgets.QComboBox()
-        self.dropdown.addItem("X axis")
-        self.dropdown.addItem("-X axis")
-        self.dropdown.addItem("Z axis")
-        self.dropdown.addItem("-Z axis")
+        for axis in AXIS_DIRECTIONS.keys():
+            self.dropdown.addItem(axis)
+
+        #add layout algorithm dropdown
+        layout_label = QtWidgets.QLabel("Layout :")
+        self.layout_dropdown = QtWidgets.QComboBox()
+        self.layout_dropdown.addItem("Shelf Next Fit","shelf_next_fit")
+        self.layout_dropdown.addItem("Shelf Best Fit","shelf_best_fit")
+        self.layout_dropdown.addItem("Skyline","skyline")
+
+        #keep the shells in the 3D order, or sort them by height for a tighter packing
+        self.keep_order_checkbox = QtWidgets.QCheckBox("Keep 3D Order")
+        self.keep_order_checkbox.setChecked(True)
+
+        #per shell polyEditUV moves can be undone, the bulk API write is much faster but deletes the history and clears the undo queue
+        self.undoable_checkbox = QtWidgets.QCheckBox("Undoable")
+        self.undoable_checkbox.setChecked(True)
+
+        #meshes are split into groups of tiles that are packed in parallel (0 keeps a single UDIM stream)
+        tiles_per_group_label = QtWidgets.QLabel("Tiles per Group :")
+        self.tiles_per_group = QtWidgets.QSpinBox()
+        self.tiles_per_group.setRange(0,100)
+        self.tiles_per_group.setValue(0)
+        self.tiles_per_group.setSpecialValueText("Off")
+
+        #scale the shells to a target texel density before packing (0 keeps their current scale)
+        texel_density_label = QtWidgets.QLabel("Texel Density (px/cm) :")
+        self.texel_density = QtWidgets.QDoubleSpinBox()
+        self.texel_density.setRange(0.0,10000.0)
+        self.texel_density.setDecimals(2)
+        self.texel_density.setValue(0.0)
+        self.texel_density.setSpecialValueText("Off")
+
+        self.texture_size = QtWidgets.QComboBox()
+        for size in (512,1024,2048,4096,8192):
+            self.texture_size.addItem("{0} px".format(size),size)
+        self.texture_size.setCurrentIndex(3) #4k
 
         #add line edit
         self.distribute_value = QtWidgets.QLineEdit()
@@ -80,6 +145,11 @@ class UV_Distribute(QtWidgets.QWidget):
         #add button
         distribute_btn = QtWidgets.QPushButton("Distribute")
 
+        #progress bar
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setAlignment(QtCore.Qt.AlignCenter)
+        self.progress_bar.setValue(0) #reset progress
+
         #add to layouts
         self.setLayout(self.main_layout)
         self.main_layout.addWidget(axis_label,0,0)
@@ -87,6 +157,16 @@ class UV_Distribute(QtWidgets.QWidget):
         self.main_layout.addWidget(shell_padding_label,0,2)
         self.main_layout.addWidget(self.distribute_value,0,3)
         self.main_layout.addWidget(distribute_btn,0,4)
+        self.main_layout.addWidget(layout_label,3,0)
+        self.main_layout.addWidget(self.layout_dropdown,3,1)
+        self.main_layout.addWidget(self.keep_order_checkbox,3,2)
+        self.main_layout.addWidget(self.undoable_checkbox,3,3)
+        self.main_layout.addWidget(tiles_per_group_label,4,0)
+        self.main_layout.addWidget(self.tiles_per_group,4,1)
+        self.main_layout.addWidget(texel_density_label,4,2)
+        self.main_layout.addWidget(self.texel_density,4,3)
+        self.main_layout.addWidget(self.texture_size,4,4)
+        self.main_layout.addWidget(self.progress_bar,2,0,1,5)
 
         #connections
         distribute_btn.clicked.connect(self.main)
@@ -124,19 +204,15 @@ class UV_Distribute(QtWidgets.QWidget):
             #get values
             selected_axis = self.dropdown.currentText()
 
-            if '-' in self.dropdown.currentText():
-                selected_direction = 0 
-            else:
-                selected_direction = 1
-
             selected_value = float(self.distribute_value.text())
 
-            positions_dict = self.get_positions(selected_meshes,selected_axis) #call positions func and store it
+            positions = self.get_positions(selected_meshes,selected_axis) #call positions func and store it
 
-            sorted_dict = self.sort_positions(positions_dict,selected_direction)
+            sorted_dict = self.sort_positions(selected_meshes,positions)
 
             #call the distribute func
-            self.distribute_uvs(sorted_dict,value=selected_value)
+            self.distribute_uvs(sorted_dict,value=selected_value,algorithm=self.layout_dropdown.currentData(),keep_order=self.keep_order_checkbox.isChecked(),undoable=self.undoable_checkbox.isChecked(),tiles_per_group=self.tiles_per_group.value(),
+                                texel_density=self.texel_density.value(),resolution=self.texture_size.currentData())
 
             self.help_label = QtWidgets.QLabel("Successfully Laid out UVs")
             self.main_layout.addWidget(self.help_label,1,0,1,4)
@@ -146,55 +222,126 @@ class UV_Distribute(QtWidgets.QWidget):
 
             raise RuntimeError("Nothing selected")
         
-    def get_positions(self,selection,axis):
+    def get_centers(self,selection):
         """
-            This function gets all the object centers of all selected meshes and returns it
-            
+            This function gets the world bounding box centers of all selected meshes from a single selection list, every node is measured once
+
             Args:
                 selection: a list of selected meshes
-                axis : axis to determine the order of list
             Returns:
-                mesh_positions : a dict containing the mesh names and their object centers.
+                centers : a (mesh count,3) array of the object centers
         """
-        mesh_positions ={} #empty dict to store the mesh and positions data
+        selection_list = om2.MSelectionList()
+        name_indices = {} #name : index of its item in the selection list
+        merged = [] #names that merged into an item added under another name
+
+        for mesh in selection:
+            if mesh not in name_indices:
+                length = selection_list.length()
+                selection_list.add(mesh)
+                if selection_list.length() > length:
+                    name_indices[mesh] = length
+                else:
+                    merged.append(mesh)
+
+        #walk the selection list once, filling the center of every item
+        item_centers = np.empty((selection_list.length(),3),dtype=np.float64)
+        path_indices = {} #full path : index of the item
+        for index in range(selection_list.length()):
+            dag_path = selection_list.getDagPath(index)
+            full_path = dag_path.fullPathName()
+            path_indices[full_path] = index
+            try:
+                dag_path.extendToShape() #bounding box of the shape, in the same space as objectCenter -gl
+            except RuntimeError:
+                item_centers[index] = cmds.objectCenter(full_path,gl=True) #groups and other transforms without a single shape
+            else:
+                bbox = om2.MFnDagNode(dag_path).boundingBox
+                bbox.transformUsing(dag_path.inclusiveMatrix()) #to world space
+                center = bbox.center
+                item_centers[index] = (center.x,center.y,center.z)
 
-        for mesh in selection: #iterate through selection
-            full_coordinates = cmds.objectCenter(mesh,gl=True)
+        for mesh in merged: #the same node under a different name
+            name_indices[mesh] = path_indices[cmds.ls(mesh,long=True)[0].split(".")[0]]
 
-            if 'Z' in axis:
-                pos = full_coordinates[2] #get only z coordinate
-            elif 'X' in axis:
-                pos = full_coordinates[0] #get only x coordinate
-            
-            mesh_positions[mesh]= pos #append to dictionary
+        return item_centers[[name_indices[mesh] for mesh in selection]]
 
-        return mesh_positions
+    def get_positions(self,selection,axis):
+        """
+            This function gets all the object centers of all selected meshes and projects them onto the axis
+            
+            Args:
+                selection: a list of selected meshes
+                axis : axis to determine the order of list (key of AXIS_DIRECTIONS)
+            Returns:
+                positions : an array of the position of every mesh along the axis
+        """
+        return self.get_centers(selection).dot(np.asarray(AXIS_DIRECTIONS[axis],dtype=np.float64))
 
-    def sort_positions(self,positions_dict,direction):
+    def sort_positions(self,selection,positions):
         """
-            This function sorts the positions dict, based on the direction of the axis 
+            This function sorts the meshes by their position along the axis 
             
             Args:
-                positions_dict : input dictionary
-                direction : 3d direction to sort the dictionary in . 
+                selection : a list of selected meshes
+                positions : array of the position of every mesh along the axis
             Returns:
-                sorted_positions : sorted version of positions dictionary based
+                sorted_positions : an ordered dict of the meshes and their positions, from the start to the end of the axis
         """
-        # Sort in ascending order (left to right, or closer to farther along the X or Z axis)
-        sorted_items = sorted(positions_dict.items(), key = lambda item: item[1], reverse=(direction == 0))
+        # Sort in ascending order with a single argsort (stable, so meshes at the same position keep the selection order)
+        order = np.argsort(positions,kind="stable")
 
-        # Convert the sorted list of tuples back to a dictionary
-        sorted_positions = OrderedDict(sorted_items) #ordered dict, because dictionary by default is unordered
+        sorted_positions = OrderedDict((selection[index],float(positions[index])) for index in order) #ordered dict, because dictionary by default is unordered
 
         return sorted_positions
 
-    def distribute_uvs(self,sorted_dict,value):
+    def distribute_uvs(self,sorted_dict,value,algorithm="shelf_next_fit",keep_order=True,undoable=True,tiles_per_group=0,texel_density=0.0,resolution=4096):
         """
             This function stacks all the selected meshes and distributes them in the UV viewport based on the distribution value 
 
             Args:
                 sorted_dict : input dictionary with proper order 
                 value : value for shell padding
+                algorithm : layout algorithm of uvLayoutEngine
+                keep_order : if False, the shells are sorted by height for a tighter packing
+                undoable : if True, moves every shell with polyEditUV in one undo chunk. If False, writes the UVs of every mesh with one API call,
+                           which deletes the construction history of the meshes and clears the undo queue
+                tiles_per_group : if set, the meshes are split in sort order into groups of about this many tiles, packed in parallel
+                texel_density : if set, every shell is scaled to this texel density (px/cm) before packing
+                resolution : texture resolution of a tile in pixels, for the texel density
+            Returns:
+                None
+        """
+        #the stacking and the moves are undone together
+        cmds.undoInfo(openChunk=True,chunkName="distribute_uvs")
+        try:
+            self.distribute_shells(sorted_dict,value,algorithm,keep_order,undoable,tiles_per_group,texel_density,resolution)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+            if not undoable:
+                #the API write is not in the undo queue, undoing the stacking alone would leave UVs that never existed
+                cmds.flushUndo()
+                print("The UVs were written without undo, the undo queue has been cleared")
+
+        #select all the geos again
+        cmds.select(cl=True) #clear selection
+        for geo in sorted_dict.keys():
+            cmds.select(geo,add= True)
+
+    def distribute_shells(self,sorted_dict,value,algorithm,keep_order,undoable,tiles_per_group,texel_density,resolution):
+        """
+            This function stacks the shells of the meshes, packs them with the layout engine and moves them (see distribute_uvs for the args)
+
+            Args:
+                sorted_dict : input dictionary with proper order
+                value : value for shell padding
+                algorithm : layout algorithm of uvLayoutEngine
+                keep_order : if False, the shells are sorted by height for a tighter packing
+                undoable : if True, moves every shell with polyEditUV instead of one API write per mesh
+                tiles_per_group : number of tiles of every group packed in parallel (0 for a single UDIM stream)
+                texel_density : texel density (px/cm) to scale the shells to (0 keeps their scale)
+                resolution : texture resolution of a tile in pixels, for the texel density
             Returns:
                 None
         """
@@ -204,95 +351,204 @@ class UV_Distribute(QtWidgets.QWidget):
         #padding in tiles
         tile_padding = 0.005
 
-        #Then Distribute it
-        tile_size = [1.0-tile_padding,1.0-tile_padding]
-        current_position = [tile_padding,tile_padding]  # Start distributing from U = 0 , v= 0
-        max_row_height = 0
+        #throttled progress bar updates, first half for reading the shells and second half for moving them
+        progress = progressReporter.ProgressReporter(len(sorted_dict.keys()),sink=progressReporter.qt_sink(self.progress_bar),end=50)
 
-        #Iterate through each geometry in the provided order
+        #index the UV shells of every mesh once and collect the bounding box of every shell in the provided order
+        shell_indices = []
+        shell_scales = [] #texel density scale of every shell of every mesh
+        bboxes = []
         for geo in sorted_dict.keys():
+            progress.step()
 
-            shells = self.get_uv_shells(geo)  # Get UV shells for the current geometry
+            shell_index = self.get_shell_index(geo,world_areas=bool(texel_density))  # Get UV shells for the current geometry
 
             #error out and continue
-            if not shells:
+            if not shell_index.shell_count:
                 print("Skipping " + geo+" since there are no UVs")
                 continue
 
-            for shell in shells:
-                bbox_min_u, bbox_max_u , bbox_min_v , bbox_max_v = self.get_uv_shell_bbox(shell)  # Get u_coordinates of bounding box for the shell
+            #normalize the texel density before packing, so the bboxes are the scaled ones
+            scales = [1.0] * shell_index.shell_count
+            if texel_density:
+                scales = self.scale_to_texel_density(shell_index,texel_density,resolution)
 
-                shell_width = bbox_max_u - bbox_min_u  # Calculate shell width
+            shell_indices.append(shell_index)
+            shell_scales.append(scales)
+            bboxes.extend(self.get_uv_shell_bbox(shell_index,shell_id) for shell_id in range(shell_index.shell_count))
 
-                # Update max_row_height based on the shell's bounding box
-                shell_height = bbox_max_v - bbox_min_v 
-                
-                # Check if the current position exceeds the tile width
-                if current_position[0]+shell_width > tile_size[0]:
-                    # Move to the next row
-                    current_position[0] =   (tile_size[0]-1+tile_padding)+tile_padding  # Reset U position
-                    current_position[1] += max_row_height + value  # set V position by the height of the row
-                    max_row_height = 0  # Reset max row height for the next row
+        #Then Distribute it
+        if tiles_per_group:
+            offsets = self.layout_tile_groups(shell_indices,bboxes,tiles_per_group,algorithm=algorithm,tile_padding=tile_padding,padding=value,keep_order=keep_order)
+        else:
+            offsets = uvLayoutEngine.layout_shells(bboxes,algorithm=algorithm,tile_padding=tile_padding,padding=value,keep_order=keep_order)
 
-                # Check if the current position exceeds the tile height
-                if current_position[1]+shell_height>tile_size[1]:
-                    tile_size = [tile_size[0]+1,tile_size[1]]
-                    #move to next tile
-                    current_position[0]+= 1
-                    current_position[1] = tile_padding
+        progress = progressReporter.ProgressReporter(len(shell_indices),sink=progressReporter.qt_sink(self.progress_bar),start=50)
 
-                u_offset = current_position[0] - bbox_min_u  # Calculate how much to move the shell
-                v_offset = current_position[1] - bbox_min_v  # set V position
+        first_shell = 0 #index of the first shell of the mesh in the offsets
+        for shell_index,scales in zip(shell_indices,shell_scales):
+            progress.step()
 
-                self.move_uv_shell(shell, u_offset,v_offset)  # Move the shell to its new position
-                    
-                current_position[0] += shell_width + value  # Update the current U position for the next shell
+            shell_offsets = offsets[first_shell:first_shell + shell_index.shell_count]
+            first_shell += shell_index.shell_count
 
-                
-                max_row_height = max(max_row_height, shell_height)
+            if undoable:
+                for shell_id,shell in enumerate(self.get_uv_shells(shell_index)):
+                    if scales[shell_id] != 1.0:
+                        #the scale pivot is the minimum corner, which the scaling doesnt move
+                        min_u, max_u, min_v, max_v = self.get_uv_shell_bbox(shell_index,shell_id)
+                        cmds.polyEditUV(shell,pivotU=min_u,pivotV=min_v,scaleU=scales[shell_id],scaleV=scales[shell_id])
+                    u_offset, v_offset = shell_offsets[shell_id]
+                    self.move_uv_shell(shell, u_offset,v_offset)  # Move the shell to its new position
+            else:
+                self.move_uv_shells(shell_index,shell_offsets)  # Move all the shells of the mesh at once
 
-            #print(current_position) #for development
+        #UV coverage of the used tiles
+        tile_count = uvLayoutEngine.get_tile_count(bboxes,offsets)
+        shell_area = sum(sum(shell_index.shell_areas) for shell_index in shell_indices)
+        print("Laid out {0} shells in {1} tiles with {2} ({3:.1f}% UV coverage)".format(len(bboxes),tile_count,algorithm,(100.0 * shell_area / tile_count) if tile_count else 0.0))
 
-        #select all the geos again
-        cmds.select(cl=True) #clear selection
-        for geo in sorted_dict.keys():
-            cmds.select(geo,add= True)
+    def layout_tile_groups(self,shell_indices,bboxes,tiles_per_group,algorithm,tile_padding,padding,keep_order):
+        """
+            This function splits the meshes in sort order into groups of tiles, packs every group in a pool of mayapy processes
+            and merges them back in order, so the result is the same for any number of processes
 
-    def get_uv_shells(self,geometry):
+            Args:
+                shell_indices : shell index of every mesh in sort order
+                bboxes : bounding box of every shell of all the meshes (in the same order)
+                tiles_per_group : number of tiles every group should fill
+                algorithm : layout algorithm of uvLayoutEngine
+                tile_padding : padding from the borders of the tile
+                padding : padding between the shells
+                keep_order : if False, the shells are sorted by height for a tighter packing
+            Returns:
+                offsets : list of (u_offset,v_offset) for every shell in the same order as bboxes
         """
-            This function returns the list of UV shells for the given geometry.
+        #shells of every mesh in the bboxes list
+        mesh_shells = []
+        first_shell = 0
+        for shell_index in shell_indices:
+            mesh_shells.append(range(first_shell,first_shell + shell_index.shell_count))
+            first_shell += shell_index.shell_count
+
+        mesh_areas = [sum((bboxes[shell][1] - bboxes[shell][0]) * (bboxes[shell][3] - bboxes[shell][2]) for shell in shells) for shells in mesh_shells]
+        groups = uvLayoutEngine.group_by_area(mesh_areas,tiles_per_group)
+
+        group_shells = [[shell for mesh in group for shell in mesh_shells[mesh]] for group in groups]
+        group_bboxes = [[bboxes[shell] for shell in shells] for shells in group_shells]
+
+        #one worker per group at most, and none for a few groups
+        processes = min(os.cpu_count() or 1,len(groups)) if len(groups) >= PARALLEL_GROUPS else 1
+        context = None
+        if processes > 1:
+            context = self.get_process_context()
+            if context is None:
+                print("mayapy was not found, packing the tile groups serially")
+                processes = 1
+
+        group_offsets = uvLayoutEngine.layout_groups(group_bboxes,algorithm=algorithm,tile_padding=tile_padding,padding=padding,keep_order=keep_order,
+                                                     processes=processes,mp_context=context)
+
+        #back to one offset per shell, groups are in sort order so the shells are too
+        offsets = [offset for group in group_offsets for offset in group]
+
+        print("Packed {0} tile groups with {1} processes".format(len(groups),processes))
+
+        return offsets
+
+    def get_process_context(self):
+        """
+            This function returns the multiprocessing context for the layout workers. Inside maya, sys.executable is maya itself,
+            so the workers are spawned with the mayapy next to it instead
+
+            Args:
+                None
+            Returns:
+                context : multiprocessing context, or None if mayapy was not found (spawning sys.executable would start more mayas)
+        """
+        mayapy = os.path.join(os.environ.get("MAYA_LOCATION",os.path.dirname(os.path.dirname(sys.executable))),"bin","mayapy")
+        if sys.platform == "win32":
+            mayapy += ".exe"
+
+        if not os.path.exists(mayapy):
+            return None
+
+        context = multiprocessing.get_context("spawn")
+        context.set_executable(mayapy)
+
+        return context
+
+    def get_shell_index(self,geometry,world_areas=False):
+        """
+            This function reads all the UVs and UV shells of the given geometry in one go and returns its shell index
 
             Args:
                 geometry : geometry containing all the UV shells
+                world_areas : if True, also calculates the 3D surface area of every shell (for the texel density)
+            Returns:
+                shell_index : udimShellEngine.UVShellIndex with the UV indices, bounding box and area of every shell
+        """
+        return udimShellEngine.get_shell_index(geometry,world_areas=world_areas)
+
+    def scale_to_texel_density(self,shell_index,texel_density,resolution):
+        """
+            This function scales every shell of the shell index to the target texel density (the mesh is only changed once the shells are moved)
+
+            Args:
+                shell_index : shell index of the geometry, with the world areas
+                texel_density : target texel density in px/cm
+                resolution : texture resolution of a tile in pixels
             Returns:
-                list of all the UV shells
+                scales : the scale applied to every shell id
         """
-        cmds.select("{0}.map[*]".format(geometry))  # Select all UVs
-        shell_ids = cmds.polyEvaluate(uvShell=True)  # Get the number of UV shells
+        densities = shell_index.get_texel_densities(resolution)
 
-        return ["{0}.map[*]".format(geometry) for i in range(shell_ids)]
+        scales = [texel_density / density if density else 1.0 for density in densities] #shells without area keep their scale
+        shell_index.scale_shells(scales)
 
-    def get_uv_shell_bbox(self,shell):
+        return scales
+
+    def move_uv_shells(self,shell_index,shell_offsets):
         """
-            This function returns the list of UV shell's bounding box for the given geometry.
+            This function moves every UV shell of a mesh by its offset and writes all the UVs back with a single setUVs.
+            The construction history is deleted first, otherwise the next evaluation of the history would throw the write away
 
             Args:
-                shell : shell to calculate bbox for
+                shell_index : shell index of the mesh
+                shell_offsets : a list of (u_offset,v_offset) for every shell id
+            Returns:
+                None
+        """
+        shell_index.offset_shells(shell_offsets)
+
+        cmds.delete(shell_index.mesh,constructionHistory=True) #keeps the stacked UVs the shell index was read from
+        shell_index.apply()
+
+    def get_uv_shells(self,shell_index):
+        """
+            This function returns the list of UV shells for the given geometry.
+
+            Args:
+                shell_index : shell index of the geometry
+            Returns:
+                list of all the UV shells (as a list of UV components for each shell id)
+        """
+        return [shell_index.get_components(shell_id) for shell_id in range(shell_index.shell_count)]
+
+    def get_uv_shell_bbox(self,shell_index,shell_id):
+        """
+            This function returns the UV shell's bounding box from the shell index.
+
+            Args:
+                shell_index : shell index of the geometry
+                shell_id : id of the shell to get the bbox for
             Returns:
                 min_u: minimum value of U coordinate of bouding box
                 max_u: maximum value of U coordinate of bouding box
                 min_v: minimum value of V coordinate of bouding box
                 max_v: maximum value of V coordinate of bouding box
         """
-
-        cmds.select(shell)
-        uvs = cmds.polyEvaluate(shell, boundingBox2d=True)  # Get the bounding box of the UVs
-        min_u = uvs[0][0]  # minU coordinate
-        max_u = uvs[0][1]  # maxU coordinate
-        min_v = uvs[1][0] #minV coordinate
-        max_v = uvs[1][1] #maxV coordinate
-
-        return min_u, max_u , min_v , max_v
+        return shell_index.shell_bounds[shell_id]
 
     def move_uv_shell(self,shell, u_offset,v_offset):
         """
@@ -306,8 +562,7 @@ class UV_Distribute(QtWidgets.QWidget):
                 None
         """
 
-        cmds.select(shell)
-        cmds.polyEditUV(relative=True, u=u_offset,v=v_offset) #set the u to  calculated pos
+        cmds.polyEditUV(shell,relative=True, u=u_offset,v=v_offset) #set the u to  calculated pos (no need to select the shell)
 
 #make instance of the main class and show it
 UV_window = UV_Distribute()
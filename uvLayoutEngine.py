@@ -0,0 +1,560 @@
+"""
+Script Name: uvLayoutEngine.py
+Author: Ram Yogeshwaran
+Company: The Mill
+Contact: Ram.Yogeshwaran@themill.com
+Description: This module holds a pure python layout engine for UV shells. It takes the bounding box sizes of the shells and returns
+             the position of every shell in the UDIM tiles (1001 to 1010 along U, then the next row from 1011) with the selected packing algorithm:
+                 shelf_next_fit : fills rows left to right, a new row (or tile) once the shell doesnt fit
+                 shelf_best_fit : puts every shell in the row (of any tile) that leaves the least space, opens a new row otherwise
+                 skyline : bottom-left skyline packing, fills the gaps above shorter shells
+             Groups of shells can also be packed independently in a process pool and merged into consecutive tiles
+
+Usage:
+    python uvLayoutEngine.py (runs the benchmark on synthetic sets of shells)
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+EPSILON = 1e-9 #tolerance for the float comparisons
+GROUP_FILL = 0.7 #expected fill ratio of a packed tile, used to size the tile groups
+UDIM_ROW = 10 #tiles per UDIM row, the tile after 1010 is 1011 at the start of the next row
+
+
+def get_tile_origin(tile):
+    """
+    This function returns the UV position of the minimum corner of a tile, the tiles wrap into rows of UDIM_ROW
+
+    Args:
+        tile: index of the tile (0 for 1001)
+    Returns:
+        u : column of the tile
+        v : row of the tile
+    """
+    return tile % UDIM_ROW, tile // UDIM_ROW
+
+def get_region(tile_padding,padding):
+    """
+    This function returns the usable region of a tile. The shells are inflated by the padding, so the region is extended by the padding
+    as well (the padding after the last shell of a row doesnt need to fit in the tile)
+
+    Args:
+        tile_padding: padding from the borders of the tile
+        padding: padding between the shells
+    Returns:
+        start : start of the region in U and V
+        end : end of the region in U and V
+    """
+    return tile_padding, 1.0 - tile_padding + padding
+
+def shelf_next_fit(sizes,tile_padding=0.005,padding=0.0):
+    """
+    This function places the shells left to right in rows, starting a new row when a shell doesnt fit the width of the tile
+    and a new tile when the row doesnt fit its height
+
+    Args:
+        sizes: list of (width,height) of every shell
+        tile_padding: padding from the borders of the tile
+        padding: padding between the shells
+    Returns:
+        positions : list of (tile,u,v) of the minimum corner of every shell, u and v inside the tile
+    """
+    start, end = get_region(tile_padding,padding)
+
+    positions = []
+    tile = 0
+    cursor_u = start #U position of the next shell
+    shelf_v = start #V position of the current row
+    shelf_height = 0.0
+
+    for width,height in sizes:
+        width += padding
+        height += padding
+
+        # Move to the next row
+        if cursor_u + width > end + EPSILON and cursor_u > start:
+            shelf_v += shelf_height
+            cursor_u = start
+            shelf_height = 0.0
+
+        # Move to the next tile
+        if shelf_v + height > end + EPSILON and shelf_v > start:
+            tile += 1
+            shelf_v = start
+            cursor_u = start
+            shelf_height = 0.0
+
+        positions.append((tile,cursor_u,shelf_v))
+
+        cursor_u += width
+        shelf_height = max(shelf_height,height)
+
+    return positions
+
+def shelf_best_fit(sizes,tile_padding=0.005,padding=0.0):
+    """
+    This function places every shell in the row that leaves the least free width after it, across all the tiles.
+    A row can only get taller while it is the top row of its tile. If no row fits, a new row (or tile) is opened
+
+    Args:
+        sizes: list of (width,height) of every shell
+        tile_padding: padding from the borders of the tile
+        padding: padding between the shells
+    Returns:
+        positions : list of (tile,u,v) of the minimum corner of every shell, u and v inside the tile
+    """
+    start, end = get_region(tile_padding,padding)
+
+    positions = []
+    shelves = [] #rows in format [tile, v, height, cursor_u]
+    top_shelves = {} #index of the top row of every tile
+
+    for width,height in sizes:
+        width += padding
+        height += padding
+
+        #find the row with the least free width left after the shell
+        best_index = None
+        best_space = None
+        for index,(tile,shelf_v,shelf_height,cursor_u) in enumerate(shelves):
+            space = end - cursor_u - width
+            if space < -EPSILON:
+                continue
+            if height > shelf_height + EPSILON:
+                #only the top row of a tile can grow
+                if top_shelves[tile] != index or shelf_v + height > end + EPSILON:
+                    continue
+            if best_space is None or space < best_space:
+                best_index = index
+                best_space = space
+
+        if best_index is None:
+            #open a new row on the last tile, or a new tile
+            tile = len(top_shelves) - 1
+            shelf_v = start
+            if tile >= 0:
+                top = shelves[top_shelves[tile]]
+                shelf_v = top[1] + top[2]
+            if tile < 0 or (shelf_v + height > end + EPSILON and shelf_v > start):
+                tile += 1
+                shelf_v = start
+
+            shelves.append([tile,shelf_v,0.0,start])
+            best_index = len(shelves) - 1
+            top_shelves[tile] = best_index
+
+        shelf = shelves[best_index]
+        positions.append((shelf[0],shelf[3],shelf[1]))
+
+        shelf[2] = max(shelf[2],height)
+        shelf[3] += width
+
+    return positions
+
+def skyline_fit(skyline,index,width,height,end):
+    """
+    This function returns the V position a shell would get if placed at the start of the passed skyline segment
+
+    Args:
+        skyline: list of segments in format [u, v, width]
+        index: index of the segment
+        width: width of the shell
+        height: height of the shell
+        end: end of the region in U and V
+    Returns:
+        V position of the shell or None if it doesnt fit there
+    """
+    u_position = skyline[index][0]
+    if u_position + width > end + EPSILON:
+        return None
+
+    v_position = 0.0
+    width_left = width
+    while width_left > EPSILON:
+        if index >= len(skyline):
+            return None
+        v_position = max(v_position,skyline[index][1])
+        if v_position + height > end + EPSILON:
+            return None
+        width_left -= skyline[index][2]
+        index += 1
+
+    return v_position
+
+def skyline_add(skyline,index,u_position,v_position,width,height):
+    """
+    This function adds a placed shell to the skyline
+
+    Args:
+        skyline: list of segments in format [u, v, width]
+        index: index of the segment the shell starts at
+        u_position: U position of the shell
+        v_position: V position of the shell
+        width: width of the shell
+        height: height of the shell
+    Returns:
+        None
+    """
+    skyline.insert(index,[u_position,v_position + height,width])
+
+    #shrink or remove the segments covered by the shell
+    shell_end = u_position + width
+    next_index = index + 1
+    while next_index < len(skyline):
+        segment = skyline[next_index]
+        if segment[0] >= shell_end - EPSILON:
+            break
+        overlap = shell_end - segment[0]
+        if segment[2] <= overlap + EPSILON:
+            del skyline[next_index]
+        else:
+            segment[0] += overlap
+            segment[2] -= overlap
+            break
+
+    #merge the segments with the same height
+    merge_index = 0
+    while merge_index < len(skyline) - 1:
+        if abs(skyline[merge_index][1] - skyline[merge_index + 1][1]) <= EPSILON:
+            skyline[merge_index][2] += skyline[merge_index + 1][2]
+            del skyline[merge_index + 1]
+        else:
+            merge_index += 1
+
+def skyline(sizes,tile_padding=0.005,padding=0.0):
+    """
+    This function places every shell at the lowest (then leftmost) position of the skyline of the first tile it fits in
+
+    Args:
+        sizes: list of (width,height) of every shell
+        tile_padding: padding from the borders of the tile
+        padding: padding between the shells
+    Returns:
+        positions : list of (tile,u,v) of the minimum corner of every shell, u and v inside the tile
+    """
+    start, end = get_region(tile_padding,padding)
+
+    positions = []
+    tiles = [] #skyline of every tile
+    tile_floors = [] #lowest V of every skyline, to skip the full tiles quickly
+
+    for width,height in sizes:
+        width += padding
+        height += padding
+
+        placed = False
+        for tile,tile_skyline in enumerate(tiles):
+            #skip the tiles that are too full for this shell
+            if tile_floors[tile] + height > end + EPSILON:
+                continue
+
+            best = None #(top, u, index, v)
+            for index,(segment_u,segment_v,segment_width) in enumerate(tile_skyline):
+                if segment_u + width > end + EPSILON:
+                    break #no room left on the right for this shell
+                #the shell cant sit lower than the segment, skip the segments that cant beat the best position
+                if segment_v + height > end + EPSILON or (best is not None and segment_v + height >= best[0]):
+                    continue
+                v_position = skyline_fit(tile_skyline,index,width,height,end)
+                if v_position is None:
+                    continue
+                candidate = (v_position + height,tile_skyline[index][0],index,v_position)
+                if best is None or candidate < best:
+                    best = candidate
+
+            if best is not None:
+                skyline_add(tile_skyline,best[2],best[1],best[3],width,height)
+                tile_floors[tile] = min(segment[1] for segment in tile_skyline)
+                positions.append((tile,best[1],best[3]))
+                placed = True
+                break
+
+        if not placed:
+            #start a new tile
+            tile_skyline = [[start,start,end - start]]
+            tiles.append(tile_skyline)
+            skyline_add(tile_skyline,0,start,start,width,height)
+            tile_floors.append(min(segment[1] for segment in tile_skyline))
+            positions.append((len(tiles) - 1,start,start))
+
+    return positions
+
+#available layout algorithms
+ALGORITHMS = {
+    "shelf_next_fit" : shelf_next_fit,
+    "shelf_best_fit" : shelf_best_fit,
+    "skyline" : skyline,
+}
+
+def place_shells(bboxes,algorithm="shelf_next_fit",tile_padding=0.005,padding=0.0,keep_order=True):
+    """
+    This function packs the shells with the layout algorithm into tiles counted from 0, without placing them in UV space yet
+
+    Args:
+        bboxes: list of (min_u,max_u,min_v,max_v) of every shell
+        algorithm: name of the layout algorithm (see ALGORITHMS)
+        tile_padding: padding from the borders of the tile
+        padding: padding between the shells
+        keep_order: if False, the shells are placed from the tallest to the shortest (better packing, but the order of the shells is lost)
+    Returns:
+        placements : list of (tile,u,v) for every shell in the same order as bboxes, None for the shells bigger than a tile
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError("Unknown layout algorithm: {0}".format(algorithm))
+
+    sizes = [(max_u - min_u,max_v - min_v) for min_u,max_u,min_v,max_v in bboxes]
+    tile_size = 1.0 - 2 * tile_padding
+
+    #order to place the shells in, the shells bigger than a tile are placed on their own tiles later
+    order = [index for index,(width,height) in enumerate(sizes) if width <= tile_size + EPSILON and height <= tile_size + EPSILON]
+    if not keep_order:
+        order.sort(key=lambda index : (-sizes[index][1],-sizes[index][0]))
+
+    placed_positions = ALGORITHMS[algorithm]([sizes[index] for index in order],tile_padding=tile_padding,padding=padding)
+
+    #back to the original order
+    placements = [None] * len(sizes)
+    for index,position in zip(order,placed_positions):
+        placements[index] = position
+
+    return placements
+
+def get_offsets(bboxes,placements,tile_padding=0.005,first_tile=0):
+    """
+    This function turns the placements into UV offsets, starting at the passed tile and wrapping the tiles into rows of UDIM_ROW.
+    The shells bigger than a tile get their own block of tiles after the packed ones, within a single row of tiles
+
+    Args:
+        bboxes: list of (min_u,max_u,min_v,max_v) of every shell
+        placements: list of (tile,u,v) returned by place_shells
+        tile_padding: padding from the borders of the tile
+        first_tile: index of the tile the packed tile 0 goes to
+    Returns:
+        offsets : list of (u_offset,v_offset) for every shell in the same order as bboxes
+    """
+    positions = [None] * len(bboxes)
+
+    next_tile = first_tile
+    for index,placement in enumerate(placements):
+        if placement is not None:
+            tile, u_position, v_position = placement
+            tile_u, tile_v = get_tile_origin(first_tile + tile)
+            positions[index] = (tile_u + u_position,tile_v + v_position)
+            next_tile = max(next_tile,first_tile + tile + 1)
+
+    for index,placement in enumerate(placements):
+        if placement is not None:
+            continue
+
+        min_u, max_u, min_v, max_v = bboxes[index]
+        span_u = int(math.ceil(tile_padding + max_u - min_u - EPSILON)) #tiles the shell spans
+        span_v = int(math.ceil(tile_padding + max_v - min_v - EPSILON))
+
+        #start a new row if the block doesnt fit the rest of the row, or spans several rows
+        column = next_tile % UDIM_ROW
+        if column and (column + span_u > UDIM_ROW or span_v > 1):
+            next_tile += UDIM_ROW - column
+
+        tile_u, tile_v = get_tile_origin(next_tile)
+        positions[index] = (tile_u + tile_padding,tile_v + tile_padding)
+        next_tile += (span_v - 1) * UDIM_ROW + span_u #skip every tile the shell spans
+
+    return [(u_position - bbox[0],v_position - bbox[2]) for bbox,(u_position,v_position) in zip(bboxes,positions)]
+
+def layout_shells(bboxes,algorithm="shelf_next_fit",tile_padding=0.005,padding=0.0,keep_order=True):
+    """
+    This is the main function of the engine that returns the offset every shell has to be moved by
+
+    Args:
+        bboxes: list of (min_u,max_u,min_v,max_v) of every shell
+        algorithm: name of the layout algorithm (see ALGORITHMS)
+        tile_padding: padding from the borders of the tile
+        padding: padding between the shells
+        keep_order: if False, the shells are placed from the tallest to the shortest (better packing, but the order of the shells is lost)
+    Returns:
+        offsets : list of (u_offset,v_offset) for every shell in the same order as bboxes
+    """
+    placements = place_shells(bboxes,algorithm=algorithm,tile_padding=tile_padding,padding=padding,keep_order=keep_order)
+
+    return get_offsets(bboxes,placements,tile_padding=tile_padding)
+
+def get_shell_tiles(bbox,offset):
+    """
+    This function returns the indices of the tiles a shell covers after its offset is applied
+
+    Args:
+        bbox: (min_u,max_u,min_v,max_v) of the shell
+        offset: (u_offset,v_offset) of the shell
+    Returns:
+        tiles : list of tile indices (0 for 1001)
+    """
+    min_u, max_u, min_v, max_v = bbox
+    u_offset, v_offset = offset
+
+    columns = range(int(math.floor(min_u + u_offset + EPSILON)),int(math.ceil(max_u + u_offset - EPSILON)))
+    rows = range(int(math.floor(min_v + v_offset + EPSILON)),int(math.ceil(max_v + v_offset - EPSILON)))
+
+    return [row * UDIM_ROW + column for row in rows for column in columns]
+
+def get_tile_count(bboxes,offsets):
+    """
+    This function returns the number of UDIM tiles used by the shells after the offsets are applied
+
+    Args:
+        bboxes: list of (min_u,max_u,min_v,max_v) of every shell
+        offsets: list of (u_offset,v_offset) returned by layout_shells
+    Returns:
+        number of tiles
+    """
+    tiles = set()
+    for bbox,offset in zip(bboxes,offsets):
+        tiles.update(get_shell_tiles(bbox,offset))
+
+    return len(tiles)
+
+def get_tile_end(bboxes,offsets):
+    """
+    This function returns the index of the tile after the last tile used by the shells, in row order (0 if there are no shells)
+
+    Args:
+        bboxes: list of (min_u,max_u,min_v,max_v) of every shell
+        offsets: list of (u_offset,v_offset) returned by layout_shells
+    Returns:
+        index of the first free tile
+    """
+    tile_end = 0
+    for bbox,offset in zip(bboxes,offsets):
+        tiles = get_shell_tiles(bbox,offset)
+        if tiles:
+            tile_end = max(tile_end,max(tiles) + 1)
+
+    return tile_end
+
+def group_by_area(item_areas,tiles_per_group):
+    """
+    This function splits the items (meshes) in their current order into groups that fill roughly tiles_per_group tiles each
+
+    Args:
+        item_areas: the area of the shell bounding boxes of every item
+        tiles_per_group: number of tiles every group should fill
+    Returns:
+        groups : a list of lists of item indices
+    """
+    group_area = tiles_per_group * GROUP_FILL
+
+    groups = []
+    current_area = 0.0
+    for index,area in enumerate(item_areas):
+        if not groups or (current_area + area > group_area and current_area > 0.0):
+            groups.append([])
+            current_area = 0.0
+        groups[-1].append(index)
+        current_area += area
+
+    return groups
+
+def layout_group(arguments):
+    """
+    This function packs one group of shells, it is the task sent to the worker processes
+
+    Args:
+        arguments: tuple of (bboxes,algorithm,tile_padding,padding,keep_order)
+    Returns:
+        placements : list of (tile,u,v) for every shell of the group (see place_shells)
+    """
+    bboxes, algorithm, tile_padding, padding, keep_order = arguments
+
+    return place_shells(bboxes,algorithm=algorithm,tile_padding=tile_padding,padding=padding,keep_order=keep_order)
+
+def layout_groups(group_bboxes,algorithm="shelf_next_fit",tile_padding=0.005,padding=0.0,keep_order=True,processes=None,mp_context=None):
+    """
+    This function lays out every group of shells independently (in parallel if processes > 1) and merges them into consecutive tiles.
+    The groups are merged in their own order once all of them are done, so the result doesnt depend on the number of workers
+
+    Args:
+        group_bboxes: list of groups, every group being a list of (min_u,max_u,min_v,max_v) of its shells
+        algorithm: name of the layout algorithm (see ALGORITHMS)
+        tile_padding: padding from the borders of the tile
+        padding: padding between the shells
+        keep_order: if False, the shells of every group are placed from the tallest to the shortest
+        processes: number of worker processes (serial if None or 1)
+        mp_context: multiprocessing context of the pool (needed inside maya to spawn mayapy instead of maya)
+    Returns:
+        group_offsets : a list of (u_offset,v_offset) lists, in the same order as group_bboxes
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError("Unknown layout algorithm: {0}".format(algorithm))
+
+    tasks = [(bboxes,algorithm,tile_padding,padding,keep_order) for bboxes in group_bboxes]
+
+    if processes and processes > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes,len(tasks)),mp_context=mp_context) as executor:
+            group_placements = list(executor.map(layout_group,tasks)) #map keeps the order of the groups
+    else:
+        group_placements = [layout_group(task) for task in tasks]
+
+    #every group starts on the first tile after the previous group, wrapping into the next row of tiles
+    group_offsets = []
+    first_tile = 0
+    for bboxes,placements in zip(group_bboxes,group_placements):
+        offsets = get_offsets(bboxes,placements,tile_padding=tile_padding,first_tile=first_tile)
+        group_offsets.append(offsets)
+        first_tile = max(first_tile,get_tile_end(bboxes,offsets))
+
+    return group_offsets
+
+def benchmark(shell_count=10000,seed=1,padding=0.002):
+    """
+    This function compares the tile count and the runtime of every algorithm on a synthetic set of shells
+
+    Args:
+        shell_count: number of synthetic shells
+        seed: random seed, so the results are repeatable
+        padding: padding between the shells
+    Returns:
+        results : a dict in format {(algorithm,keep_order or processes): {"tiles": int, "seconds": float}} (plus the "offsets" of the group runs)
+    """
+    generator = random.Random(seed)
+
+    #mix of many small shells and a few big ones, like a pack of props
+    bboxes = []
+    for i in range(shell_count):
+        if generator.random() < 0.05:
+            width, height = generator.uniform(0.05,0.25), generator.uniform(0.05,0.25)
+        else:
+            width, height = generator.uniform(0.005,0.05), generator.uniform(0.005,0.05)
+        min_u, min_v = generator.random(), generator.random()
+        bboxes.append((min_u,min_u + width,min_v,min_v + height))
+
+    shell_area = sum((max_u - min_u) * (max_v - min_v) for min_u,max_u,min_v,max_v in bboxes)
+    print("{0} shells, total shell area: {1:.2f} tiles".format(shell_count,shell_area))
+
+    results = {}
+    for keep_order in (True,False):
+        for algorithm in sorted(ALGORITHMS.keys()):
+            start_time = time.time()
+            offsets = layout_shells(bboxes,algorithm=algorithm,padding=padding,keep_order=keep_order)
+            seconds = time.time() - start_time
+
+            tiles = get_tile_count(bboxes,offsets)
+            results[(algorithm,keep_order)] = {"tiles" : tiles, "seconds" : seconds}
+            print("{0:<16} keep_order={1:<6} tiles: {2:<4} time: {3:.3f}s".format(algorithm,str(keep_order),tiles,seconds))
+
+    #independent tile groups, serial against a process pool
+    areas = [(max_u - min_u) * (max_v - min_v) for min_u,max_u,min_v,max_v in bboxes]
+    group_bboxes = [[bboxes[index] for index in group] for group in group_by_area(areas,4)]
+    for processes in (1,4):
+        start_time = time.time()
+        group_offsets = layout_groups(group_bboxes,algorithm="skyline",padding=padding,processes=processes)
+        seconds = time.time() - start_time
+
+        tiles = get_tile_count([bbox for group in group_bboxes for bbox in group],[offset for offsets in group_offsets for offset in offsets])
+        results[("skyline_groups",processes)] = {"tiles" : tiles, "seconds" : seconds, "offsets" : group_offsets}
+        print("{0:<16} processes={1:<6} tiles: {2:<4} time: {3:.3f}s ({4} groups)".format("skyline_groups",processes,tiles,seconds,len(group_bboxes)))
+
+    return results
+
+if __name__ == "__main__":
+    benchmark()